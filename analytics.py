@@ -0,0 +1,270 @@
+import argparse
+import re
+import time
+
+import numpy as np
+
+from spelling_diff import ERROR_LABELS, align, classify_errors
+
+DAY = 86400
+FETCH_CHUNK = 200000
+
+# Орфограммы правильного слова: по ним считается, сколько попыток "встречали" правило.
+# Для типов ошибок без своей орфограммы (пропуск, лишняя буква и т.п.) знаменатель - все попытки
+PATTERNS = {
+    'double_consonant': re.compile(r'([бвгджзйклмнпрстфхцчшщ])\1'),
+    'soft_sign': re.compile(r'ь'),
+    'hard_sign': re.compile(r'ъ'),
+    'yo': re.compile(r'ё'),
+    # Ударение неизвестно: слово с двумя и более гласными содержит безударную
+    'unstressed_vowel': re.compile(r'[аеёиоуыэюя].*[аеёиоуыэюя]'),
+    # Парная согласная перед другой согласной или на конце слова
+    'voicing': re.compile(r'[бпвфгкдтжшзс](?=[бвгджзйклмнпрстфхцчшщ]|$)'),
+    'separator': re.compile(r'[- ]'),
+}
+
+
+class AttemptColumns:
+    """Попытки в виде столбцов NumPy: слова и ответы закодированы номерами в словарях
+
+    word_codes[i] - номер слова в words, answer_codes[i] - номер ответа в answers (-1, если
+    ответ не сохранен или не загружен), is_correct, ts и response_ms (NaN, если неизвестно) -
+    по попыткам.
+    """
+
+    def __init__(self, words, answers, word_codes, answer_codes, is_correct, ts, response_ms):
+        self.words = words
+        self.answers = answers
+        self.word_codes = word_codes
+        self.answer_codes = answer_codes
+        self.is_correct = is_correct
+        self.ts = ts
+        self.response_ms = response_ms
+
+    def __len__(self):
+        return len(self.word_codes)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Строит столбцы из строк (word, answer, is_correct, ts, response_ms)"""
+        rows = [(word, None if correct else answer, correct, ts, -1 if response_ms is None else response_ms)
+                for word, answer, correct, ts, response_ms in rows]
+        return cls._build([rows], dict.fromkeys(row[0] for row in rows))
+
+    @classmethod
+    def from_history(cls, history, since=None, until=None):
+        """Загружает попытки из AttemptHistory за период, читая базу пачками
+
+        Ответы нужны только для разбора ошибок, поэтому у верных попыток они не читаются.
+        """
+        sql = ("SELECT word, CASE WHEN is_correct THEN NULL ELSE answer END, is_correct, ts, "
+               "COALESCE(response_ms, -1) FROM attempts")
+        # Без границ полный просмотр таблицы быстрее, чем проход по индексу ts
+        if since or until:
+            sql += " WHERE ts >= ? AND ts < ?"
+            params = (since or 0, until or float('inf'))
+        else:
+            params = ()
+        # Словарь слов заранее - по индексу (word, ts), не читая таблицу
+        vocabulary = dict.fromkeys(history.words())
+        return cls._build(history.query_chunks(sql, params, FETCH_CHUNK), vocabulary)
+
+    @classmethod
+    def _build(cls, chunks, vocabulary):
+        words = list(vocabulary)
+        word_index = {word: code for code, word in enumerate(words)}
+        answer_index = {None: -1}
+        parts = []
+        for rows in chunks:
+            if not rows:
+                continue
+            row_words, answers, correct, ts, response_ms = zip(*rows)
+            # Ответ есть только у неверных попыток - остальные сразу получают -1
+            answer_codes = [-1 if answer is None else answer_index.setdefault(answer, len(answer_index) - 1)
+                            for answer in answers]
+            parts.append((
+                np.fromiter(map(word_index.__getitem__, row_words), dtype=np.int32, count=len(rows)),
+                np.array(answer_codes, dtype=np.int32),
+                np.array(correct, dtype=bool),
+                np.array(ts, dtype=np.float64),
+                np.array(response_ms, dtype=np.float64),
+            ))
+
+        columns = [np.concatenate(column) for column in zip(*parts)] if parts else [
+            np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, bool),
+            np.empty(0, np.float64), np.empty(0, np.float64)]
+        # Неизвестное время ответа хранится как NaN
+        columns[4][columns[4] < 0] = np.nan
+        answers = [answer for answer in answer_index if answer is not None]
+        return cls(words, answers, *columns)
+
+    def attempts_per_word(self):
+        return np.bincount(self.word_codes, minlength=len(self.words))
+
+    def errors_per_word(self):
+        return np.bincount(self.word_codes, weights=~self.is_correct, minlength=len(self.words))
+
+    def error_pairs(self):
+        """Уникальные неверные пары с известным ответом: (коды слов, коды ответов, число попыток)"""
+        mask = ~self.is_correct & (self.answer_codes >= 0)
+        keys = self.word_codes[mask].astype(np.int64) * (len(self.answers) + 1) + self.answer_codes[mask]
+        unique, counts = np.unique(keys, return_counts=True)
+        return unique // (len(self.answers) + 1), unique % (len(self.answers) + 1), counts
+
+
+def word_error_rates(columns, min_attempts=1):
+    """Доля ошибок по словам: [(слово, попыток, ошибок, доля)] по убыванию доли"""
+    attempts = columns.attempts_per_word()
+    errors = columns.errors_per_word()
+    mask = attempts >= max(1, min_attempts)
+    codes = np.nonzero(mask)[0]
+    rates = errors[codes] / attempts[codes]
+    order = np.lexsort((-errors[codes], -rates))
+    return [(columns.words[codes[i]], int(attempts[codes[i]]), int(errors[codes[i]]), float(rates[i]))
+            for i in order]
+
+
+def position_error_rates(columns, max_length=24):
+    """Доля ошибок по позиции буквы в слове
+
+    Возвращает массив длины max_length: ошибок в позиции / попыток на слова, где эта позиция есть.
+    Позиции ошибок берутся из выравнивания ответа (по одному разу на уникальную пару).
+    """
+    lengths = np.fromiter((min(len(word), max_length) for word in columns.words), dtype=np.int64,
+                          count=len(columns.words))
+    attempts_by_length = np.bincount(lengths[columns.word_codes], minlength=max_length + 1)
+    # Попыток со словами длиннее p: обратная накопленная сумма
+    exposure = attempts_by_length[::-1].cumsum()[::-1][1:max_length + 1].astype(np.float64)
+
+    errors = np.zeros(max_length, dtype=np.float64)
+    word_codes, answer_codes, counts = columns.error_pairs()
+    for word_code, answer_code, count in zip(word_codes.tolist(), answer_codes.tolist(), counts.tolist()):
+        word = columns.words[word_code]
+        positions = {min(op.ci, len(word) - 1) for op in align(columns.answers[answer_code], word).ops
+                     if op.kind != 'equal'}
+        for position in positions:
+            if 0 <= position < max_length:
+                errors[position] += count
+    return np.divide(errors, exposure, out=np.zeros_like(errors), where=exposure > 0)
+
+
+def pattern_error_rates(columns):
+    """Доля ошибок по орфограммам: {тип: (попыток с орфограммой, попыток с такой ошибкой, доля)}
+
+    Ошибка засчитывается орфограмме, только если она есть в правильном слове: так доля
+    остается долей попыток, в которых правило было нарушено.
+    """
+    attempts_per_word = columns.attempts_per_word()
+    has_pattern = {kind: np.fromiter((bool(pattern.search(word.lower())) for word in columns.words),
+                                     dtype=bool, count=len(columns.words))
+                   for kind, pattern in PATTERNS.items()}
+
+    errors = dict.fromkeys(ERROR_LABELS, 0)
+    word_codes, answer_codes, counts = columns.error_pairs()
+    for word_code, answer_code, count in zip(word_codes.tolist(), answer_codes.tolist(), counts.tolist()):
+        for kind in set(classify_errors(columns.answers[answer_code], columns.words[word_code])):
+            if kind not in has_pattern or has_pattern[kind][word_code]:
+                errors[kind] += count
+
+    result = {}
+    for kind in ERROR_LABELS:
+        exposure = int(attempts_per_word[has_pattern[kind]].sum()) if kind in has_pattern else len(columns)
+        result[kind] = (exposure, errors[kind], errors[kind] / exposure if exposure else 0.0)
+    return result
+
+
+def error_rates_over_time(columns, bucket_days=1):
+    """Доля ошибок по периодам: [(начало периода ts, попыток, ошибок, доля)]"""
+    if not len(columns):
+        return []
+    buckets = (columns.ts // (DAY * bucket_days)).astype(np.int64)
+    first = buckets.min()
+    buckets -= first
+    attempts = np.bincount(buckets)
+    errors = np.bincount(buckets, weights=~columns.is_correct)
+    nonzero = np.nonzero(attempts)[0]
+    return [(float((first + index) * DAY * bucket_days), int(attempts[index]), int(errors[index]),
+             float(errors[index] / attempts[index])) for index in nonzero]
+
+
+def weak_words(columns, limit=20, candidates=None, min_attempts=2, half_life_days=14.0,
+               prior_weight=2.0, now=None):
+    """Слова с наибольшей недавней долей ошибок: [(слово, оценка, попыток, ошибок)]
+
+    Попытки взвешиваются по давности (вес вдвое меньше каждые half_life_days), доля ошибок
+    сглаживается к средней по всем попыткам, чтобы одна ошибка не ставила слово на первое место.
+    candidates ограничивает выбор словами текущего списка.
+    """
+    if not len(columns):
+        return []
+    now = now or time.time()
+    weights = 0.5 ** (np.maximum(now - columns.ts, 0) / (half_life_days * DAY))
+    weighted_attempts = np.bincount(columns.word_codes, weights=weights, minlength=len(columns.words))
+    weighted_errors = np.bincount(columns.word_codes, weights=weights * ~columns.is_correct,
+                                  minlength=len(columns.words))
+    prior = float((~columns.is_correct).mean())
+    scores = (weighted_errors + prior * prior_weight) / (weighted_attempts + prior_weight)
+
+    attempts = columns.attempts_per_word()
+    errors = columns.errors_per_word()
+    mask = (attempts >= min_attempts) & (errors > 0)
+    if candidates is not None:
+        wanted = set(candidates)
+        mask &= np.fromiter((word in wanted for word in columns.words), dtype=bool,
+                            count=len(columns.words))
+    codes = np.nonzero(mask)[0]
+    top = codes[np.argsort(-scores[codes], kind='stable')[:limit]]
+    return [(columns.words[code], float(scores[code]), int(attempts[code]), int(errors[code]))
+            for code in top]
+
+
+def weak_words_from_history(history, limit=20, candidates=None, days=90):
+    """Список трудных слов для тренировки по истории за последние days дней"""
+    columns = AttemptColumns.from_history(history, since=time.time() - days * DAY)
+    return [word for word, *_ in weak_words(columns, limit, candidates)]
+
+
+def main():
+    from attempt_history import AttemptHistory
+
+    parser = argparse.ArgumentParser(description="Анализ ошибок по истории попыток")
+    parser.add_argument('--db', default='spelling_history.db', help="файл базы SQLite")
+    parser.add_argument('--days', type=int, default=None, help="анализировать последние N дней")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    history = AttemptHistory(args.db)
+    started = time.perf_counter()
+    since = time.time() - args.days * DAY if args.days else None
+    columns = AttemptColumns.from_history(history, since)
+    history.close()
+    print(f"Загружено попыток: {len(columns)} за {time.perf_counter() - started:.2f} с")
+    if not len(columns):
+        return
+
+    print("\nСамые трудные слова:")
+    for word, attempts, errors, rate in word_error_rates(columns, min_attempts=3)[:args.limit]:
+        print(f"  {word}: ошибок {errors} из {attempts} ({rate * 100:.0f}%)")
+
+    print("\nОрфограммы:")
+    for kind, (exposure, errors, rate) in sorted(pattern_error_rates(columns).items(),
+                                                 key=lambda item: -item[1][2]):
+        if errors:
+            print(f"  {ERROR_LABELS[kind]}: {errors} ошибок на {exposure} попыток ({rate * 100:.1f}%)")
+
+    print("\nОшибки по позиции буквы:")
+    rates = position_error_rates(columns)
+    print("  " + " ".join(f"{position + 1}:{rate * 100:.1f}%" for position, rate in enumerate(rates) if rate))
+
+    print("\nПо неделям:")
+    for start, attempts, errors, rate in error_rates_over_time(columns, bucket_days=7):
+        print(f"  {time.strftime('%Y-%m-%d', time.localtime(start))}: {attempts} попыток, "
+              f"ошибок {rate * 100:.1f}%")
+
+    print("\nСлова для повторения:")
+    print("  " + ", ".join(word for word, *_ in weak_words(columns, args.limit)))
+    print(f"\nВсего {time.perf_counter() - started:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL,
+    answer TEXT,
+    is_correct INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    session_id TEXT,
+    response_ms INTEGER,
+    student TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_word_ts ON attempts(word, ts);
+CREATE INDEX IF NOT EXISTS idx_attempts_session ON attempts(session_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_ts ON attempts(ts);
+
+-- Дневные агрегаты по словам поддерживаются триггером, чтобы запросы
+-- за период не перебирали миллионы строк attempts
+CREATE TABLE IF NOT EXISTS word_daily (
+    day INTEGER NOT NULL,
+    word TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    PRIMARY KEY (day, word)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_attempts_daily AFTER INSERT ON attempts
+BEGIN
+    INSERT INTO word_daily (day, word, attempts, errors)
+    VALUES (CAST(NEW.ts / 86400 AS INTEGER), NEW.word, 1, 1 - NEW.is_correct)
+    ON CONFLICT(day, word) DO UPDATE SET
+        attempts = attempts + 1,
+        errors = errors + excluded.errors;
+END;
+"""
+
+
+class StudentHistory:
+    """Попытки одного ученика из общей истории класса (только итоги по словам)"""
+
+    def __init__(self, history, student):
+        self.history = history
+        self.student = student
+
+    def word_summary(self):
+        return self.history.word_summary(self.student)
+
+
+class AttemptHistory:
+    """Долговременная история попыток в SQLite с индексами по слову, сессии и времени"""
+
+    def __init__(self, db_path='spelling_history.db', batch_size=50):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        """Добавляет колонку ученика в базы, созданные до серверного режима"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(attempts)")}
+        if 'student' not in columns:
+            self.conn.execute("ALTER TABLE attempts ADD COLUMN student TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_attempts_student ON attempts(student, word)")
+
+    def record_attempt(self, word, answer, is_correct, session_id=None, response_time=None, ts=None,
+                       student=None):
+        """Записывает попытку (вставка выполняется пачками); student - ученик в общей истории класса"""
+        response_ms = int(response_time * 1000) if response_time is not None else None
+        row = (word, answer, int(bool(is_correct)), ts if ts is not None else time.time(),
+               session_id, response_ms, student)
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def record_many(self, rows, student=None):
+        """Записывает много попыток одной транзакцией: (word, answer, is_correct, ts, session_id, response_ms)
+
+        Все попытки пачки относятся к одному ученику student (как в record_attempt).
+        """
+        with self._lock:
+            self._flush_locked()
+            self.conn.executemany(
+                "INSERT INTO attempts (word, answer, is_correct, ts, session_id, response_ms, student) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (tuple(row) + (student,) for row in rows))
+            self.conn.commit()
+
+    def flush(self):
+        """Записывает накопленные попытки в базу"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "INSERT INTO attempts (word, answer, is_correct, ts, session_id, response_ms, student) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+        self.conn.commit()
+        self._pending = []
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._flush_locked()
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_chunks(self, sql, params=(), chunk_size=10000):
+        """Выдает строки запроса пачками, не загружая весь результат в память
+
+        Соединение общее с потоками, которые пишут попытки, поэтому каждая пачка
+        читается под блокировкой, а запись между пачками не ждет конца чтения.
+        """
+        with self._lock:
+            self._flush_locked()
+            cursor = self.conn.execute(sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            with self._lock:
+                cursor.close()
+
+    def words(self):
+        """Возвращает все слова истории (по индексу, не читая таблицу)"""
+        return [word for word, in self._query("SELECT DISTINCT word FROM attempts")]
+
+    def word_history(self, word, since=None, until=None):
+        """Возвращает попытки по слову: (answer, is_correct, ts, session_id, response_ms)"""
+        return self._query(
+            "SELECT answer, is_correct, ts, session_id, response_ms FROM attempts "
+            "WHERE word = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (word, since or 0, until or float('inf')))
+
+    def session_attempts(self, session_id):
+        """Возвращает попытки сессии: (word, answer, is_correct, ts, response_ms)"""
+        return self._query(
+            "SELECT word, answer, is_correct, ts, response_ms FROM attempts "
+            "WHERE session_id = ? ORDER BY id", (session_id,))
+
+    def attempts_between(self, since, until=None):
+        """Возвращает попытки за период: (word, answer, is_correct, ts, session_id, response_ms)"""
+        return self._query(
+            "SELECT word, answer, is_correct, ts, session_id, response_ms FROM attempts "
+            "WHERE ts >= ? AND ts < ? ORDER BY ts", (since, until or float('inf')))
+
+    def word_summary(self, student=None):
+        """Возвращает итоги по всем словам: {слово: (попыток, ошибок, время последней попытки)}
+
+        Со student учитываются только попытки этого ученика.
+        """
+        if student is not None:
+            rows = self._query(
+                "SELECT word, COUNT(*), SUM(1 - is_correct), MAX(ts) FROM attempts "
+                "WHERE student = ? GROUP BY word", (student,))
+            return {word: (attempts, errors, last_ts) for word, attempts, errors, last_ts in rows}
+        rows = self._query(
+            "SELECT word, SUM(attempts), SUM(errors), MAX(day) FROM word_daily GROUP BY word")
+        return {word: (attempts, errors, last_day * 86400) for word, attempts, errors, last_day in rows}
+
+    def for_student(self, student):
+        """История одного ученика для планировщика (create_scheduler(..., history))"""
+        return StudentHistory(self, student)
+
+    def hardest_words(self, limit=50, since=None, min_attempts=1):
+        """Возвращает самые трудные слова: [(слово, попыток, ошибок, доля ошибок)]"""
+        since_day = int(since // 86400) if since else 0
+        return self._query(
+            "SELECT word, SUM(attempts) AS n, SUM(errors) AS e, SUM(errors) * 1.0 / SUM(attempts) AS rate "
+            "FROM word_daily WHERE day >= ? GROUP BY word HAVING n >= ? "
+            "ORDER BY e DESC, rate DESC LIMIT ?",
+            (since_day, min_attempts, limit))
+
+    def import_json_stats(self, stats_file, session_id='import', student=None):
+        """Переносит в базу счетчики из файла статистики StatsManager, возвращает число попыток"""
+        with open(stats_file, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+
+        try:
+            ts = datetime.fromisoformat(stats.get('session_start', '')).timestamp()
+        except ValueError:
+            ts = os.path.getmtime(stats_file)
+
+        # В JSON есть только счетчики, поэтому ответы ученика неизвестны
+        rows = []
+        for word, data in stats.get('word_stats', {}).items():
+            correct = data.get('correct', 0)
+            errors = data.get('attempts', 0) - correct
+            rows.extend([(word, word, 1, ts, session_id, None)] * correct)
+            rows.extend([(word, None, 0, ts, session_id, None)] * errors)
+        self.record_many(rows, student)
+        return len(rows)
+
+    def close(self):
+        """Записывает накопленные попытки и закрывает базу"""
+        with self._lock:
+            self._flush_locked()
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="История попыток тренажера правописания")
+    parser.add_argument('--db', default='spelling_history.db', help="файл базы SQLite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="импортировать файлы статистики JSON")
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('--student', default=None, help="ученик, чьи это файлы (общая история класса)")
+
+    hardest_parser = subparsers.add_parser('hardest', help="показать самые трудные слова")
+    hardest_parser.add_argument('--days', type=int, default=30)
+    hardest_parser.add_argument('--limit', type=int, default=50)
+
+    args = parser.parse_args()
+    history = AttemptHistory(args.db)
+
+    if args.command == 'import':
+        for stats_file in args.files:
+            count = history.import_json_stats(stats_file, session_id=f"import:{os.path.basename(stats_file)}",
+                                              student=args.student)
+            print(f"{stats_file}: импортировано попыток: {count}")
+    elif args.command == 'hardest':
+        since = time.time() - args.days * 86400
+        for word, attempts, errors, rate in history.hardest_words(args.limit, since):
+            print(f"{word}: ошибок {errors} из {attempts} ({rate * 100:.0f}%)")
+
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
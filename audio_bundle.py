@@ -0,0 +1,208 @@
+import argparse
+import mmap
+import os
+import sys
+import threading
+import zlib
+
+
+class AudioBundle:
+    """Упакованное хранилище аудио: один файл данных и индекс ключ -> (смещение, длина, CRC32)
+
+    Файл данных читается через mmap, а get() возвращает срез memoryview без копирования.
+    Индекс - текстовый файл, в который новые записи только дописываются.
+    """
+
+    DATA_NAME = 'audio.bundle'
+    INDEX_NAME = 'audio.bundle.idx'
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.data_path = os.path.join(folder, self.DATA_NAME)
+        self.index_path = os.path.join(folder, self.INDEX_NAME)
+        self.index = {}
+        self._mmap = None
+        self._mapped_size = 0
+        self._lock = threading.Lock()
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self._load_index()
+
+    @classmethod
+    def exists(cls, folder):
+        """Проверяет, есть ли в папке упакованное хранилище"""
+        return bool(folder) and os.path.exists(os.path.join(folder, cls.INDEX_NAME))
+
+    @classmethod
+    def open_if_exists(cls, folder):
+        """Открывает хранилище, если оно есть в папке"""
+        return cls(folder) if cls.exists(folder) else None
+
+    def ref(self, key):
+        """Условный путь записи 'audio.bundle#ключ': у каждого слова свой, но это не файл"""
+        return f"{self.data_path}#{key}"
+
+    def _load_index(self):
+        """Загружает индекс; неполная последняя строка (обрыв записи) отбрасывается"""
+        if not os.path.exists(self.index_path):
+            return
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    key, offset, length, checksum = line.rstrip('\n').split('\t')
+                    offset, length, checksum = int(offset), int(length), int(checksum)
+                except ValueError:
+                    continue
+                if offset < 0:
+                    # Запись удалена из хранилища
+                    self.index.pop(key, None)
+                elif offset + length <= data_size:
+                    self.index[key] = (offset, length, checksum)
+
+    def _ensure_mapped(self, end):
+        """Отображает файл данных в память так, чтобы он покрывал байт end"""
+        if self._mmap is not None and end <= self._mapped_size:
+            return
+        with open(self.data_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # Старое отображение закроется само, когда на него не останется ссылок
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            self._mapped_size = size
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        """Возвращает ключи всех записей"""
+        return self.index.keys()
+
+    def get(self, key, verify=False):
+        """Возвращает данные записи как memoryview (без копирования) или None"""
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            offset, length, checksum = entry
+            self._ensure_mapped(offset + length)
+            view = memoryview(self._mmap)[offset:offset + length]
+        if verify and zlib.crc32(view) != checksum:
+            raise ValueError(f"Повреждена запись '{key}' в {self.data_path}")
+        return view
+
+    def append(self, key, data):
+        """Дописывает запись в конец файла данных и индекса"""
+        with self._lock:
+            with open(self.data_path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            checksum = zlib.crc32(data)
+            # Индекс пишем после данных: при обрыве запись просто не попадет в индекс
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(f"{key}\t{offset}\t{len(data)}\t{checksum}\n")
+            self.index[key] = (offset, len(data), checksum)
+
+    def add_alias(self, new_key, existing_key):
+        """Добавляет в индекс второй ключ для уже записанных данных"""
+        with self._lock:
+            entry = self.index.get(existing_key)
+            if entry is None:
+                raise KeyError(existing_key)
+            offset, length, checksum = entry
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(f"{new_key}\t{offset}\t{length}\t{checksum}\n")
+            self.index[new_key] = entry
+
+    def discard(self, key):
+        """Исключает запись из индекса (данные остаются в файле до переупаковки)"""
+        with self._lock:
+            if key not in self.index:
+                return
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(f"{key}\t-1\t0\t0\n")
+            del self.index[key]
+
+    def append_file(self, key, file_path):
+        """Дописывает содержимое файла как запись хранилища"""
+        with open(file_path, 'rb') as f:
+            self.append(key, f.read())
+
+    def pack_folder(self, extensions=('.mp3', '.wav'), remove_files=False):
+        """Упаковывает отдельные аудиофайлы папки в хранилище, возвращает число добавленных"""
+        added = 0
+        for entry in sorted(os.scandir(self.folder), key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            key, extension = os.path.splitext(entry.name)
+            if extension not in extensions:
+                continue
+            if key not in self.index:
+                self.append_file(key, entry.path)
+                added += 1
+            if remove_files:
+                os.remove(entry.path)
+        return added
+
+    def verify(self):
+        """Проверяет контрольные суммы всех записей, возвращает список поврежденных ключей"""
+        return [key for key in list(self.index) if not self._is_valid(key)]
+
+    def _is_valid(self, key):
+        try:
+            self.get(key, verify=True)
+            return True
+        except ValueError:
+            return False
+
+    def close(self):
+        """Закрывает отображение файла данных"""
+        with self._lock:
+            self._mmap = None
+            self._mapped_size = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Упаковка папки аудиофайлов в единое хранилище")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    pack_parser = subparsers.add_parser('pack', help="упаковать (или дополнить) хранилище файлами папки")
+    pack_parser.add_argument('folder')
+    pack_parser.add_argument('--remove', action='store_true', help="удалить упакованные файлы")
+
+    info_parser = subparsers.add_parser('info', help="показать сведения о хранилище")
+    info_parser.add_argument('folder')
+
+    verify_parser = subparsers.add_parser('verify', help="проверить контрольные суммы")
+    verify_parser.add_argument('folder')
+
+    args = parser.parse_args(argv)
+    # Только упаковка создает хранилище; info и verify папку не трогают
+    bundle = AudioBundle(args.folder) if args.command == 'pack' else AudioBundle.open_if_exists(args.folder)
+    if bundle is None:
+        print(f"В папке {args.folder} нет хранилища")
+        return 1
+
+    if args.command == 'pack':
+        added = bundle.pack_folder(remove_files=args.remove)
+        print(f"Добавлено записей: {added}, всего: {len(bundle)}")
+    elif args.command == 'info':
+        size = os.path.getsize(bundle.data_path) if os.path.exists(bundle.data_path) else 0
+        print(f"Записей: {len(bundle)}, размер данных: {size} байт")
+    elif args.command == 'verify':
+        damaged = bundle.verify()
+        for key in damaged:
+            print(f"Повреждена запись: {key}")
+        print(f"Проверено записей: {len(bundle)}, повреждено: {len(damaged)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+class AudioCache:
+    """LRU-кэш декодированных звуков (pygame.mixer.Sound) с ограничением по памяти"""
+
+    def __init__(self, loader, max_bytes=64 * 1024 * 1024):
+        # loader(word) должен вернуть декодированный pygame.mixer.Sound
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+
+        # Фоновая предзагрузка: обрабатывается только последний запрошенный список
+        self._prefetch_words = []
+        self._prefetch_cond = threading.Condition()
+        self._prefetch_thread = None
+
+    def get(self, word):
+        """Возвращает звук слова из кэша, при промахе декодирует его"""
+        with self._lock:
+            item = self._items.get(word)
+            if item is not None:
+                self._items.move_to_end(word)
+                self.hits += 1
+                metrics.count('audio.sound_cache.hits')
+                return item[0]
+            self.misses += 1
+            metrics.count('audio.sound_cache.misses')
+        return self._load(word)
+
+    def contains(self, word):
+        """Проверяет, есть ли слово в кэше"""
+        with self._lock:
+            return word in self._items
+
+    def _load(self, word):
+        """Декодирует слово, не допуская параллельной загрузки одного и того же слова"""
+        with self._lock:
+            event = self._loading.get(word)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._loading[word] = event
+
+        if not owner:
+            # Слово уже загружается другим потоком - ждем результат
+            event.wait()
+            with self._lock:
+                item = self._items.get(word)
+            if item is not None:
+                return item[0]
+            return self.loader(word)
+
+        try:
+            sound = self.loader(word)
+            self._store(word, sound)
+            return sound
+        finally:
+            with self._lock:
+                del self._loading[word]
+            event.set()
+
+    def _store(self, word, sound):
+        """Добавляет звук в кэш и вытесняет давно не использованные"""
+        size = self.sound_size(sound)
+        with self._lock:
+            old = self._items.pop(word, None)
+            if old is not None:
+                self._size -= old[1]
+            # Звук больше всего бюджета не кэшируем
+            if size > self.max_bytes:
+                return
+            self._items[word] = (sound, size)
+            self._size += size
+            while self._size > self.max_bytes and self._items:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, word):
+        """Удаляет слово из кэша"""
+        with self._lock:
+            item = self._items.pop(word, None)
+            if item is not None:
+                self._size -= item[1]
+
+    def clear(self):
+        """Очищает кэш"""
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def memory_usage(self):
+        """Возвращает объем памяти, занятый декодированными звуками (в байтах)"""
+        with self._lock:
+            return self._size
+
+    def prefetch(self, words):
+        """Загружает слова в кэш в фоновом потоке"""
+        with self._prefetch_cond:
+            self._prefetch_words = list(words)
+            if self._prefetch_thread is None:
+                self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+                self._prefetch_thread.start()
+            self._prefetch_cond.notify()
+
+    def _prefetch_loop(self):
+        """Рабочий цикл фоновой предзагрузки"""
+        while True:
+            with self._prefetch_cond:
+                while not self._prefetch_words:
+                    self._prefetch_cond.wait()
+                word = self._prefetch_words.pop(0)
+
+            if self.contains(word):
+                continue
+            try:
+                self._load(word)
+            except Exception as e:
+                print(f"Ошибка предзагрузки аудио для '{word}': {e}")
+
+    @staticmethod
+    def sound_size(sound):
+        """Оценивает объем декодированного звука в байтах"""
+        import pygame
+        mixer_params = pygame.mixer.get_init()
+        if not mixer_params:
+            return 0
+        frequency, sample_format, channels = mixer_params
+        return int(sound.get_length() * frequency * channels * abs(sample_format) // 8)
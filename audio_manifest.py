@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+
+
+class AudioManifest:
+    """Манифест кэша аудио: ключ (хэш нормализованного текста, языка и движка) -> сведения о файле
+
+    Все проверки выполняются по словарю в памяти, без обращения к диску для каждого слова.
+    Манифест сохраняется атомарно и не чаще, чем раз в save_interval секунд.
+    """
+
+    FILE_NAME = 'manifest.json'
+    EXTENSION = '.mp3'
+    # Обработанные клипы (audio_transcode) хранятся в WAV
+    WAV_EXTENSION = '.wav'
+    PART_SUFFIX = '.part'
+    # Более свежие временные файлы могут дописываться другим процессом (приложение рядом с проверкой)
+    PART_MAX_AGE = 600.0
+    KEY_LENGTH = 32
+
+    def __init__(self, folder, max_bytes=None, save_interval=2.0):
+        self.folder = folder
+        self.path = os.path.join(folder, self.FILE_NAME)
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self.entries = {}
+        self.total_bytes = 0
+
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._legacy_files = {}
+
+        self.load()
+
+    @staticmethod
+    def normalize_text(word):
+        """Нормализует текст для ключа: NFC, схлопывание пробелов, нижний регистр (ё сохраняется)"""
+        return unicodedata.normalize('NFC', " ".join(word.split())).lower()
+
+    @classmethod
+    def make_key(cls, word, lang='ru', engine='gtts'):
+        """Вычисляет ключ аудио без коллизий между разными словами"""
+        payload = f"{engine}\0{lang}\0{cls.normalize_text(word)}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()[:cls.KEY_LENGTH]
+
+    def file_path(self, key, extension=None):
+        """Возвращает путь к аудиофайлу по ключу (расширение берется из записи манифеста)"""
+        if extension is None:
+            extension = self.entries.get(key, {}).get('ext', self.EXTENSION)
+        return os.path.join(self.folder, key + extension)
+
+    def load(self):
+        """Загружает манифест и запоминает файлы старого формата для миграции"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+        except Exception as e:
+            print(f"Ошибка загрузки манифеста аудио: {e}")
+            self.entries = {}
+        self.total_bytes = sum(entry.get('size', 0) for entry in self.entries.values())
+
+        # Единственный просмотр папки: файлы, названные по старой схеме (_make_safe_filename)
+        self._legacy_files = {}
+        if os.path.isdir(self.folder):
+            now = time.time()
+            for entry in os.scandir(self.folder):
+                if entry.name.endswith(self.PART_SUFFIX):
+                    # Остаток оборванной записи
+                    if self._is_stale(entry, now):
+                        self._remove_quietly(entry.path)
+                    continue
+                if not entry.name.endswith(self.EXTENSION):
+                    continue
+                stem = entry.name[:-len(self.EXTENSION)]
+                if stem not in self.entries and not self._looks_like_key(stem):
+                    self._legacy_files[stem] = entry.path
+
+    def _is_stale(self, entry, now):
+        try:
+            return now - entry.stat().st_mtime > self.PART_MAX_AGE
+        except OSError:
+            return False
+
+    @staticmethod
+    def _remove_quietly(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _looks_like_key(self, name):
+        return len(name) == self.KEY_LENGTH and all(c in '0123456789abcdef' for c in name)
+
+    def save(self, force=True):
+        """Атомарно сохраняет манифест (без force - только если прошло save_interval секунд)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.monotonic()
+            if not force and now - self._last_save < self.save_interval:
+                return
+            data = json.dumps({'version': 1, 'entries': self.entries}, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = now
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Ошибка сохранения манифеста аудио: {e}")
+
+    def lookup(self, key):
+        """Возвращает запись по ключу и отмечает ее использование"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['last_used'] = time.time()
+                self._dirty = True
+            return entry
+
+    def add(self, key, word, size, checksum=None, extension=None, duration=None):
+        """Регистрирует сгенерированный файл и при необходимости освобождает место
+
+        extension указывается для файлов не в MP3, duration - длительность клипа в секундах.
+        """
+        with self._lock:
+            old = self.entries.get(key)
+            if old is not None:
+                self.total_bytes -= old.get('size', 0)
+                if old.get('ext', self.EXTENSION) != (extension or self.EXTENSION):
+                    # Клип заменен файлом другого формата - прежний файл больше не нужен
+                    self._remove_quietly(self.file_path(key))
+            self.entries[key] = {'word': word, 'size': size, 'last_used': time.time()}
+            if checksum is not None:
+                self.entries[key]['crc32'] = checksum
+            if extension and extension != self.EXTENSION:
+                self.entries[key]['ext'] = extension
+            if duration is not None:
+                self.entries[key]['duration'] = round(duration, 3)
+            self.total_bytes += size
+            self._dirty = True
+            self._enforce_quota(protected_key=key)
+        self.save(force=False)
+
+    def remove(self, key, delete_file=True):
+        """Удаляет запись (и файл) из кэша"""
+        with self._lock:
+            path = self.file_path(key)
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+            self.total_bytes -= entry.get('size', 0)
+            self._dirty = True
+        if delete_file:
+            self._remove_quietly(path)
+
+    def _enforce_quota(self, protected_key=None):
+        """Вытесняет давно не использованные файлы, пока кэш не уложится в квоту"""
+        if not self.max_bytes or self.total_bytes <= self.max_bytes:
+            return
+        by_age = sorted(self.entries.items(), key=lambda item: item[1].get('last_used', 0))
+        for key, _ in by_age:
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key != protected_key:
+                self.remove(key)
+
+    def has_legacy_files(self):
+        """Есть ли файлы старого формата, ожидающие миграции"""
+        return bool(self._legacy_files)
+
+    def migrate_legacy(self, words, make_key, legacy_name, bundle=None):
+        """Переносит файлы старого формата на новые ключи
+
+        Переносится только файл, старое имя которого совпадает со словом (замен на '_'
+        не было): тогда имя однозначно определяет слово. Файлы с замененными символами
+        могли принадлежать другому слову ('_ж' - и 'ёж', и 'уж' с заменой), поэтому
+        удаляются, и слово будет сгенерировано заново. Возвращает число перенесенных файлов.
+        """
+        with self._lock:
+            migrated = 0
+            for word in dict.fromkeys(words):
+                name = legacy_name(word)
+                in_bundle = bundle is not None and name in bundle
+                if name not in self._legacy_files and not in_bundle:
+                    continue
+                if name != word or '_' in name:
+                    # Имя с потерями - файлу нельзя доверять
+                    legacy_path = self._legacy_files.pop(name, None)
+                    if legacy_path:
+                        self._remove_quietly(legacy_path)
+                    if in_bundle:
+                        bundle.discard(name)
+                    continue
+
+                key = make_key(word)
+                if key in self.entries or (bundle is not None and key in bundle):
+                    continue
+                if in_bundle:
+                    bundle.add_alias(key, name)
+                    migrated += 1
+                    continue
+                legacy_path = self._legacy_files.pop(name)
+                try:
+                    os.replace(legacy_path, self.file_path(key))
+                    size = os.path.getsize(self.file_path(key))
+                except OSError as e:
+                    print(f"Ошибка миграции аудиофайла '{legacy_path}': {e}")
+                    continue
+                self.entries[key] = {'word': word, 'size': size, 'last_used': time.time()}
+                self.total_bytes += size
+                self._dirty = True
+                migrated += 1
+
+        self.save()
+        return migrated
@@ -1,104 +1,469 @@
-import pygame
-from gtts import gTTS
+import io
 import os
+import sys
 import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from audio_bundle import AudioBundle
+from audio_cache import AudioCache
+from audio_manifest import AudioManifest
+import metrics
+from playback_worker import PlaybackWorker
+from tts_engines import create_engine
+
+
+class RateLimiter:
+    """Ограничивает общее число запросов в секунду для всех потоков"""
+
+    def __init__(self, requests_per_second=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Ждет, пока не освободится слот для следующего запроса"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
 
 
 class AudioPlayer:
-    def __init__(self, audio_folder=None):
-        pygame.mixer.init()
+    def __init__(self, audio_folder=None, tts_backend=None, max_workers=4,
+                 max_retries=3, retry_delay=0.5, requests_per_second=5.0,
+                 cache_max_bytes=64 * 1024 * 1024, disk_quota_bytes=None, tts_lang='ru',
+                 init_mixer=True, batch_size=50, transcode=False, transcode_workers=None):
+        # Звук инициализируется в фоне, чтобы окно появлялось сразу; первое
+        # воспроизведение ждет окончания инициализации. Серверу звук не нужен.
+        self.mixer_ready = threading.Event()
+        self.mixer_error = None
+        self.mixer_init_seconds = None
+        if init_mixer:
+            threading.Thread(target=self._init_mixer, name='mixer-init', daemon=True).start()
+        else:
+            self.mixer_ready.set()
         self.audio_folder = audio_folder
         if audio_folder and not os.path.exists(audio_folder):
             os.makedirs(audio_folder)
 
+        # Упакованное хранилище используется, если оно есть в папке
+        self.bundle = AudioBundle.open_if_exists(audio_folder)
+
+        # Манифест кэша: ключи зависят от текста, языка и движка TTS
+        self.disk_quota_bytes = disk_quota_bytes
+        self.manifest = AudioManifest(audio_folder, disk_quota_bytes) if audio_folder else None
+
+        # Параметры пула генерации аудио. tts_backend - движок из tts_engines
+        # или функция backend(word, file_path)
+        self.tts_backend = tts_backend or create_engine('gtts', lang=tts_lang)
+        self.tts_engine_name = getattr(self.tts_backend, 'engine_name', 'gtts')
+        self.tts_lang = tts_lang
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.batch_size = max(1, batch_size)
+        # Локальным движкам ограничение частоты запросов не нужно
+        self.rate_limiter = RateLimiter(requests_per_second
+                                        if getattr(self.tts_backend, 'network', True) else None)
+
+        # Необязательная обработка клипов после синтеза (audio_transcode): обрезка тишины,
+        # выравнивание громкости, WAV в формате микшера. Пул процессов создается при первой нужде
+        self.transcode = transcode
+        self.transcode_workers = transcode_workers
+        self._transcoder = None
+        self._transcoder_lock = threading.Lock()
+
+        # Кэш декодированных звуков для мгновенного повтора и перехода к следующему слову
+        self.audio_cache = AudioCache(self._load_sound, max_bytes=cache_max_bytes)
+
+        # Один постоянный поток воспроизведения вместо потока на каждое слово
+        self.playback = PlaybackWorker(self.audio_cache.get)
+
+    def _init_mixer(self):
+        """Импортирует pygame и инициализирует микшер (выполняется в фоновом потоке)"""
+        started = time.perf_counter()
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception as e:
+            self.mixer_error = e
+            print(f"Ошибка инициализации звука: {e}")
+        finally:
+            self.mixer_init_seconds = time.perf_counter() - started
+            self.mixer_ready.set()
+
+    def wait_for_mixer(self, timeout=None):
+        """Ждет окончания фоновой инициализации звука, если она еще идет"""
+        if not self.mixer_ready.wait(timeout):
+            raise TimeoutError("Звук еще не инициализирован")
+        if self.mixer_error is not None:
+            raise RuntimeError(f"Звук недоступен: {self.mixer_error}")
+
     def set_audio_folder(self, folder_path):
         """Устанавливает папку для аудиофайлов"""
         self.audio_folder = folder_path
         if not os.path.exists(folder_path):
             os.makedirs(folder_path)
+        if self.bundle:
+            self.bundle.close()
+        self.bundle = AudioBundle.open_if_exists(folder_path)
+        if self.manifest:
+            self.manifest.save()
+        self.manifest = AudioManifest(folder_path, self.disk_quota_bytes)
+        self.audio_cache.clear()
 
-    def generate_audio_file(self, word):
-        """Генерирует аудиофайл для слова, если он не существует"""
+    def pack_audio_folder(self, remove_files=True):
+        """Упаковывает аудиофайлы папки в единое хранилище и переключается на него"""
         if not self.audio_folder:
             raise ValueError("Папка для аудиофайлов не установлена")
+        if not self.bundle:
+            self.bundle = AudioBundle(self.audio_folder)
+        added = self.bundle.pack_folder(remove_files=remove_files)
+        if remove_files:
+            # Упакованные слова больше не занимают место в кэше отдельных файлов
+            for key in list(self.manifest.entries):
+                if key in self.bundle:
+                    self.manifest.remove(key, delete_file=False)
+            self.manifest.save()
+        return added
 
-        # Создаем безопасное имя файла
-        safe_filename = self._make_safe_filename(word)
-        file_path = os.path.join(self.audio_folder, f"{safe_filename}.mp3")
+    def _audio_path(self, word):
+        """Возвращает путь к аудиофайлу слова"""
+        return self.manifest.file_path(self._audio_key(word))
 
-        # Если файл уже существует, не генерируем заново
-        if os.path.exists(file_path):
-            return file_path
+    def _audio_key(self, word):
+        """Возвращает ключ аудио слова (имя файла без расширения и ключ в хранилище)"""
+        return AudioManifest.make_key(word, self.tts_lang, self.tts_engine_name)
 
+    def has_audio(self, word):
+        """Проверяет по манифесту в памяти (без обращения к диску), есть ли аудио для слова"""
+        if not self.audio_folder:
+            return False
+        key = self._audio_key(word)
+        return bool(self.bundle and key in self.bundle) or key in self.manifest.entries
+
+    def evict_words(self, words):
+        """Удаляет аудио слов из кэша на диске, хранилища и кэша звуков; возвращает число слов"""
+        if not self.audio_folder:
+            return 0
+        evicted = 0
+        for word in words:
+            key = self._audio_key(word)
+            found = key in self.manifest.entries or bool(self.bundle and key in self.bundle)
+            if self.bundle:
+                self.bundle.discard(key)
+            self.manifest.remove(key)
+            self.audio_cache.invalidate(word)
+            evicted += found
+        self.manifest.save()
+        return evicted
+
+    def _migrate_legacy_files(self, words):
+        """Однократно переносит файлы, названные по старой схеме, на новые ключи"""
+        if self.manifest.has_legacy_files() or self.bundle:
+            migrated = self.manifest.migrate_legacy(words, self._audio_key, self._make_safe_filename,
+                                                    self.bundle)
+            if migrated:
+                print(f"Перенесено аудиофайлов старого формата: {migrated}")
+
+    def generate_audio_file(self, word):
+        """Генерирует аудиофайл для слова, если он не существует
+
+        Для слов из упакованного хранилища возвращается AudioBundle.ref(ключ), а не путь к файлу.
+        """
+        if not self.audio_folder:
+            raise ValueError("Папка для аудиофайлов не установлена")
+
+        cached_path = self._cached_path(word)
+        if cached_path is not None:
+            return cached_path
+
+        # Пишем во временный файл: оборванная запись не должна выглядеть как готовый кэш
+        tmp_path = self._tmp_path(word)
         try:
-            # Генерируем аудио
-            tts = gTTS(text=word, lang='ru')
-            tts.save(file_path)
-            return file_path
+            # Генерируем аудио с повторными попытками
+            self._synthesize_with_retry(word, tmp_path)
+            return self._commit_audio(word, tmp_path)
         except Exception as e:
+            self._remove_quietly(tmp_path)
+            metrics.count('audio.generate.failures')
             raise Exception(f"Ошибка генерации аудио для слова '{word}': {e}")
 
-    def generate_all_audio_files(self, words, progress_callback=None):
-        """Генерирует аудиофайлы для всех слов"""
+    def _cached_path(self, word):
+        """Возвращает путь к готовому аудио слова или None, если его нужно синтезировать"""
+        # Слово уже упаковано в хранилище
+        key = self._audio_key(word)
+        if self.bundle and key in self.bundle:
+            metrics.count('audio.generate.cache_hits')
+            return self.bundle.ref(key)
+
+        # Если файл уже есть в кэше, не генерируем заново
+        if self.manifest.lookup(key) is not None:
+            metrics.count('audio.generate.cache_hits')
+            return self.manifest.file_path(key)
+        metrics.count('audio.generate.cache_misses')
+        return None
+
+    def _tmp_path(self, word):
+        """Временный файл для синтеза слова (уникален для процесса и потока)"""
+        file_path = self.manifest.file_path(self._audio_key(word))
+        return f"{file_path}.{os.getpid()}.{threading.get_ident()}{AudioManifest.PART_SUFFIX}"
+
+    def _commit_audio(self, word, tmp_path):
+        """Переносит синтезированный временный файл в кэш и возвращает путь к аудио"""
+        key = self._audio_key(word)
+        # Без обработки клип хранится в формате движка (pyttsx3 пишет WAV)
+        extension = getattr(self.tts_backend, 'extension', AudioManifest.EXTENSION)
+        duration = None
+        if self.transcode:
+            tmp_path, duration = self._transcode_tmp(tmp_path)
+            if duration is not None:
+                extension = AudioManifest.WAV_EXTENSION
+        file_path = self.manifest.file_path(key, extension)
+        with open(tmp_path, 'rb') as f:
+            data = f.read()
+        if not data:
+            raise ValueError("TTS вернул пустой файл")
+
+        # При работе с хранилищем новые слова дописываются в него
+        if self.bundle:
+            self.bundle.append(key, data)
+            os.remove(tmp_path)
+            return self.bundle.ref(key)
+
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        self.manifest.add(key, word, len(data), zlib.crc32(data), extension, duration)
+        return file_path
+
+    def _get_transcoder(self):
+        """Создает пул обработки клипов в формате микшера"""
+        with self._transcoder_lock:
+            if self._transcoder is None:
+                from audio_transcode import Transcoder
+                frequency, channels = 44100, 2
+                # Без звукового устройства (или без микшера на сервере) клипы все равно
+                # обрабатываются - в формате по умолчанию
+                self.mixer_ready.wait()
+                pygame = sys.modules.get('pygame') if self.mixer_error is None else None
+                mixer_params = pygame.mixer.get_init() if pygame else None
+                if mixer_params:
+                    frequency, _, channels = mixer_params
+                self._transcoder = Transcoder(frequency, channels, self.transcode_workers)
+            return self._transcoder
+
+    def _transcode_tmp(self, tmp_path):
+        """Обрабатывает синтезированный файл; возвращает (путь к результату, длительность)
+
+        При ошибке обработки остается исходный файл (длительность None).
+        """
+        wav_path = f"{tmp_path}{AudioManifest.WAV_EXTENSION}{AudioManifest.PART_SUFFIX}"
+        try:
+            with metrics.timer('audio.transcode'):
+                duration, lead_trimmed = self._get_transcoder().transcode(tmp_path, wav_path)
+        except Exception as e:
+            print(f"Ошибка обработки аудио {tmp_path}: {e}")
+            metrics.count('audio.transcode.failures')
+            self._remove_quietly(wav_path)
+            return tmp_path, None
+        metrics.observe('audio.trimmed_lead_silence', lead_trimmed)
+        os.remove(tmp_path)
+        return wav_path, duration
+
+    def clip_duration(self, word):
+        """Длительность обработанного клипа слова из манифеста (None, если неизвестна)"""
         if not self.audio_folder:
-            raise ValueError("Папка для аудиофайлов не установлена")
+            return None
+        return self.manifest.entries.get(self._audio_key(word), {}).get('duration')
 
-        generated_files = []
-        total_words = len(words)
+    @staticmethod
+    def _remove_quietly(path):
+        """Удаляет файл, если он есть"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
-        for i, word in enumerate(words):
+    def _synthesize_with_retry(self, word, file_path):
+        """Вызывает TTS с ограничением частоты и экспоненциальной задержкой между попытками"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
             try:
-                file_path = self.generate_audio_file(word)
-                generated_files.append(file_path)
+                with metrics.timer('tts.synthesize'):
+                    self.tts_backend(word, file_path)
+                return
+            except Exception:
+                metrics.count('tts.errors')
+                if attempt >= self.max_retries:
+                    raise
+                metrics.count('tts.retries')
+                time.sleep(self.retry_delay * (2 ** attempt))
+
+    def generate_all_audio_files(self, words, progress_callback=None, max_workers=None,
+                                 ready_callback=None, cancel_event=None):
+        """Генерирует аудиофайлы для всех слов пулом потоков
+
+        Слова ставятся в очередь в переданном порядке. ready_callback(word, file_path)
+        вызывается для каждого обработанного слова (file_path равен None при ошибке).
+        Движки с пакетным синтезом (supports_batch) озвучивают слова пачками по batch_size.
+        Когда установлен cancel_event (threading.Event), новые слова не озвучиваются:
+        ждущие задачи снимаются, дорабатывают только уже начатые.
+        """
+        if not self.audio_folder:
+            raise ValueError("Папка для аудиофайлов не установлена")
+
+        self._migrate_legacy_files(words)
+
+        # Повторяющиеся слова генерируем один раз
+        unique_words = list(dict.fromkeys(words))
+        total_words = len(unique_words)
+        file_paths = {}
+        done = 0
 
-                # Вызываем callback для обновления прогресса
+        def report(word, file_path, error=None):
+            # Прогресс сообщается из вызывающего потока по мере завершения задач
+            nonlocal done
+            done += 1
+            progress = done / total_words * 100
+            if error is None:
+                file_paths[word] = file_path
                 if progress_callback:
-                    progress = (i + 1) / total_words * 100
                     progress_callback(progress, word)
+            else:
+                print(f"Ошибка генерации файла для '{word}': {error}")
+                if progress_callback:
+                    progress_callback(progress, f"Ошибка: {word}")
+            if ready_callback:
+                ready_callback(word, file_paths.get(word))
+
+        if getattr(self.tts_backend, 'supports_batch', False):
+            self._generate_batched(unique_words, report, cancel_event)
+        else:
+            workers = max(1, min(max_workers or self.max_workers, total_words or 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self.generate_audio_file, word): word for word in unique_words}
+                for future in as_completed(futures):
+                    if cancel_event is not None and cancel_event.is_set():
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                    word = futures[future]
+                    try:
+                        report(word, future.result())
+                    except Exception as e:
+                        report(word, None, e)
+
+        self.manifest.save()
+        return [file_paths[word] for word in words if word in file_paths]
+
+    def _generate_batched(self, words, report, cancel_event=None):
+        """Озвучивает недостающие слова пачками одним вызовом движка на пачку"""
+        missing = []
+        for word in words:
+            cached_path = self._cached_path(word)
+            if cached_path is not None:
+                report(word, cached_path)
+            else:
+                missing.append(word)
 
+        for start in range(0, len(missing), self.batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            batch = [(word, self._tmp_path(word)) for word in missing[start:start + self.batch_size]]
+            try:
+                with metrics.timer('tts.synthesize_batch'):
+                    errors = self.tts_backend.synthesize_batch(batch)
             except Exception as e:
-                print(f"Ошибка генерации файла для '{word}': {e}")
-                if progress_callback:
-                    progress_callback((i + 1) / total_words * 100, f"Ошибка: {word}")
+                errors = {word: e for word, _ in batch}
 
-        return generated_files
+            for word, tmp_path in batch:
+                try:
+                    if word in errors:
+                        # Неудавшиеся в пачке слова пробуем по одному, с повторами
+                        self._remove_quietly(tmp_path)
+                        report(word, self.generate_audio_file(word))
+                    else:
+                        report(word, self._commit_audio(word, tmp_path))
+                except Exception as e:
+                    self._remove_quietly(tmp_path)
+                    report(word, None, e)
 
-    def speak_word(self, word, callback=None):
-        """Воспроизводит слово из сгенерированного файла"""
-        thread = threading.Thread(target=self._speak_word_thread, args=(word, callback))
-        thread.daemon = True
-        thread.start()
+    def speak_word(self, word, callback=None, on_complete=None):
+        """Воспроизводит слово из сгенерированного файла, прерывая текущее
 
-    def _speak_word_thread(self, word, callback):
-        """Вспомогательный метод для воспроизведения в отдельном потоке"""
-        try:
-            if not self.audio_folder:
-                raise ValueError("Папка для аудиофайлов не установлена")
+        callback(error_message) вызывается при ошибке, on_complete(word) - по окончании звука.
+        """
+        self.playback.play(word, on_complete=on_complete, on_error=callback)
 
-            # Формируем путь к файлу
-            safe_filename = self._make_safe_filename(word)
-            file_path = os.path.join(self.audio_folder, f"{safe_filename}.mp3")
+    def replay_word(self, callback=None, on_complete=None):
+        """Повторяет последнее воспроизведенное слово"""
+        self.playback.replay(on_complete=on_complete, on_error=callback)
 
-            if not os.path.exists(file_path):
-                # Если файл не существует, генерируем его
-                file_path = self.generate_audio_file(word)
+    def stop_playback(self):
+        """Останавливает воспроизведение"""
+        self.playback.stop()
 
-            # Воспроизводим аудио
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.play()
+    def get_start_latency(self):
+        """Возвращает последнюю измеренную задержку запуска воспроизведения (в секундах)"""
+        return self.playback.last_start_latency
 
-            # Ждем завершения воспроизведения
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
+    def prefetch(self, words):
+        """Заранее декодирует следующие слова в кэш"""
+        if self.audio_folder:
+            self.audio_cache.prefetch(words)
 
-        except Exception as e:
-            # Передаем ошибку через callback
-            if callback:
-                callback(str(e))
+    def read_audio(self, word):
+        """Возвращает (ключ, байты) аудио слова, генерируя его при необходимости"""
+        file_path = self.generate_audio_file(word)
+        key = self._audio_key(word)
+        if self.bundle:
+            data = self.bundle.get(key)
+            if data is not None:
+                return key, bytes(data)
+        try:
+            with open(file_path, 'rb') as f:
+                return key, f.read()
+        except FileNotFoundError:
+            # Файл удален вне программы - забываем его и генерируем заново
+            self.manifest.remove(key, delete_file=False)
+            with open(self.generate_audio_file(word), 'rb') as f:
+                return key, f.read()
+
+    def _load_sound(self, word):
+        """Загружает и декодирует звук слова (генерирует файл при необходимости)"""
+        if not self.audio_folder:
+            raise ValueError("Папка для аудиофайлов не установлена")
+
+        file_path = self.generate_audio_file(word)
+        self.wait_for_mixer()
+        import pygame
+        key = self._audio_key(word)
+        if self.bundle:
+            data = self.bundle.get(key)
+            if data is not None:
+                # Запись читается из mmap: BytesIO копирует только ее, файл с диска не открывается
+                with metrics.timer('audio.decode'):
+                    return pygame.mixer.Sound(file=io.BytesIO(data))
+
+        try:
+            with metrics.timer('audio.decode'):
+                return pygame.mixer.Sound(file_path)
+        except Exception:
+            if os.path.exists(file_path):
+                raise
+            # Файл удален вне программы - забываем его и генерируем заново
+            self.manifest.remove(key, delete_file=False)
+            return pygame.mixer.Sound(self.generate_audio_file(word))
 
     def _make_safe_filename(self, word):
-        """Создает безопасное имя файла из слова"""
+        """Создает имя файла по старой схеме (используется только для миграции)"""
         # Заменяем небезопасные символы
         safe_chars = "абвгдежзийклмнопрстуфхцчшщъыьэюяАБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯabcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
         safe_filename = "".join(c if c in safe_chars else "_" for c in word)
@@ -106,5 +471,9 @@ class AudioPlayer:
 
     def cleanup(self):
         """Очистка ресурсов (теперь файлы не удаляются)"""
-        # Теперь мы не удаляем файлы, они остаются для повторного использования
-        pass
\ No newline at end of file
+        # Файлы не удаляем, они остаются для повторного использования
+        self.playback.shutdown()
+        if self._transcoder:
+            self._transcoder.shutdown()
+        if self.manifest:
+            self.manifest.save()
\ No newline at end of file
@@ -0,0 +1,211 @@
+import argparse
+import os
+import time
+import wave
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from audio_manifest import AudioManifest
+
+# Параметры обработки по умолчанию
+SILENCE_DB = -40.0        # порог тишины относительно пика клипа
+SILENCE_FLOOR = 200       # абсолютный порог тишины (из 32767), чтобы шум не считался звуком
+WINDOW_SECONDS = 0.01     # окно анализа громкости
+LEAD_PAD_SECONDS = 0.02   # запас перед началом звука
+TAIL_PAD_SECONDS = 0.08   # запас после конца звука (затухание)
+TARGET_RMS_DB = -18.0     # целевая громкость (RMS звучащей части)
+PEAK_LIMIT_DB = -1.0      # пик после нормализации не выше этого уровня
+
+# Декодер pygame в рабочем процессе (инициализируется один раз на процесс)
+_decoder = None
+
+
+def _init_worker(frequency, channels):
+    """Инициализирует pygame в рабочем процессе с форматом микшера проигрывателя"""
+    global _decoder
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+    pygame.mixer.init(frequency=frequency, size=-16, channels=channels)
+    _decoder = pygame
+
+
+def _db_to_ratio(db):
+    return 10 ** (db / 20.0)
+
+
+# Отсчеты передаются как array('h'); numpy (если есть) читает их буфер без копирования
+def _frame_peaks(samples, channels, window):
+    """Пиковая амплитуда в каждом окне из window кадров"""
+    if np is not None:
+        data = np.abs(np.frombuffer(samples, dtype=np.int16).astype(np.int32))
+        frames = len(data) // channels
+        data = data[:frames * channels].reshape(frames, channels).max(axis=1)
+        windows = frames // window
+        peaks = data[:windows * window].reshape(windows, window).max(axis=1).tolist()
+        if frames % window:
+            peaks.append(int(data[windows * window:].max()))
+        return peaks
+    step = window * channels
+    return [max(abs(value) for value in samples[start:start + step])
+            for start in range(0, len(samples), step)]
+
+
+def _rms(samples):
+    if np is not None:
+        data = np.frombuffer(samples, dtype=np.int16).astype(np.float64)
+        return float(np.sqrt(np.mean(data * data))) if len(data) else 0.0
+    return (sum(value * value for value in samples) / len(samples)) ** 0.5 if samples else 0.0
+
+
+def _scale(samples, gain):
+    """Умножает отсчеты на gain с ограничением диапазона int16"""
+    if np is not None:
+        data = np.frombuffer(samples, dtype=np.int16).astype(np.float64) * gain
+        return np.clip(np.rint(data), -32768, 32767).astype(np.int16).tobytes()
+    return array('h', (max(-32768, min(32767, round(value * gain))) for value in samples)).tobytes()
+
+
+def process_pcm(pcm, frequency, channels):
+    """Обрезает тишину по краям и выравнивает громкость 16-битного PCM
+
+    Возвращает (обработанный PCM, длительность в секундах, срезано тишины в начале в секундах).
+    """
+    samples = array('h')
+    samples.frombytes(pcm)
+    window = max(1, int(frequency * WINDOW_SECONDS))
+    peaks = _frame_peaks(samples, channels, window)
+    peak = max(peaks) if peaks else 0
+    if not peak:
+        return pcm, len(samples) / channels / frequency, 0.0
+
+    # Звучащие окна: выше порога относительно пика и выше абсолютного порога шума
+    threshold = max(peak * _db_to_ratio(SILENCE_DB), SILENCE_FLOOR)
+    loud = [index for index, value in enumerate(peaks) if value >= threshold]
+    if not loud:
+        loud = [peaks.index(peak)]
+    frames = len(samples) // channels
+    first = max(0, loud[0] * window - int(frequency * LEAD_PAD_SECONDS))
+    last = min(frames, (loud[-1] + 1) * window + int(frequency * TAIL_PAD_SECONDS))
+    trimmed = samples[first * channels:last * channels]
+
+    # Громкость: RMS звучащей части к целевому уровню, но без перегрузки по пику
+    body = samples[loud[0] * window * channels:min(frames, (loud[-1] + 1) * window) * channels]
+    rms = _rms(body)
+    gain = _db_to_ratio(TARGET_RMS_DB) * 32767 / rms if rms else 1.0
+    gain = min(gain, _db_to_ratio(PEAK_LIMIT_DB) * 32767 / peak)
+    data = _scale(trimmed, gain) if abs(gain - 1.0) > 0.01 else trimmed.tobytes()
+    return data, (last - first) / frequency, first / frequency
+
+
+def write_wav(path, pcm, frequency, channels):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(frequency)
+        wav.writeframes(pcm)
+
+
+def transcode_clip(task):
+    """Декодирует клип, обрабатывает и пишет WAV (выполняется в рабочем процессе)
+
+    Возвращает (исходный путь, длительность, срезано в начале, ошибка или None).
+    """
+    src_path, dst_path = task
+    try:
+        frequency, _, channels = _decoder.mixer.get_init()
+        pcm = _decoder.mixer.Sound(src_path).get_raw()
+        pcm, duration, lead_trimmed = process_pcm(pcm, frequency, channels)
+        write_wav(dst_path, pcm, frequency, channels)
+        return src_path, duration, lead_trimmed, None
+    except Exception as e:
+        return src_path, None, None, str(e)
+
+
+class Transcoder:
+    """Пул процессов, обрабатывающих сгенерированные клипы
+
+    Клипы приводятся к частоте и числу каналов микшера проигрывателя, поэтому при
+    загрузке Sound не нужны ни декодирование MP3, ни пересчет частоты.
+    """
+
+    def __init__(self, frequency=44100, channels=2, workers=None):
+        self.frequency = frequency
+        self.channels = channels
+        # spawn: родительский процесс уже держит потоки Tk и микшера
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                         initializer=_init_worker, initargs=(frequency, channels))
+
+    def transcode(self, src_path, dst_path):
+        """Обрабатывает файл (блокирует вызывающий поток); возвращает (длительность, срезано в начале)"""
+        _, duration, lead_trimmed, error = self._pool.submit(transcode_clip, (src_path, dst_path)).result()
+        if error:
+            raise RuntimeError(error)
+        return duration, lead_trimmed
+
+    def map(self, tasks):
+        """Обрабатывает пачку (src, dst); выдает результаты transcode_clip в порядке задач"""
+        return self._pool.map(transcode_clip, tasks, chunksize=8)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+def transcode_folder(folder, frequency=44100, channels=2, workers=None):
+    """Обрабатывает все еще не обработанные MP3 из манифеста папки"""
+    manifest = AudioManifest(folder)
+    keys = [key for key, entry in manifest.entries.items()
+            if entry.get('ext', AudioManifest.EXTENSION) == AudioManifest.EXTENSION]
+    tasks = [(manifest.file_path(key),
+              manifest.file_path(key, AudioManifest.WAV_EXTENSION) + AudioManifest.PART_SUFFIX)
+             for key in keys]
+
+    started = time.perf_counter()
+    transcoder = Transcoder(frequency, channels, workers)
+    done = failed = 0
+    trimmed_total = 0.0
+    try:
+        for key, task, result in zip(keys, tasks, transcoder.map(tasks)):
+            _, duration, lead_trimmed, error = result
+            if error:
+                print(f"Ошибка обработки {task[0]}: {error}")
+                failed += 1
+                continue
+            wav_path = task[1][:-len(AudioManifest.PART_SUFFIX)]
+            os.replace(task[1], wav_path)
+            with open(wav_path, 'rb') as f:
+                data = f.read()
+            manifest.add(key, manifest.entries[key]['word'], len(data), zlib.crc32(data),
+                         AudioManifest.WAV_EXTENSION, duration)
+            trimmed_total += lead_trimmed
+            done += 1
+    finally:
+        transcoder.shutdown()
+        manifest.save()
+    seconds = time.perf_counter() - started
+    print(f"Обработано: {done}, ошибок: {failed}, за {seconds:.1f} с")
+    if done:
+        print(f"Средняя срезанная тишина в начале: {trimmed_total / done * 1000:.0f} мс")
+    return done, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Обработка кэша аудио: обрезка тишины, выравнивание громкости, WAV")
+    parser.add_argument('folder', help="папка с аудиофайлами")
+    parser.add_argument('--frequency', type=int, default=44100, help="частота микшера")
+    parser.add_argument('--channels', type=int, default=2, help="число каналов микшера")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    args = parser.parse_args(argv)
+    transcode_folder(args.folder, args.frequency, args.channels, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+import os
+import shutil
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_bundle import AudioBundle
+from audio_manifest import AudioManifest
+
+QUARANTINE_DIR = 'quarantine'
+
+# Декодер pygame в рабочем процессе (инициализируется один раз на процесс)
+_decoder = None
+
+
+def _init_decoder():
+    """Инициализирует pygame в рабочем процессе без реального аудиоустройства"""
+    global _decoder
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    pygame.mixer.init()
+    _decoder = pygame
+
+
+def has_audio_header(data):
+    """Проверяет, что данные начинаются с заголовка MP3 (ID3 или синхрослово кадра) или WAV"""
+    if data[:3] == b'ID3' or data[:4] == b'RIFF':
+        return True
+    return len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0
+
+
+def check_entry(task):
+    """Проверяет один аудиофайл; возвращает (ключ, причина ошибки или None, размер)"""
+    key, path, expected_size, expected_checksum, decode = task
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return key, f"не читается: {e}", 0
+
+    if not data:
+        return key, "пустой файл", 0
+    if expected_size is not None and len(data) != expected_size:
+        return key, f"размер {len(data)} вместо {expected_size}", len(data)
+    if expected_checksum is not None and zlib.crc32(data) != expected_checksum:
+        return key, "не совпадает контрольная сумма", len(data)
+    if not has_audio_header(data):
+        return key, "нет заголовка аудио", len(data)
+    if decode:
+        try:
+            if _decoder is None:
+                _init_decoder()
+            _decoder.mixer.Sound(path)
+        except Exception as e:
+            return key, f"не декодируется: {e}", len(data)
+    return key, None, len(data)
+
+
+def verify_folder(folder, workers=None, decode=False, quarantine=True, player=None, words=None):
+    """Проверяет кэш аудио в папке параллельно в пуле процессов
+
+    Поврежденные файлы и записи хранилища переносятся в подпапку quarantine и исключаются
+    из манифеста и индекса; если передан player (AudioPlayer), они сразу генерируются заново.
+    Хранилище знает только ключи, поэтому слова его записей берутся из списка words.
+    Возвращает отчет со счетчиками и пропускной способностью.
+    """
+    started = time.perf_counter()
+    manifest = AudioManifest(folder)
+    tasks = [(key, manifest.file_path(key), entry.get('size'), entry.get('crc32'), decode)
+             for key, entry in manifest.entries.items()]
+
+    bad = []
+    total_bytes = 0
+    chunksize = max(1, min(512, len(tasks) // ((workers or os.cpu_count() or 1) * 4) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for key, reason, size in executor.map(check_entry, tasks, chunksize=chunksize):
+            total_bytes += size
+            if reason:
+                bad.append((key, manifest.entries[key].get('word'), reason))
+
+    # Записи упакованного хранилища проверяются по CRC32 индекса
+    bundle = AudioBundle.open_if_exists(folder)
+    bundle_checked = len(bundle) if bundle else 0
+    bundle_bad = bundle.verify() if bundle else []
+
+    quarantine_dir = os.path.join(folder, QUARANTINE_DIR)
+    if quarantine and (bad or bundle_bad):
+        os.makedirs(quarantine_dir, exist_ok=True)
+    if quarantine and bad:
+        for key, _, _ in bad:
+            path = manifest.file_path(key)
+            if os.path.exists(path):
+                shutil.move(path, os.path.join(quarantine_dir, os.path.basename(path)))
+            manifest.remove(key, delete_file=False)
+        manifest.save()
+    if quarantine:
+        for key in bundle_bad:
+            # Данные записи остаются в файле хранилища до переупаковки; копия - для разбора
+            with open(os.path.join(quarantine_dir, f"{key}.bundle"), 'wb') as f:
+                f.write(bundle.get(key))
+            bundle.discard(key)
+    if bundle:
+        bundle.close()
+
+    regenerated = 0
+    if player is not None and quarantine:
+        # Плеер должен работать с той же папкой и увидеть обновленные манифест и индекс
+        player.set_audio_folder(folder)
+        words_by_key = {player._audio_key(word): word for word in words or ()}
+        damaged_words = [word for _, word, _ in bad] + [words_by_key.get(key) for key in bundle_bad]
+        for word in damaged_words:
+            if word:
+                try:
+                    player.generate_audio_file(word)
+                    regenerated += 1
+                except Exception as e:
+                    print(f"Не удалось сгенерировать заново '{word}': {e}")
+
+    elapsed = time.perf_counter() - started
+    return {
+        'checked': len(tasks) + bundle_checked,
+        'bad': [{'key': key, 'word': word, 'reason': reason} for key, word, reason in bad],
+        'bundle_bad': bundle_bad,
+        'regenerated': regenerated,
+        'seconds': elapsed,
+        'files_per_second': len(tasks) / elapsed if elapsed else 0.0,
+        'megabytes_per_second': total_bytes / 1024 / 1024 / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка целостности кэша аудиофайлов")
+    parser.add_argument('folder')
+    parser.add_argument('--workers', type=int, default=None, help="число процессов")
+    parser.add_argument('--decode', action='store_true', help="дополнительно декодировать каждый файл")
+    parser.add_argument('--no-quarantine', action='store_true', help="только отчет, без изменений")
+    parser.add_argument('--regenerate', action='store_true', help="сгенерировать заново поврежденные файлы")
+    parser.add_argument('--words', default=None,
+                        help="файл слов: по нему заново генерируются поврежденные записи хранилища")
+    args = parser.parse_args()
+
+    player = None
+    words = None
+    if args.regenerate:
+        from audio_player import AudioPlayer
+        player = AudioPlayer(args.folder)
+        if args.words:
+            from word_list import load_word_store
+            words = load_word_store(args.words)[0].to_list()
+
+    report = verify_folder(args.folder, workers=args.workers, decode=args.decode,
+                           quarantine=not args.no_quarantine, player=player, words=words)
+
+    for item in report['bad']:
+        print(f"Поврежден: {item['word']} ({item['key']}) - {item['reason']}")
+    for key in report['bundle_bad']:
+        print(f"Повреждена запись хранилища: {key}")
+    print(f"Проверено: {report['checked']}, повреждено: {len(report['bad']) + len(report['bundle_bad'])}, "
+          f"сгенерировано заново: {report['regenerated']}")
+    print(f"Время: {report['seconds']:.2f} с, {report['files_per_second']:.0f} файлов/с, "
+          f"{report['megabytes_per_second']:.1f} МБ/с")
+
+    if player is not None:
+        player.cleanup()
+
+
+if __name__ == "__main__":
+    main()
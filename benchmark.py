@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Фиктивный аудиодрайвер SDL: замеры не зависят от звуковой карты
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+
+
+class SkipBenchmark(Exception):
+    """Замер невозможен в текущем окружении (нет pygame, дисплея и т.п.)"""
+
+
+def measure(func, repeat):
+    """Выполняет func repeat раз и возвращает медиану времени в секундах"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def make_words(count, prefix="слово"):
+    return [f"{prefix}{i}" for i in range(count)]
+
+
+def bench_generate_audio(sizes, repeat):
+    """generate_all_audio_files с заглушкой TTS: холодный кэш и повторный прогон по готовому кэшу"""
+    try:
+        from audio_player import AudioPlayer
+        from tts_engines import StubTTSBackend
+    except ImportError as e:
+        raise SkipBenchmark(f"нет зависимостей аудио: {e}")
+
+    results = {}
+    for size in sizes:
+        words = make_words(size)
+        cold = []
+        warm = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as folder:
+                player = AudioPlayer(folder, tts_backend=StubTTSBackend(), requests_per_second=None)
+                started = time.perf_counter()
+                player.generate_all_audio_files(words)
+                cold.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                player.generate_all_audio_files(words)
+                warm.append(time.perf_counter() - started)
+                player.cleanup()
+        results[f"generate_audio.cold.{size}"] = _result(statistics.median(cold), 's')
+        results[f"generate_audio.cached.{size}"] = _result(statistics.median(warm), 's')
+    return results
+
+
+def bench_stats(sizes, attempts, repeat):
+    """StatsManager.add_attempt при растущем числе слов в статистике (время одной попытки)"""
+    from stats_manager import StatsManager
+
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            manager = StatsManager(os.path.join(folder, 'stats.json'))
+            for word in make_words(size):
+                manager.add_attempt(word, True)
+            words = make_words(attempts, prefix="новое")
+
+            def run():
+                for word in words:
+                    manager.add_attempt(word, False)
+
+            per_attempt = measure(run, repeat) / attempts
+            manager.close()
+        results[f"stats.add_attempt.{size}"] = _result(per_attempt, 's')
+    return results
+
+
+def bench_session_replay(size, repeat):
+    """Пропускная способность TrainingSession при подаче ответов без пауз"""
+    from scheduler import create_scheduler
+    from stats_manager import StatsManager
+    from training_session import TrainingSession
+
+    words = make_words(size)
+    with tempfile.TemporaryDirectory() as folder:
+        manager = StatsManager(os.path.join(folder, 'stats.json'))
+        session = TrainingSession(manager, create_scheduler('leitner'))
+
+        def run():
+            session.start(words)
+            while not session.is_finished:
+                word = session.current_word()
+                session.submit_answer(word[:-1] if len(word) % 3 == 0 else word)
+
+        seconds = measure(run, repeat)
+        manager.close()
+    return {f"session.replay.{size}": _result(size / seconds, 'answers/s', higher_is_better=True)}
+
+
+@contextmanager
+def _create_gui():
+    """Создает окно тренажера для замеров интерфейса (во временной папке, с заглушкой TTS)"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        raise SkipBenchmark(f"нет дисплея для tkinter: {e}")
+    root.withdraw()
+    try:
+        from audio_player import AudioPlayer
+        from tts_engines import StubTTSBackend
+    except ImportError as e:
+        root.destroy()
+        raise SkipBenchmark(f"нет зависимостей аудио: {e}")
+
+    from gui import SpellingTrainerGUI
+    from stats_manager import StatsManager
+
+    with tempfile.TemporaryDirectory() as folder:
+        stats = StatsManager(os.path.join(folder, 'stats.json'))
+        # Замеры не обращаются к сети: аудио синтезирует локальная заглушка
+        player = AudioPlayer(folder, tts_backend=StubTTSBackend(network=False))
+        app = SpellingTrainerGUI(root, player, stats, {'audio_folder': folder})
+        try:
+            yield root, app
+        finally:
+            app.cleanup()
+            root.destroy()
+
+
+def bench_diff(lengths, repeat):
+    """_insert_highlighted_diff на длинных словах (ошибка в начале слова)"""
+    import tkinter as tk
+
+    results = {}
+    with _create_gui() as (root, app):
+        text = tk.Text(root)
+        text.tag_config('diff', foreground='red')
+        for length in lengths:
+            correct = "абвгдежзиклмнопрстуфхцчшщ" * (length // 25 + 1)
+            correct = correct[:length]
+            user = correct[:3] + correct[4:]
+
+            def run():
+                text.delete("1.0", tk.END)
+                for _ in range(50):
+                    app._insert_highlighted_diff(text, user, correct)
+
+            results[f"diff.insert.{length}"] = _result(measure(run, repeat) / 50, 's')
+    return results
+
+
+def bench_results_window(sizes, repeat):
+    """finish_testing при большом числе результатов сессии"""
+    results = {}
+    with _create_gui() as (root, app):
+        for size in sizes:
+            words = make_words(size)
+            app.session.start(words)
+            for i, word in enumerate(words):
+                app.session.submit_answer(word if i % 4 else word[::-1])
+
+            def run():
+                app.finish_testing()
+                root.update_idletasks()
+                for child in root.winfo_children():
+                    if child.winfo_class() == 'Toplevel':
+                        child.grab_release()
+                        child.destroy()
+
+            results[f"results_window.{size}"] = _result(measure(run, repeat), 's')
+    return results
+
+
+def _result(value, unit, higher_is_better=False):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+def run_all(quick=False, repeat=3):
+    """Запускает все замеры; недоступные в окружении отмечаются как пропущенные"""
+    audio_sizes = [100, 1000] if quick else [100, 1000, 10000]
+    stats_sizes = [1000, 10000] if quick else [1000, 10000, 100000]
+    suites = [
+        ('generate_audio', lambda: bench_generate_audio(audio_sizes, repeat)),
+        ('stats', lambda: bench_stats(stats_sizes, 200, repeat)),
+        ('session', lambda: bench_session_replay(2000, repeat)),
+        ('diff', lambda: bench_diff([50, 500, 5000], repeat)),
+        ('results_window', lambda: bench_results_window([200, 2000], repeat)),
+    ]
+
+    results = {}
+    skipped = {}
+    for name, suite in suites:
+        try:
+            results.update(suite())
+        except SkipBenchmark as e:
+            skipped[name] = str(e)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+            'repeat': repeat,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Сравнивает результаты с эталоном; возвращает список строк с регрессиями"""
+    regressions = []
+    for name, result in current['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if not reference or not reference['value']:
+            continue
+        ratio = result['value'] / reference['value']
+        worse = ratio < 1 / (1 + tolerance) if result['higher_is_better'] else ratio > 1 + tolerance
+        if worse:
+            regressions.append(f"{name}: {result['value']:.6g} {result['unit']} "
+                               f"(эталон {reference['value']:.6g}, x{ratio:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности тренажера")
+    parser.add_argument('--output', default='benchmark_results.json', help="файл результатов JSON")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="файл эталонных результатов")
+    parser.add_argument('--save-baseline', action='store_true', help="сохранить результаты как эталон")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое ухудшение относительно эталона (0.25 = 25%%)")
+    parser.add_argument('--quick', action='store_true', help="уменьшенные размеры для быстрой проверки")
+    parser.add_argument('--repeat', type=int, default=3, help="число повторов каждого замера")
+    args = parser.parse_args(argv)
+
+    report = run_all(quick=args.quick, repeat=args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for name, result in sorted(report['results'].items()):
+        print(f"{name:35} {result['value']:.6g} {result['unit']}")
+    for name, reason in report['skipped'].items():
+        print(f"{name:35} пропущено: {reason}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Эталон сохранен в {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Эталон {args.baseline} не найден, сравнение пропущено")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"РЕГРЕССИЯ {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,600 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from urllib.parse import unquote, urlsplit
+
+from attempt_history import AttemptHistory
+from audio_manifest import AudioManifest
+from audio_player import AudioPlayer
+import metrics
+from scheduler import SCHEDULERS, create_scheduler
+from stats_manager import StatsManager
+from training_session import TrainingSession
+from tts_engines import ENGINES, StubTTSBackend, create_engine
+from word_index import WordIndex
+from word_list import load_word_store
+
+REASONS = {200: 'OK', 201: 'Created', 206: 'Partial Content', 304: 'Not Modified',
+           400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 416: 'Range Not Satisfiable', 500: 'Internal Server Error'}
+MAX_BODY = 64 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class AudioService:
+    """Общий на весь класс кэш аудио: каждое слово синтезируется один раз
+
+    Одновременные запросы одного слова ждут одну задачу генерации, готовые байты
+    держатся в памяти (LRU с ограничением по объему), файлы - в папке AudioPlayer.
+    """
+
+    def __init__(self, audio_player, max_bytes=64 * 1024 * 1024):
+        self.audio_player = audio_player
+        self.max_bytes = max_bytes
+        self.words_by_key = {}
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, words):
+        """Запоминает слова, чтобы отдавать аудио по ключу (сам текст в адресе не виден)"""
+        for word in words:
+            self.words_by_key[self.audio_player._audio_key(word)] = word
+
+    def key_for(self, word):
+        return self.audio_player._audio_key(word)
+
+    async def get(self, key):
+        """Возвращает (etag, байты) аудио по ключу"""
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return cached
+        word = self.words_by_key.get(key)
+        if word is None:
+            raise HTTPError(404, "Неизвестное слово")
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(None, self.audio_player.read_audio, word)
+            self._inflight[key] = task
+            try:
+                _, data = await task
+            finally:
+                self._inflight.pop(key, None)
+            entry = (f'"{key}-{len(data)}"', data)
+            self._store(key, entry)
+            return entry
+        _, data = await task
+        return self._memory.get(key) or (f'"{key}-{len(data)}"', data)
+
+    def _store(self, key, entry):
+        self._memory[key] = entry
+        self._memory_bytes += len(entry[1])
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, (_, old) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    async def pregenerate(self, words):
+        """Заранее синтезирует все слова списка пулом AudioPlayer"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.audio_player.generate_all_audio_files, words)
+
+
+class Classroom:
+    """Сессии учеников на сервере: у каждого ученика своя статистика и планировщик"""
+
+    def __init__(self, words, data_dir, scheduler_name='leitner', session_size=None, history=None,
+                 word_index=None):
+        self.words = words
+        self.data_dir = data_dir
+        self.scheduler_name = scheduler_name
+        self.session_size = session_size
+        self.history = history
+        # Общий для всех учеников индекс похожих слов (только чтение)
+        self.word_index = word_index
+        self.students = {}
+        self.sessions = {}
+        # Сессии начинаются в пуле потоков, а сводка строится в цикле событий:
+        # словари учеников и сессий меняются и читаются только под блокировкой
+        self._lock = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+
+    @staticmethod
+    def _file_stem(student):
+        return re.sub(r'[^\w-]', '_', student)[:64] or '_'
+
+    def _student_stats(self, student):
+        with self._lock:
+            stats = self.students.get(student)
+        if stats is None:
+            stem = os.path.join(self.data_dir, self._file_stem(student))
+            stats = StatsManager(f"{stem}.json", history=self.history, student=student)
+            with self._lock:
+                self.students[student] = stats
+        return stats
+
+    def start_session(self, student):
+        """Начинает сессию ученика (прежняя сессия того же ученика закрывается)"""
+        with self._lock:
+            sessions = list(self.sessions.items())
+        for session_id, (name, _) in sessions:
+            if name == student:
+                self.finish_session(session_id)
+        stem = os.path.join(self.data_dir, self._file_stem(student))
+        # Планировщик ученика учится только на его собственных попытках
+        history = self.history.for_student(student) if self.history else None
+        scheduler = create_scheduler(self.scheduler_name, f"{stem}.schedule.json", history)
+        session = TrainingSession(self._student_stats(student), scheduler, self.session_size, self.word_index)
+        session.start(self.words)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self.sessions[session_id] = (student, session)
+        return session_id, session
+
+    def get(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise HTTPError(404, "Сессия не найдена")
+        return entry
+
+    def finish_session(self, session_id):
+        with self._lock:
+            _, session = self.sessions.pop(session_id)
+        session.finish()
+
+    def aggregate(self):
+        """Сводная статистика класса по текущим сессиям учеников"""
+        with self._lock:
+            student_stats = list(self.students.items())
+            active_sessions = len(self.sessions)
+        students = {}
+        word_errors = Counter()
+        total = correct = 0
+        for student, stats in student_stats:
+            # Снимок каждого ученика согласован: ответы в это время ждут его блокировку
+            data = stats.snapshot()
+            students[student] = {
+                'attempts': data['total_attempts'],
+                'correct': data['correct_attempts'],
+                'percentage': round(data['percentage'], 1),
+                'grade': data['grade'],
+            }
+            total += data['total_attempts']
+            correct += data['correct_attempts']
+            word_errors.update(data['errors'])
+        return {
+            'students': students,
+            'active_sessions': active_sessions,
+            'attempts': total,
+            'correct': correct,
+            'percentage': round(correct / total * 100, 1) if total else 0.0,
+            'hardest_words': word_errors.most_common(20),
+        }
+
+    def close(self):
+        for session_id in list(self.sessions):
+            self.finish_session(session_id)
+        with self._lock:
+            student_stats = list(self.students.values())
+        for stats in student_stats:
+            stats.close()
+        if self.history:
+            self.history.close()
+
+
+class ClassroomServer:
+    """HTTP-сервер класса на asyncio (HTTP/1.1 с keep-alive)
+
+    GET  /audio/<ключ>                 - аудио слова (ETag, If-None-Match, Range)
+    POST /sessions {"student": имя}    - новая сессия ученика
+    GET  /sessions/<id>                - адрес аудио текущего слова и прогресс
+    POST /sessions/<id>/answer         - ответ {"answer": ..., "response_time": ...}
+    GET  /sessions/<id>/results        - итоги сессии
+    GET  /stats                        - сводная статистика класса
+    GET  /metrics                      - метрики в текстовом формате Prometheus
+    """
+
+    def __init__(self, classroom, audio):
+        self.classroom = classroom
+        self.audio = audio
+        self.requests = 0
+        # Статистика ученика меняется только под его блокировкой: запись журнала
+        # выполняется в пуле потоков, чтобы не задерживать цикл событий, а ответы
+        # разных учеников при этом не ждут друг друга
+        self._student_locks = {}
+
+    def _lock_for(self, student):
+        lock = self._student_locks.get(student)
+        if lock is None:
+            lock = self._student_locks[student] = asyncio.Lock()
+        return lock
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                keep_alive = await self._handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head, reader, writer):
+        """Разбирает запрос, вызывает обработчик и пишет ответ; возвращает keep-alive"""
+        self.requests += 1
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, version = lines[0].split(' ', 2)
+        except ValueError:
+            self._write(writer, 400, {'error': "Неверная строка запроса"}, keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+        body = b''
+        length = headers.get('content-length') or '0'
+        # Только десятичные цифры ASCII: ни знака, ни пробелов, ни цифр других алфавитов
+        if not (length.isascii() and length.isdigit()):
+            self._write(writer, 400, {'error': "Неверный заголовок Content-Length"}, keep_alive=False)
+            return False
+        length = int(length)
+        if length > MAX_BODY:
+            self._write(writer, 413, {'error': "Слишком большой запрос"}, keep_alive=False)
+            return False
+        if length:
+            try:
+                body = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                # Клиент закрыл соединение, не дослав тело
+                return False
+
+        try:
+            with metrics.timer('server.request'):
+                await self._dispatch(method, unquote(urlsplit(target).path), headers, body, writer,
+                                     keep_alive)
+        except HTTPError as e:
+            self._write(writer, e.status, {'error': str(e)}, keep_alive=keep_alive, extra=e.headers)
+        except Exception as e:
+            print(f"Ошибка обработки запроса {method} {target}: {e}")
+            self._write(writer, 500, {'error': str(e)}, keep_alive=keep_alive)
+        return keep_alive
+
+    async def _dispatch(self, method, path, headers, body, writer, keep_alive):
+        parts = [part for part in path.split('/') if part]
+        if len(parts) == 2 and parts[0] == 'audio':
+            self._require(method, 'GET', 'HEAD')
+            await self._serve_audio(parts[1], method, headers, writer, keep_alive)
+            return
+
+        if parts == ['sessions']:
+            self._require(method, 'POST')
+            student = str(self._json(body).get('student') or '').strip()
+            if not student:
+                raise HTTPError(400, "Не указано имя ученика")
+            async with self._lock_for(student):
+                session_id, session = await self._run(self.classroom.start_session, student)
+            self._write(writer, 201, dict(self._state(session), session=session_id),
+                        keep_alive=keep_alive)
+        elif len(parts) == 2 and parts[0] == 'sessions':
+            self._require(method, 'GET')
+            _, session = self.classroom.get(parts[1])
+            self._write(writer, 200, self._state(session), keep_alive=keep_alive)
+        elif len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'answer':
+            self._require(method, 'POST')
+            student, session = self.classroom.get(parts[1])
+            data = self._json(body)
+            async with self._lock_for(student):
+                try:
+                    correct, answer, is_correct = await self._run(
+                        session.submit_answer, str(data.get('answer', '')), data.get('response_time'))
+                except ValueError as e:
+                    raise HTTPError(400, str(e))
+                result = {'correct_word': correct, 'answer': answer, 'is_correct': is_correct,
+                          'confused_with': session.last_confusion}
+            self._write(writer, 200, dict(self._state(session), result=result), keep_alive=keep_alive)
+        elif len(parts) == 3 and parts[0] == 'sessions' and parts[2] == 'results':
+            self._require(method, 'GET')
+            _, session = self.classroom.get(parts[1])
+            self._write(writer, 200, session.results(), keep_alive=keep_alive)
+        elif parts == ['stats']:
+            self._require(method, 'GET')
+            # Сводка ждет блокировки учеников, поэтому строится не в цикле событий
+            stats = await self._run(self.classroom.aggregate)
+            stats['audio_cache'] = {'hits': self.audio.hits, 'misses': self.audio.misses}
+            self._write(writer, 200, stats, keep_alive=keep_alive)
+        elif parts == ['metrics']:
+            self._require(method, 'GET')
+            self._write_raw(writer, 200, metrics.to_prometheus().encode('utf-8'),
+                            'text/plain; version=0.0.4; charset=utf-8', {}, keep_alive)
+        else:
+            raise HTTPError(404, "Неизвестный адрес")
+
+    @staticmethod
+    def _require(method, *allowed):
+        if method not in allowed:
+            raise HTTPError(405, f"Метод {method} не поддерживается")
+
+    @staticmethod
+    def _json(body):
+        try:
+            data = json.loads(body.decode('utf-8')) if body else {}
+        except ValueError:
+            raise HTTPError(400, "Тело запроса должно быть JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Тело запроса должно быть объектом JSON")
+        return data
+
+    @staticmethod
+    async def _run(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def _state(self, session):
+        """Состояние сессии для клиента: само слово не передается, только адрес его аудио"""
+        word = session.current_word()
+        attempts, correct, percentage = session.progress()
+        return {
+            'finished': session.is_finished,
+            'index': session.current_word_index,
+            'total': len(session.shuffled_words),
+            'audio': f"/audio/{self.audio.key_for(word)}" if word is not None else None,
+            'attempts': attempts,
+            'correct': correct,
+            'percentage': round(percentage, 1),
+        }
+
+    async def _serve_audio(self, key, method, headers, writer, keep_alive):
+        etag, data = await self.audio.get(key)
+        extra = {'ETag': etag, 'Accept-Ranges': 'bytes', 'Cache-Control': 'public, max-age=86400'}
+        content_type = 'audio/wav' if data[:4] == b'RIFF' else 'audio/mpeg'
+
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            self._write_raw(writer, 304, b'', content_type, extra, keep_alive, head_only=True)
+            return
+
+        status = 200
+        byte_range = headers.get('range')
+        if byte_range and headers.get('if-range', etag) == etag:
+            start, end = self._parse_range(byte_range, len(data))
+            extra['Content-Range'] = f"bytes {start}-{end}/{len(data)}"
+            data = data[start:end + 1]
+            status = 206
+        self._write_raw(writer, status, data, content_type, extra, keep_alive,
+                        head_only=method == 'HEAD')
+
+    @staticmethod
+    def _parse_range(value, size):
+        """Разбирает заголовок Range с одним диапазоном; возвращает (начало, конец) включительно"""
+        # RFC 9110: ответ 416 сообщает полный размер ресурса
+        unsatisfiable = HTTPError(416, "Неверный диапазон", {'Content-Range': f"bytes */{size}"})
+        match = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', value)
+        if not match or match.group(1) == match.group(2) == '':
+            raise unsatisfiable
+        first, last = match.groups()
+        if first == '':
+            # bytes=-N: последние N байт
+            start, end = max(0, size - int(last)), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            raise unsatisfiable
+        return start, end
+
+    def _write(self, writer, status, payload, keep_alive=True, extra=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self._write_raw(writer, status, body, 'application/json; charset=utf-8', extra or {}, keep_alive)
+
+    @staticmethod
+    def _write_raw(writer, status, body, content_type, extra, keep_alive, head_only=False):
+        headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                   f"Content-Type: {content_type}",
+                   f"Content-Length: {len(body)}",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        headers += [f"{name}: {value}" for name, value in extra.items()]
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1'))
+        if not head_only:
+            writer.write(body)
+
+
+async def serve(args):
+    store, _ = load_word_store(args.words_file)
+    words = store.to_list()
+    if args.stub_tts:
+        # Заглушка работает локально: ограничение частоты запросов к ней не нужно
+        tts_backend = StubTTSBackend(latency=args.stub_latency, network=False)
+    else:
+        tts_backend = create_engine(args.tts_engine, voice=args.tts_voice)
+    audio_player = AudioPlayer(args.audio_folder, tts_backend=tts_backend, init_mixer=False,
+                               max_workers=args.tts_workers,
+                               requests_per_second=args.tts_requests_per_second or None)
+    if args.metrics or args.metrics_file:
+        metrics.enable(args.metrics_file, args.metrics_interval)
+    audio = AudioService(audio_player, max_bytes=args.audio_memory_mb * 1024 * 1024)
+    audio.register(words)
+    history = AttemptHistory(args.history_db) if args.history_db else None
+    # Индекс похожих слов лежит рядом с кэшем аудио; после первого запуска только загружается
+    word_index = await asyncio.get_running_loop().run_in_executor(
+        None, WordIndex.load_or_build, args.audio_folder, words)
+    classroom = Classroom(words, args.data_dir, args.scheduler, args.session_size, history, word_index)
+    app = ClassroomServer(classroom, audio)
+
+    if args.pregenerate:
+        started = time.perf_counter()
+        await audio.pregenerate(words)
+        print(f"Аудио подготовлено для {len(words)} слов за {time.perf_counter() - started:.1f} с")
+
+    server = await asyncio.start_server(app.handle_connection, args.host, args.port)
+    print(f"Сервер класса: http://{args.host}:{args.port} ({len(words)} слов)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        classroom.close()
+        audio_player.cleanup()
+        metrics.disable()
+
+
+class LoadTestClient:
+    """Минимальный HTTP/1.1 клиент с постоянным соединением для нагрузочного теста"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode('latin-1') + body)
+        response_head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = response_head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ')[1])
+        length = 0
+        for line in lines[1:]:
+            if line.lower().startswith('content-length:'):
+                length = int(line.split(':', 1)[1])
+        data = await self.reader.readexactly(length)
+        return status, data
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+
+async def simulate_student(host, port, name, answers, error_rate, latencies, rng):
+    """Проходит сессию ученика: запрашивает аудио каждого слова и отправляет ответ
+
+    answers: {адрес аудио: слово} - ученик "слышит" слово и ошибается с вероятностью error_rate.
+    """
+    client = LoadTestClient(host, port)
+
+    async def timed(method, path, payload=None):
+        started = time.perf_counter()
+        status, data = await client.request(method, path, payload)
+        latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            raise RuntimeError(f"{method} {path}: {status} {data[:200]!r}")
+        return data
+
+    try:
+        state = json.loads(await timed('POST', '/sessions', {'student': name}))
+        session_id = state['session']
+        while not state['finished']:
+            await timed('GET', state['audio'])
+            word = answers.get(state['audio'], '?')
+            answer = word[::-1] if rng.random() < error_rate else word
+            state = json.loads(await timed('POST', f'/sessions/{session_id}/answer',
+                                           {'answer': answer}))
+        await timed('GET', f'/sessions/{session_id}/results')
+    finally:
+        client.close()
+
+
+async def load_test(args):
+    """Запускает args.students учеников одновременно и печатает задержки запросов"""
+    store, _ = load_word_store(args.words_file)
+    answers = {f"/audio/{AudioManifest.make_key(word, 'ru', args.engine)}": word for word in store}
+    latencies = []
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        simulate_student(args.host, args.port, f"student{n:03d}", answers, args.error_rate,
+                         latencies, random.Random(rng.random()))
+        for n in range(args.students)))
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"Учеников: {args.students}, запросов: {len(latencies)} за {seconds:.2f} с "
+          f"({len(latencies) / seconds:.0f} запросов/с)")
+    print(f"Задержка, мс: медиана {statistics.median(latencies) * 1000:.1f}, "
+          f"p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, макс {latencies[-1] * 1000:.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Сервер тренажера правописания для класса")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="запустить сервер")
+    serve_parser.add_argument('words_file', help="файл со словами (по одному на строку)")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--audio-folder', default='audio_files', help="общая папка аудио")
+    serve_parser.add_argument('--data-dir', default='classroom_data',
+                              help="папка статистики и расписаний учеников")
+    serve_parser.add_argument('--history-db', default='classroom_history.db',
+                              help="общая база истории попыток (пустая строка - без истории)")
+    serve_parser.add_argument('--scheduler', choices=sorted(SCHEDULERS), default='leitner')
+    serve_parser.add_argument('--session-size', type=int, default=None)
+    serve_parser.add_argument('--pregenerate', action='store_true',
+                              help="синтезировать все слова до старта")
+    serve_parser.add_argument('--tts-engine', choices=sorted(ENGINES), default='gtts')
+    serve_parser.add_argument('--tts-voice', default=None, help="голос локального движка")
+    serve_parser.add_argument('--tts-workers', type=int, default=4)
+    serve_parser.add_argument('--tts-requests-per-second', type=float, default=5.0)
+    serve_parser.add_argument('--audio-memory-mb', type=int, default=64)
+    serve_parser.add_argument('--stub-tts', action='store_true',
+                              help="локальная заглушка вместо gTTS (для нагрузочного теста)")
+    serve_parser.add_argument('--stub-latency', type=float, default=0.0)
+    serve_parser.add_argument('--metrics', action='store_true', help="собирать метрики (/metrics)")
+    serve_parser.add_argument('--metrics-file', default=None,
+                              help="периодически перезаписываемый файл метрик (.json или .prom)")
+    serve_parser.add_argument('--metrics-interval', type=float, default=10.0)
+
+    load_parser = subparsers.add_parser('loadtest', help="нагрузочный тест запущенного сервера")
+    load_parser.add_argument('words_file', help="тот же файл слов, что у сервера")
+    load_parser.add_argument('--host', default='127.0.0.1')
+    load_parser.add_argument('--port', type=int, default=8765)
+    load_parser.add_argument('--students', type=int, default=30)
+    load_parser.add_argument('--error-rate', type=float, default=0.2)
+    load_parser.add_argument('--engine', default='gtts',
+                             help="движок TTS сервера (stub при --stub-tts)")
+    load_parser.add_argument('--seed', type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args) if args.command == 'serve' else load_test(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
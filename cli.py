@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+
+from scheduler import SCHEDULERS, create_scheduler
+from spelling_diff import ERROR_LABELS, describe_errors
+from stats_manager import StatsManager
+from training_session import TrainingSession
+from word_list import load_word_store
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Тренажер правописания без графического интерфейса")
+    parser.add_argument('words_file', help="файл со словами (по одному на строку)")
+    parser.add_argument('--scheduler', choices=sorted(SCHEDULERS), default='random',
+                        help="порядок слов (по умолчанию случайный)")
+    parser.add_argument('--schedule-file', default=None, help="файл состояния планировщика")
+    parser.add_argument('--session-size', type=int, default=None, help="максимум слов в сессии")
+    parser.add_argument('--weak', type=int, default=None, metavar='N',
+                        help="тренировать только N самых трудных слов списка (по истории попыток)")
+    parser.add_argument('--stats-file', default=None,
+                        help="файл статистики (в режиме воспроизведения по умолчанию временный)")
+    parser.add_argument('--history-db', default=None, help="база истории попыток SQLite")
+    parser.add_argument('--audio', action='store_true', help="озвучивать слова (папка из настроек)")
+    parser.add_argument('--word-index', default=None, metavar='DIR',
+                        help="папка индекса похожих слов (обычно папка кэша аудио): "
+                             "неверный ответ сравнивается с другими словами списка")
+    parser.add_argument('--record', default=None, help="записать ответы в файл JSONL")
+    parser.add_argument('--replay', default=None,
+                        help="подать записанные ответы из файла JSONL с максимальной скоростью")
+    parser.add_argument('--repeat', type=int, default=1, help="число сессий в режиме воспроизведения")
+    parser.add_argument('--persist', action='store_true',
+                        help="в режиме воспроизведения записывать попытки в настоящие статистику, "
+                             "историю и расписание (по умолчанию - в их временные копии)")
+    parser.add_argument('--json', action='store_true', help="вывести итоги в формате JSON")
+    return parser.parse_args(argv)
+
+
+def temp_copy(path, folder, extra_extensions=()):
+    """Копирует файл во временную папку; возвращает путь копии (None, если путь не задан)
+
+    extra_extensions - файлы рядом с тем же именем и другим расширением (журнал статистики).
+    Если файла еще нет, возвращается путь в папке без копирования.
+    """
+    if path is None:
+        return None
+    copy = os.path.join(folder, os.path.basename(path))
+    pairs = [(path, copy)] + [(os.path.splitext(path)[0] + extension, os.path.splitext(copy)[0] + extension)
+                              for extension in extra_extensions]
+    for source, target in pairs:
+        if os.path.exists(source):
+            shutil.copyfile(source, target)
+    return copy
+
+
+def temp_history_copy(path, folder):
+    """Копирует базу истории во временную папку (вместе с еще не перенесенным журналом WAL)"""
+    if path is None:
+        return None
+    copy = os.path.join(folder, os.path.basename(path))
+    if os.path.exists(path):
+        source = sqlite3.connect(path)
+        target = sqlite3.connect(copy)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return copy
+
+
+def load_recorded_answers(path):
+    """Загружает записанные ответы: {слово: очередь ответов}"""
+    answers = defaultdict(deque)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                answers[record['word']].append((record['answer'], record.get('response_time')))
+    return answers
+
+
+def run_replay(session, words, recorded, repeat):
+    """Прогоняет сессии, подставляя записанные ответы; возвращает (итоги, ответов, секунд)"""
+    submitted = 0
+    results = None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        session.start(words)
+        pending = {word: deque(queue) for word, queue in recorded.items()}
+        while not session.is_finished:
+            word = session.current_word()
+            queue = pending.get(word)
+            # Слово без записанного ответа считается написанным правильно
+            answer, response_time = queue.popleft() if queue else (word, None)
+            session.submit_answer(answer, response_time)
+            submitted += 1
+        results = session.results()
+    return results, submitted, time.perf_counter() - started
+
+
+def run_interactive(session, words, player, record_file):
+    """Проводит сессию в консоли"""
+    session.start(words)
+    while not session.is_finished:
+        word = session.current_word()
+        print(f"\nСлово {session.current_word_index + 1} из {len(session.shuffled_words)}")
+        if player:
+            player.speak_word(word, lambda msg: print(f"Не удалось воспроизвести слово: {msg}"))
+        shown_at = time.monotonic()
+
+        answer = ""
+        while not answer:
+            answer = input("Напишите услышанное слово (пустая строка - повторить): ").strip()
+            if not answer and player:
+                player.replay_word()
+        response_time = time.monotonic() - shown_at
+
+        correct_word, _, is_correct = session.submit_answer(answer, response_time)
+        print("Правильно! ✅" if is_correct else f"Неправильно! ❌ Правильное написание: {correct_word}")
+        if session.last_confusion:
+            print(f"Вы написали похожее слово из списка: {session.last_confusion}")
+        if record_file:
+            record_file.write(json.dumps({'word': correct_word, 'answer': answer,
+                                          'response_time': response_time}, ensure_ascii=False) + "\n")
+    return session.results()
+
+
+def print_results(results):
+    print(f"\nОценка: {results['grade']}")
+    print(f"Всего слов: {results['total_words']}, правильно: {results['correct']}, "
+          f"ошибок: {results['errors']} ({results['percentage']:.1f}%)")
+    for correct, user in results['incorrect_words']:
+        print(f"  {user} - {correct} ({describe_errors(user, correct)})")
+    for kind, count in sorted(results['error_types'].items(), key=lambda item: -item[1]):
+        print(f"  {ERROR_LABELS[kind]}: {count}")
+    for correct, confused in results['confusions']:
+        print(f"  {correct} перепутано со словом {confused}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    store, _ = load_word_store(args.words_file)
+    words = store.to_list()
+    if not words:
+        print("В файле нет слов")
+        return 1
+
+    stats_file = args.stats_file
+    history_db = args.history_db
+    schedule_file = args.schedule_file
+    temp_dir = None
+    if args.replay:
+        temp_dir = tempfile.TemporaryDirectory()
+        if not args.persist:
+            # Старые ответы не должны сдвигать настоящее расписание и историю:
+            # воспроизведение идет на копиях, которые удаляются после выхода
+            stats_file = temp_copy(stats_file, temp_dir.name, extra_extensions=('.journal',))
+            history_db = temp_history_copy(history_db, temp_dir.name)
+            schedule_file = temp_copy(schedule_file, temp_dir.name)
+        if stats_file is None:
+            stats_file = os.path.join(temp_dir.name, 'spelling_stats.json')
+    elif stats_file is None:
+        stats_file = 'spelling_stats.json'
+
+    stats_manager = StatsManager(stats_file, history_db=history_db)
+    if args.weak:
+        if stats_manager.history is None:
+            print("Для --weak нужна база истории (--history-db)")
+            return 1
+        from analytics import weak_words_from_history
+        words = weak_words_from_history(stats_manager.history, args.weak, candidates=words)
+        if not words:
+            print("В истории нет слов этого списка с ошибками")
+            return 1
+    scheduler = create_scheduler(args.scheduler, schedule_file, stats_manager.history)
+    word_index = None
+    if args.word_index:
+        from word_index import WordIndex
+        word_index = WordIndex.load_or_build(args.word_index, store.to_list())
+    session = TrainingSession(stats_manager, scheduler, args.session_size, word_index)
+
+    try:
+        if args.replay:
+            recorded = load_recorded_answers(args.replay)
+            results, submitted, seconds = run_replay(session, words, recorded, args.repeat)
+            results['error_types'] = session.error_types()
+            results['answers'] = submitted
+            results['seconds'] = seconds
+            results['answers_per_second'] = submitted / seconds if seconds else 0.0
+        else:
+            player = None
+            if args.audio:
+                from main import create_audio_player, load_settings
+                player = create_audio_player(load_settings())
+            record_file = open(args.record, 'a', encoding='utf-8') if args.record else None
+            try:
+                results = run_interactive(session, words, player, record_file)
+                results['error_types'] = session.error_types()
+            finally:
+                if record_file:
+                    record_file.close()
+                if player:
+                    player.cleanup()
+        session.finish()
+    finally:
+        stats_manager.close()
+        if temp_dir:
+            temp_dir.cleanup()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_results(results)
+        if args.replay:
+            print(f"Ответов: {results['answers']} за {results['seconds']:.3f} с "
+                  f"({results['answers_per_second']:.0f} ответов/с)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,64 @@
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, Frame, filedialog, ttk
-import random
 import threading
 import os
 import json
+import time
+
+import metrics
+from scheduler import RandomScheduler
+from results_view import LazyTextList
+from spelling_diff import describe_errors, diff_segments
+from task_scheduler import PRIORITY_HIGH, PRIORITY_LOW, TaskScheduler
+from training_session import TrainingSession
+from word_index import WordIndex
+from word_list import WordStore, load_word_store
+from word_list_view import VirtualWordList
+from word_list_watcher import WordListWatcher
+
+DEFAULT_WORDS = ["вокзал", "парашют", "аккомпанемент", "бюллетень", "деревня",
+                 "интеллигент", "профессия", "коллектив", "территория", "дискуссия"]
 
 
 class SpellingTrainerGUI:
-    def __init__(self, root, audio_player, stats_manager, settings):
+    def __init__(self, root, audio_player, stats_manager, settings, scheduler=None):
         self.root = root
+        # Фоновые задачи с отменой; их обновления интерфейса выполняет один таймер Tk
+        self.tasks = TaskScheduler(root, settings.get('task_workers', 2), settings.get('ui_fps', 30))
+        self.generation_task = None
         self.audio_player = audio_player
         self.stats_manager = stats_manager
         self.settings = settings
+        # Вся логика сессии - в движке без tkinter; окно только отображает его состояние
+        self.session = TrainingSession(stats_manager, scheduler, settings.get('session_size'))
+        self.scheduler = self.session.scheduler
 
-        self.words_attempted = set()
-        self.words = []
-        self.shuffled_words = []
-        self.current_word_index = 0
-        self.session_results = []
+        self.word_store = WordStore()
+        self.audio_errors = set()
         self.audio_folder = settings.get('audio_folder', '')
         self.last_words_file = settings.get('last_words_file', '')
+        # Слежение за файлом списка: правки учителя подхватываются без перезапуска сессии
+        self.words_watcher = None
+        self.pending_audio = set()
+        # Индекс похожих слов строится в фоне и хранится рядом с кэшем аудио
+        self.word_index = None
+        self.index_task = None
+        # Упражнение на похожие слова: группы идут подряд, без перемешивания
+        self.keep_word_order = False
+
+        # Потоковый старт: тренировка начинается, как только готово аудио первых слов
+        self.streaming_start = settings.get('streaming_start', True)
+        self.streaming_ready_count = max(1, settings.get('streaming_ready_count', 3))
+        self.ready_words = set()
+        self.ready_prefix = 0
+        # Порядок слов сессии, выбранный до ее начала (потоковый старт)
+        self.planned_words = []
+        self.ready_lock = threading.Lock()
+        self.generation_in_progress = False
+        self.training_started = False
+        self.waiting_for_audio = False
+        self.prefetch_count = settings.get('prefetch_count', 3)
+        self.word_shown_at = None
 
         self.root.title("Тренажер правописания русских слов")
         self.root.geometry("900x650")
@@ -37,6 +76,29 @@ class SpellingTrainerGUI:
         # Показываем только фрейм настройки
         self.show_setup_frame()
 
+        if metrics.is_enabled():
+            self._watch_event_loop(time.perf_counter())
+
+    @property
+    def words(self):
+        return self.session.words
+
+    @words.setter
+    def words(self, words):
+        self.session.words = words
+
+    @property
+    def shuffled_words(self):
+        return self.session.shuffled_words
+
+    @property
+    def current_word_index(self):
+        return self.session.current_word_index
+
+    @property
+    def session_results(self):
+        return self.session.session_results
+
     def create_setup_widgets(self):
         """Создает виджеты для настройки списка слов"""
         # Область для выбора папки
@@ -64,17 +126,28 @@ class SpellingTrainerGUI:
                                         command=self.save_words_to_file, font=("Arial", 10))
         self.save_words_btn.pack(side="left", padx=5)
 
+        self.weak_words_btn = tk.Button(self.file_buttons_frame, text="🎯 Трудные слова",
+                                        command=self.load_weak_words, font=("Arial", 10))
+        self.weak_words_btn.pack(side="left", padx=5)
+
+        self.confusable_btn = tk.Button(self.file_buttons_frame, text="🔀 Похожие слова",
+                                        command=self.load_confusable_words, font=("Arial", 10))
+        self.confusable_btn.pack(side="left", padx=5)
+
         # Область для ввода списка слов
         self.words_frame = tk.LabelFrame(self.setup_frame, text="Список слов для изучения")
         self.words_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
         instruction_label = tk.Label(self.words_frame,
-                                     text="Введите слова для изучения (по одному на строку):",
+                                     text="Добавьте слова для изучения или загрузите их из файла "
+                                          "(двойной щелчок - правка, Delete - удаление):",
                                      font=("Arial", 10))
         instruction_label.pack(pady=5)
 
-        self.words_text = scrolledtext.ScrolledText(self.words_frame, height=12, font=("Arial", 12))
-        self.words_text.pack(pady=10, padx=10, fill="both", expand=True)
+        # Отрисовываются только видимые строки, поэтому размер списка не влияет на отзывчивость
+        self.words_view = VirtualWordList(self.words_frame, status_provider=self._word_status,
+                                          on_change=self._on_words_changed)
+        self.words_view.pack(pady=10, padx=10, fill="both", expand=True)
 
         # Прогресс-бар для генерации файлов
         self.progress_frame = tk.Frame(self.setup_frame)
@@ -143,7 +216,7 @@ class SpellingTrainerGUI:
 
     def restore_settings(self):
         """Восстанавливает предыдущие настройки"""
-        if self.audio_folder:
+        if self.audio_folder and self.audio_player.audio_folder != self.audio_folder:
             self.audio_player.set_audio_folder(self.audio_folder)
 
         # Загружаем последний использованный файл слов, если он существует
@@ -152,11 +225,96 @@ class SpellingTrainerGUI:
                 self.load_words_from_file(self.last_words_file, is_start=True)
             except:
                 # Если не удалось загрузить, используем стандартный список
-                self.words_text.insert("1.0",
-                                       "вокзал\nпарашют\nаккомпанемент\nбюллетень\nдеревня\nинтеллигент\nпрофессия\nколлектив\nтерритория\nдискуссия")
+                self._set_word_store(WordStore(DEFAULT_WORDS))
+                self._update_word_index(DEFAULT_WORDS)
         else:
-            self.words_text.insert("1.0",
-                                   "вокзал\nпарашют\nаккомпанемент\nбюллетень\nдеревня\nинтеллигент\nпрофессия\nколлектив\nтерритория\nдискуссия")
+            self._set_word_store(WordStore(DEFAULT_WORDS))
+            self._update_word_index(DEFAULT_WORDS)
+
+    def load_weak_words(self):
+        """Оставляет в списке слова, в которых чаще всего ошибались (по истории попыток)"""
+        if self.stats_manager.history is None:
+            messagebox.showinfo("Трудные слова", "История попыток отключена в настройках")
+            return
+        try:
+            from analytics import weak_words_from_history
+        except ImportError:
+            messagebox.showerror("Ошибка", "Для анализа ошибок нужен пакет numpy")
+            return
+
+        candidates = self.word_store.to_list() if len(self.word_store) else None
+        weak = weak_words_from_history(self.stats_manager.history,
+                                       self.settings.get('weak_words_count', 20), candidates)
+        if not weak:
+            messagebox.showinfo("Трудные слова", "В истории пока нет слов с ошибками")
+            return
+        # Список трудных слов больше не соответствует файлу - правки файла к нему не применяем
+        self._stop_words_watcher()
+        self._set_word_store(WordStore(weak))
+
+    def load_confusable_words(self):
+        """Оставляет в списке группы похожих слов, идущие подряд (упражнение на различение)"""
+        if self.word_index is None:
+            messagebox.showinfo("Похожие слова", "Индекс похожих слов еще строится, попробуйте чуть позже")
+            return
+        self.confusable_btn.config(state="disabled")
+        self.tasks.submit(self._find_confusable_groups, self.word_store.to_list(), priority=PRIORITY_HIGH,
+                          name='confusable-groups', on_done=self._show_confusable_groups,
+                          on_error=lambda e: self._show_confusable_groups([]))
+
+    def _find_confusable_groups(self, token, words):
+        """Ищет группы похожих слов списка (задача планировщика)"""
+        return self.word_index.confusable_groups(words, max_words=self.settings.get('confusable_words_count', 30))
+
+    def _show_confusable_groups(self, groups):
+        self.confusable_btn.config(state="normal")
+        if not groups:
+            messagebox.showinfo("Похожие слова", "В списке нет похожих друг на друга слов")
+            return
+        # Список групп больше не соответствует файлу - правки файла к нему не применяем
+        self._stop_words_watcher()
+        self._set_word_store(WordStore(word for group in groups for word in group))
+        self.keep_word_order = True
+
+    def _update_word_index(self, words):
+        """Приводит индекс похожих слов к списку (в фоне; предыдущее обновление отменяется)"""
+        if self.index_task is not None:
+            self.index_task.cancel()
+        self.index_task = self.tasks.submit(self._build_word_index, list(words), priority=PRIORITY_LOW,
+                                            name='word-index', on_done=self._set_word_index)
+
+    def _build_word_index(self, token, words):
+        """Загружает, строит или дополняет индекс похожих слов (задача планировщика)"""
+        folder = self.audio_player.audio_folder
+        index = self.word_index
+        if index is None or index.path != (os.path.join(folder, WordIndex.FILE_NAME) if folder else None):
+            return WordIndex.load_or_build(folder, words, token)
+        index.sync(words, token)
+        index.save()
+        return index
+
+    def _set_word_index(self, index):
+        self.index_task = None
+        self.word_index = index
+        self.session.word_index = index
+
+    def _set_word_store(self, store):
+        """Делает хранилище текущим списком слов и показывает его"""
+        self.word_store = store
+        self.keep_word_order = False
+        self.words_view.set_store(store)
+
+    def _on_words_changed(self, store):
+        """Вызывается после правки списка в редакторе"""
+        self.word_store = store
+
+    def _word_status(self, word):
+        """Состояние слова для колонки редактора: (текст, цвет)"""
+        if word in self.audio_errors:
+            return "ошибка аудио", "red"
+        if self.audio_player.has_audio(word):
+            return "аудио готово", "green"
+        return "нет аудио", "gray"
 
     def load_words_from_file(self, filename=None, is_start=False):
         """Загружает слова из текстового файла"""
@@ -169,23 +327,43 @@ class SpellingTrainerGUI:
                 return
 
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                words_content = f.read().strip()
-
-            # Очищаем текстовое поле и вставляем новые слова
-            self.words_text.delete("1.0", tk.END)
-            self.words_text.insert("1.0", words_content)
+            # Потоковая загрузка: нормализация, удаление повторов, проверка алфавитов
+            store, report = load_word_store(filename)
+            fix_mixed_script = bool(report.mixed_script and not is_start
+                                    and self._confirm_mixed_script_fixes(report))
+            if fix_mixed_script:
+                store, report = load_word_store(filename, fix_mixed_script=True)
+            self.audio_errors.clear()
+            self._set_word_store(store)
+            self._watch_words_file(filename, store, fix_mixed_script)
+            self._update_word_index(store.to_list())
 
             # Сохраняем путь к файлу в настройках
             self.last_words_file = filename
             self.save_settings()
 
             if not is_start:
-                messagebox.showinfo("Успех", f"Слова загружены из файла: {os.path.basename(filename)}")
+                messagebox.showinfo("Успех", f"Слова загружены из файла: {os.path.basename(filename)}\n"
+                                             f"{report.summary()}")
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить файл:\n{str(e)}")
 
+    def _confirm_mixed_script_fixes(self, report, max_shown=10):
+        """Показывает слова со смешанным алфавитом и спрашивает, исправить ли их"""
+        lines = []
+        for line_no, word, suggestion in report.mixed_script[:max_shown]:
+            lines.append(f"строка {line_no}: {word} → {suggestion}" if suggestion
+                         else f"строка {line_no}: {word} (нет варианта исправления)")
+        if len(report.mixed_script) > max_shown:
+            lines.append(f"... и еще {len(report.mixed_script) - max_shown}")
+        if not any(suggestion for _, _, suggestion in report.mixed_script):
+            messagebox.showwarning("Внимание", "Слова с латинскими буквами:\n" + "\n".join(lines))
+            return False
+        return messagebox.askyesno("Смешанный алфавит",
+                                   "В словах найдены латинские буквы:\n" + "\n".join(lines) +
+                                   "\n\nЗаменить их похожими русскими буквами?")
+
     def save_words_to_file(self):
         """Сохраняет слова в текстовый файл"""
         filename = filedialog.asksaveasfilename(
@@ -197,9 +375,12 @@ class SpellingTrainerGUI:
             return
 
         try:
-            words_content = self.words_text.get("1.0", tk.END).strip()
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(words_content)
+                for word in self.word_store:
+                    f.write(word + "\n")
+            # Дальше следим за сохраненным файлом; своя запись изменением не считается
+            self._watch_words_file(filename, self.word_store)
+            self._update_word_index(self.word_store.to_list())
 
             # Сохраняем путь к файлу в настройках
             self.last_words_file = filename
@@ -210,6 +391,82 @@ class SpellingTrainerGUI:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось сохранить файл:\n{str(e)}")
 
+    def _watch_words_file(self, filename, store, fix_mixed_script=False):
+        """Начинает следить за файлом списка слов (предыдущий наблюдатель останавливается)"""
+        self._stop_words_watcher()
+        if not self.settings.get('watch_words_file', True):
+            return
+        self.words_watcher = WordListWatcher(filename, self._on_words_file_changed,
+                                             self.settings.get('watch_interval', 1.0),
+                                             store.to_list(), fix_mixed_script).start()
+
+    def _stop_words_watcher(self):
+        if self.words_watcher:
+            self.words_watcher.stop()
+            self.words_watcher = None
+
+    def _on_words_file_changed(self, store, added, removed):
+        """Вызывается из потока наблюдателя при изменении файла списка"""
+        self.tasks.call_soon(self._apply_words_file_change, added, removed)
+
+    def _apply_words_file_change(self, added, removed):
+        """Применяет разницу версий файла к списку, сессии и аудио"""
+        store = self.word_store
+        if removed:
+            removed_set = set(removed)
+            store = store.without(index for index, word in enumerate(store) if word in removed_set)
+        for word in added:
+            store.add(word)
+        self.word_store = store
+        self.words_view.replace_store(store)
+        self._update_word_index(store.to_list())
+
+        # Идущая сессия продолжается: новые слова встают в конец, удаленные пропускаются
+        self.session.update_words(added, removed)
+        with self.ready_lock:
+            if removed and not self.training_started:
+                # Сессия еще не началась - удаленные слова убираем из выбранного порядка
+                removed_set = set(removed)
+                self.planned_words = [word for word in self.planned_words if word not in removed_set]
+            self.ready_prefix = 0
+            self._advance_ready_prefix()
+
+        # Синтезируем только добавленные слова, которых еще нет в кэше
+        if not self.audio_player.audio_folder:
+            return
+        missing = [word for word in added if not self.audio_player.has_audio(word)]
+        evict = removed if self.settings.get('evict_removed_audio', False) else []
+        if evict:
+            self.tasks.submit(self._evict_removed_audio, evict, priority=PRIORITY_LOW, name='evict-audio')
+        if missing:
+            with self.ready_lock:
+                self.pending_audio.update(missing)
+            # Ученик может уже ждать новое слово - эта задача идет раньше остальных
+            self.tasks.submit(self._generate_added_audio, missing, priority=PRIORITY_HIGH,
+                              name='generate-added-audio')
+
+    def _generate_added_audio(self, token, words):
+        """Озвучивает слова, добавленные в файл во время работы (задача планировщика)"""
+        try:
+            self.audio_player.generate_all_audio_files(words, ready_callback=self._mark_added_word_ready,
+                                                       cancel_event=token)
+        finally:
+            # Неозвученные из-за ошибки или отмены слова не должны ждать вечно
+            with self.ready_lock:
+                self.pending_audio.difference_update(words)
+            self.tasks.post('words_view', self.words_view.refresh)
+
+    def _evict_removed_audio(self, token, words):
+        """Удаляет аудио слов, исчезнувших из файла (задача планировщика)"""
+        self.audio_player.evict_words(words)
+        self.tasks.post('words_view', self.words_view.refresh)
+
+    def _mark_added_word_ready(self, word, file_path):
+        """Отмечает готовность аудио слова, добавленного в файл во время работы"""
+        with self.ready_lock:
+            self.pending_audio.discard(word)
+        self._mark_word_ready(word, file_path)
+
     def save_settings(self):
         """Сохраняет текущие настройки"""
         self.settings['audio_folder'] = self.audio_folder
@@ -235,8 +492,8 @@ class SpellingTrainerGUI:
 
     def prepare_and_start_training(self):
         """Подготавливает аудиофайлы и запускает тренировку"""
-        text = self.words_text.get("1.0", tk.END).strip()
-        self.words = [word.strip() for word in text.split('\n') if word.strip()]
+        # Слова берутся прямо из хранилища редактора
+        self.words = self.word_store.to_list()
 
         if not self.words:
             messagebox.showwarning("Внимание", "Пожалуйста, введите хотя бы одно слово!")
@@ -251,24 +508,91 @@ class SpellingTrainerGUI:
         self.progress_bar.pack(fill="x", pady=5)
         self.progress_label.config(text="Подготовка аудиофайлов...")
 
-        # Запускаем генерацию в отдельном потоке
-        threading.Thread(target=self._generate_audio_files, daemon=True).start()
-
-    def _generate_audio_files(self):
-        """Генерирует аудиофайлы в отдельном потоке"""
-        try:
-            def progress_callback(progress, current_word):
-                # Обновляем UI в основном потоке
-                self.root.after(0, lambda: self._update_progress(progress, current_word))
-
-            # Генерируем файлы
-            self.audio_player.generate_all_audio_files(self.words, progress_callback)
-
-            # Завершаем и запускаем тренировку
-            self.root.after(0, self._finish_preparation)
+        with self.ready_lock:
+            self.ready_words = set()
+            self.ready_prefix = 0
+        self.generation_in_progress = True
+        self.training_started = False
+
+        if self.streaming_start:
+            # Порядок выбираем заранее, чтобы генерировать аудио в порядке показа слов; сама
+            # сессия (и сброс статистики) начинается, только когда готово первое слово
+            self.planned_words = self.session.plan(keep_order=self.keep_word_order)
+            words_to_generate = list(self.planned_words)
+        else:
+            words_to_generate = list(self.words)
 
-        except Exception as e:
-            self.root.after(0, lambda: self._handle_generation_error(str(e)))
+        # Слова с готовым аудио (по манифесту в памяти) в генерацию не отправляем
+        missing = [word for word in words_to_generate if not self.audio_player.has_audio(word)]
+        if not missing and self.audio_player.audio_folder:
+            self._finish_preparation()
+            return
+        with self.ready_lock:
+            self.ready_words = set(words_to_generate).difference(missing)
+            ready_enough = self.streaming_start and self._advance_ready_prefix()
+        if ready_enough:
+            self.training_started = True
+            self._start_streaming_training()
+
+        # Генерация - фоновая задача; ее можно отменить кнопкой "Назад" или закрытием окна
+        self.generation_task = self.tasks.submit(
+            self._generate_audio_files, missing, name='generate-audio',
+            on_done=lambda result: self._finish_preparation(),
+            on_error=lambda e: self._handle_generation_error(str(e)),
+            on_cancel=self._on_generation_cancelled)
+
+    def _generate_audio_files(self, token, words):
+        """Генерирует аудиофайлы (задача планировщика)"""
+        def progress_callback(progress, current_word):
+            # Прогресс копится по ключу: интерфейс показывает последнее значение раз в кадр
+            self.tasks.post('progress', self._update_progress, progress, current_word)
+
+        self.audio_player.generate_all_audio_files(words, progress_callback,
+                                                   ready_callback=self._mark_word_ready,
+                                                   cancel_event=token)
+
+    def _mark_word_ready(self, word, file_path):
+        """Передает готовность аудио слова из потока генерации в поток Tk"""
+        self.tasks.call_soon(self._apply_word_ready, word, file_path)
+
+    def _apply_word_ready(self, word, file_path):
+        """Отмечает слово с готовым аудио и при необходимости начинает тренировку"""
+        if file_path is None:
+            self.audio_errors.add(word)
+        else:
+            self.audio_errors.discard(word)
+        with self.ready_lock:
+            self.ready_words.add(word)
+            if not self.streaming_start:
+                return
+            ready_enough = self._advance_ready_prefix()
+
+        if ready_enough and not self.training_started and self.generation_in_progress:
+            self.training_started = True
+            self._start_streaming_training()
+
+    def _advance_ready_prefix(self):
+        """Сдвигает границу непрерывно готового начала перемешанного списка (под ready_lock)
+
+        Возвращает True, если готово достаточно слов для потокового старта.
+        """
+        while (self.ready_prefix < len(self.planned_words)
+               and self.planned_words[self.ready_prefix] in self.ready_words):
+            self.ready_prefix += 1
+        return self.ready_prefix >= min(self.streaming_ready_count, len(self.planned_words))
+
+    def _is_word_ready(self, word):
+        """Проверяет, готово ли аудио для слова"""
+        with self.ready_lock:
+            if word in self.pending_audio:
+                return False
+            return not self.generation_in_progress or word in self.ready_words
+
+    def _start_streaming_training(self):
+        """Запускает тренировку, пока остальное аудио генерируется в фоне"""
+        self.save_settings()
+        self.shuffle_words(self.planned_words)
+        self.show_training_frame()
 
     def _update_progress(self, progress, current_word):
         """Обновляет прогресс-бар"""
@@ -280,32 +604,52 @@ class SpellingTrainerGUI:
 
     def _finish_preparation(self):
         """Завершает подготовку и запускает тренировку"""
+        self.generation_task = None
+        self.generation_in_progress = False
+        self.words_view.refresh()
         self.progress_bar.pack_forget()
         self.progress_label.config(text="")
         self.start_btn.config(state="normal", text="Подготовить аудиофайлы и начать тренировку")
 
+        # В потоковом режиме тренировка уже идет
+        if self.training_started:
+            return
+        self.training_started = True
+
         # Сохраняем настройки
         self.save_settings()
 
-        # Перемешиваем слова и начинаем тренировку
-        self.shuffle_words()
+        # Перемешиваем слова (в потоковом режиме порядок уже выбран) и начинаем тренировку
+        self.shuffle_words(self.planned_words if self.streaming_start else None)
         self.show_training_frame()
 
     def _handle_generation_error(self, error_message):
         """Обрабатывает ошибки генерации"""
+        self._reset_preparation()
+        messagebox.showerror("Ошибка", f"Ошибка при генерации аудиофайлов:\n{error_message}")
+
+    def _on_generation_cancelled(self):
+        """Генерация остановлена (возврат к настройкам)"""
+        # Отмененная задача могла закончиться, когда уже запущена новая генерация
+        if self.generation_task is not None and not self.generation_task.cancelled:
+            return
+        self._reset_preparation()
+        self.words_view.refresh()
+
+    def _reset_preparation(self):
+        """Возвращает экран настройки в исходное состояние после генерации"""
+        self.generation_task = None
+        self.generation_in_progress = False
         self.progress_bar.pack_forget()
         self.progress_label.config(text="")
         self.start_btn.config(state="normal", text="Подготовить аудиофайлы и начать тренировку")
-        messagebox.showerror("Ошибка", f"Ошибка при генерации аудиофайлов:\n{error_message}")
 
-    def shuffle_words(self):
-        """Перемешивает порядок слов"""
-        self.shuffled_words = self.words.copy()
-        random.shuffle(self.shuffled_words)
-        self.current_word_index = 0
-        self.words_attempted.clear()  # Сбрасываем отслеживание пройденных слов
-        self.session_results = []
-        self.stats_manager.reset_current_session()  # Сбрасываем статистику текущей сессии
+    def shuffle_words(self, planned=None):
+        """Выбирает слова, которые пора повторить, и задает порядок тренировки
+
+        planned - порядок, выбранный заранее (потоковый старт).
+        """
+        self.session.start(keep_order=self.keep_word_order, planned=planned)
 
     def show_training_frame(self):
         """Показывает фрейм тренировки"""
@@ -315,122 +659,162 @@ class SpellingTrainerGUI:
 
     def display_current_word(self):
         """Отображает текущее слово для тренировки"""
-        if self.current_word_index >= len(self.shuffled_words):
+        if self.session.is_finished:
             self.finish_testing()
             return
 
-        current_word = self.shuffled_words[self.current_word_index]
+        current_word = self.session.current_word()
         self.word_info_label.config(
-            text=f"Слово {self.current_word_index + 1} из {len(self.shuffled_words)} (случайный порядок)"
+            text=f"Слово {self.current_word_index + 1} из {len(self.shuffled_words)} ({self._order_description()})"
         )
+
+        # Ученик догнал фоновую генерацию - ждем аудио для текущего слова
+        self.waiting_for_audio = not self._is_word_ready(current_word)
+        if self.waiting_for_audio:
+            self.current_word_label.config(text="Подготовка аудио...")
+            self.root.after(100, self.display_current_word)
+            return
+
         self.current_word_label.config(text="???")
         self.answer_entry.delete(0, tk.END)
         self.result_label.config(text="")
         self.answer_entry.focus()
         self.update_button()
         self.speak_word()
+        self.prefetch_next_words()
+        self.word_shown_at = time.monotonic()
+
+    def prefetch_next_words(self):
+        """Заранее декодирует аудио следующих слов, пока текущее на экране"""
+        next_words = self.session.upcoming_words(self.prefetch_count)
+        self.audio_player.prefetch([word for word in next_words if self._is_word_ready(word)])
+
+    def _order_description(self):
+        """Описание порядка слов для строки состояния"""
+        if isinstance(self.scheduler, RandomScheduler):
+            return "случайный порядок"
+        return "по расписанию повторений"
 
     def update_button(self):
         """Обновляет текст и стиль кнопки продвижения"""
-        if self.current_word_index == len(self.shuffled_words) - 1:
+        if self.session.is_last_word:
             self.advance_btn.config(text="🏁 Завершить тестирование", bg="orange")
         else:
             self.advance_btn.config(text="➡️ Следующее слово", bg="lightblue")
 
     def speak_word(self):
         """Озвучивает текущее слово"""
-        if self.current_word_index >= len(self.shuffled_words):
+        current_word = self.session.current_word()
+        if current_word is None:
             return
-        current_word = self.shuffled_words[self.current_word_index]
         self.audio_player.speak_word(current_word, self.on_audio_error)
 
     def on_audio_error(self, error_message):
         """Обработчик ошибок воспроизведения аудио"""
-        self.root.after(0, lambda msg=error_message: messagebox.showerror("Ошибка",
-                                                                          f"Не удалось воспроизвести слово: {msg}"))
+        self.tasks.call_soon(messagebox.showerror, "Ошибка", f"Не удалось воспроизвести слово: {error_message}")
 
     def process_and_advance(self, event=None):
         """Обрабатывает ввод пользователя и продвигается к следующему слову"""
-        if self.current_word_index >= len(self.shuffled_words):
+        if self.session.is_finished or self.waiting_for_audio:
             return
 
         user_answer = self.answer_entry.get().strip()
-        correct_word = self.shuffled_words[self.current_word_index]
 
         if not user_answer:
             messagebox.showwarning("Внимание", "Пожалуйста, введите слово!")
             return
 
-        is_correct = user_answer.lower() == correct_word.lower()
+        # Все время обработки ответа цикл событий Tk стоит
+        with metrics.timer('ui.process_and_advance'):
+            # Проверка ответа, статистика и переход к следующему слову - в движке сессии
+            response_time = time.monotonic() - self.word_shown_at if self.word_shown_at else None
+            # Поиск похожего слова по словарю занимает до сотни миллисекунд - он идет в фоне
+            correct_word, _, is_correct = self.session.submit_answer(user_answer, response_time,
+                                                                     find_confusion=False)
 
-        # Сохраняем результат сессии
-        self.session_results.append((correct_word, user_answer, is_correct))
-
-        if is_correct:
-            self.result_label.config(text="Правильно! ✅", fg="green")
-        else:
-            self.result_label.config(text=f"Неправильно! ❌\nПравильное написание: {correct_word}", fg="red")
-
-        # Показываем правильное написание
-        self.current_word_label.config(text=correct_word)
+            if is_correct:
+                self.result_label.config(text="Правильно! ✅", fg="green")
+            else:
+                text = (f"Неправильно! ❌\nПравильное написание: {correct_word}\n"
+                        f"({describe_errors(user_answer, correct_word)})")
+                self.result_label.config(text=text, fg="red")
+                if self.session.word_index is not None:
+                    results = self.session.session_results
+                    self.tasks.submit(self._find_confusion, user_answer, correct_word, priority=PRIORITY_HIGH,
+                                      name='confusion',
+                                      on_done=lambda similar: self._show_confusion(similar, correct_word,
+                                                                                   results, text))
 
-        # Обновляем статистику
-        self.stats_manager.add_attempt(correct_word, is_correct)
-        self.update_stats_display()
+            # Показываем правильное написание
+            self.current_word_label.config(text=correct_word)
 
-        # Отмечаем слово как пройденное
-        self.words_attempted.add(correct_word)
+            self.update_stats_display()
 
         # Продвигаемся дальше
-        self.current_word_index += 1
         self.root.after(1000, self.display_current_word)  # Задержка для просмотра результата
 
+    def _find_confusion(self, token, answer, correct_word):
+        """Ищет слово словаря, которое ученик написал вместо правильного (фоновая задача)"""
+        return self.session.closest_word(answer, correct_word)
+
+    def _show_confusion(self, similar, correct_word, results, text):
+        """Запоминает похожее слово и дописывает подсказку, если результат ответа еще на экране"""
+        if not similar or self.session.session_results is not results:
+            # Ничего не найдено или тренировка уже началась заново
+            return
+        self.session.record_confusion(correct_word, similar)
+        if self.result_label.cget('text') == text:
+            self.result_label.config(text=f"{text}\nВы написали похожее слово из списка: {similar}")
+
+    def _watch_event_loop(self, scheduled_at, interval=0.25):
+        """Замеряет, насколько позже срока срабатывает таймер Tk (задержки цикла событий)"""
+        now = time.perf_counter()
+        metrics.observe('ui.event_loop_lag', max(0.0, now - scheduled_at))
+        self.root.after(int(interval * 1000), self._watch_event_loop, now + interval, interval)
+
     def update_stats_display(self):
-        stats = self.stats_manager.get_stats()
-        total = stats['total_attempts']
-        correct = stats['correct_attempts']
-        percentage = self.stats_manager.get_percentage()
+        total, correct, percentage = self.session.progress()
 
         self.stats_label.config(
             text=f"Всего попыток: {total}\nПравильных ответов: {correct} ({percentage:.1f}%)"
         )
 
-    def _insert_highlighted_diff(self, text_widget, user_input, correct):
-        """Вставляет неправильное слово с выделением отличий"""
-        i = 0
-        minlen = min(len(user_input), len(correct))
-        while i < minlen:
-            if user_input[i] != correct[i]:
-                start_pos = text_widget.index(tk.END)
-                j = i
-                while j < minlen and user_input[j] != correct[j]:
-                    text_widget.insert(tk.END, user_input[j])
-                    j += 1
-                text_widget.tag_add('diff', start_pos, text_widget.index(tk.END))
-                i = j
+    @staticmethod
+    def _diff_chunks(item):
+        """Фрагменты строки неправильного слова: [(текст, тег)] с подсветкой отличий"""
+        correct, user_input = item
+        chunks = []
+        for text, kind in diff_segments(user_input, correct):
+            if kind == 'ok':
+                chunks.append((text, None))
+            elif kind == 'missing':
+                # Пропущенные буквы обозначаем подчеркиванием на их месте
+                chunks.append(("_" * len(text), 'diff'))
             else:
-                text_widget.insert(tk.END, user_input[i])
-                i += 1
-        # Остаток неправильного слова
-        if len(user_input) > minlen:
-            start_pos = text_widget.index(tk.END)
-            text_widget.insert(tk.END, user_input[minlen:])
-            text_widget.tag_add('diff', start_pos, text_widget.index(tk.END))
-        text_widget.insert(tk.END, " - ")
-        text_widget.insert(tk.END, correct)
-        text_widget.insert(tk.END, "\n")
+                chunks.append((text, 'diff'))
+        chunks.append((f" - {correct} ({describe_errors(user_input, correct)})\n", None))
+        return chunks
+
+    def _insert_highlighted_diff(self, text_widget, user_input, correct):
+        """Вставляет неправильное слово с выделением отличий по выравниванию с правильным"""
+        args = []
+        for text, tag in self._diff_chunks((correct, user_input)):
+            args += [text, (tag,) if tag else ()]
+        text_widget.insert(tk.END, *args)
 
     def finish_testing(self):
         """Завершает тестирование и показывает результаты"""
         if not self.shuffled_words:
             return
 
+        self.session.finish()
+
         # Получаем статистику
-        grade = self.stats_manager.calculate_grade()
-        stats = self.stats_manager.get_stats()
-        total_words = len(self.shuffled_words)
-        correct_count = stats['correct_attempts']
-        errors_count = total_words - correct_count
+        results = self.session.results()
+        grade = results['grade']
+        total_words = results['total_words']
+        correct_count = results['correct']
+        errors_count = results['errors']
 
         # Создаем окно с результатами
         results_window = tk.Toplevel(self.root)
@@ -449,41 +833,31 @@ class SpellingTrainerGUI:
         stats_text = f"Всего слов: {total_words}\n"
         stats_text += f"Правильно: {correct_count}\n"
         stats_text += f"Ошибок: {errors_count}\n"
-        stats_text += f"Процент правильных ответов: {(correct_count / total_words * 100):.1f}%"
+        stats_text += f"Процент правильных ответов: {results['percentage']:.1f}%"
 
         stats_label = tk.Label(results_window, text=stats_text, font=("Arial", 14))
         stats_label.pack(pady=10)
 
-        # Неправильные слова
-        incorrect_frame = tk.LabelFrame(results_window, text="Неправильно написанные слова")
+        # Неправильные слова (выводятся страницами по мере прокрутки)
+        incorrect_frame = tk.LabelFrame(results_window,
+                                        text=f"Неправильно написанные слова ({len(results['incorrect_words'])})")
         incorrect_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
         inc_text = scrolledtext.ScrolledText(incorrect_frame, font=("Arial", 11), wrap=tk.WORD, height=8)
         inc_text.pack(pady=5, padx=5, fill="both", expand=True)
         inc_text.tag_config('diff', foreground='red')
-
-        if errors_count == 0:
-            inc_text.insert(tk.END, "Все слова написаны правильно! 🎉")
-        else:
-            for correct, user, is_c in self.session_results:
-                if not is_c:
-                    self._insert_highlighted_diff(inc_text, user, correct)
-        inc_text.config(state="disabled")
+        LazyTextList(inc_text, results['incorrect_words'], self._diff_chunks,
+                     empty_text="Все слова написаны правильно! 🎉")
 
         # Правильные слова
-        correct_frame = tk.LabelFrame(results_window, text="Правильно написанные слова")
+        correct_frame = tk.LabelFrame(results_window,
+                                      text=f"Правильно написанные слова ({len(results['correct_words'])})")
         correct_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
         cor_text = scrolledtext.ScrolledText(correct_frame, font=("Arial", 11), wrap=tk.WORD, height=8)
         cor_text.pack(pady=5, padx=5, fill="both", expand=True)
-
-        if correct_count == 0:
-            cor_text.insert(tk.END, "Нет правильно написанных слов.")
-        else:
-            for correct, _, is_c in self.session_results:
-                if is_c:
-                    cor_text.insert(tk.END, f"• {correct}\n")
-        cor_text.config(state="disabled")
+        LazyTextList(cor_text, results['correct_words'], lambda correct: [(f"• {correct}\n", None)],
+                     page_size=500, empty_text="Нет правильно написанных слов.")
 
         # Кнопки
         buttons_frame = tk.Frame(results_window)
@@ -516,9 +890,19 @@ class SpellingTrainerGUI:
 
     def show_setup_frame(self):
         """Показывает фрейм настройки"""
+        self.audio_player.stop_playback()
+        # Генерация для брошенной тренировки больше не нужна
+        if self.generation_task is not None:
+            self.generation_task.cancel()
         self.training_frame.pack_forget()
         self.setup_frame.pack(fill="both", expand=True)
 
     def cleanup(self):
         """Очистка ресурсов"""
-        self.audio_player.cleanup()
\ No newline at end of file
+        self._stop_words_watcher()
+        # Окно закрывается без долгого ожидания: задачи отменены, а застрявший
+        # в сетевом запросе поток не помешает выходу
+        self.tasks.shutdown(timeout=1.0)
+        self.audio_player.cleanup()
+        self.session.finish()
+        self.stats_manager.close()
\ No newline at end of file
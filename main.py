@@ -1,37 +1,150 @@
-import tkinter as tk
-from audio_player import AudioPlayer
-from stats_manager import StatsManager
-from gui import SpellingTrainerGUI
+import argparse
 import json
 import os
+import time
 
+# Остальные модули импортируются в main(): так их загрузка попадает в отчет
+# --startup-profile, а pygame и gTTS подгружаются еще позже, по необходимости
+
+
+class StartupProfile:
+    """Замер этапов запуска для --startup-profile"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages = []
+
+    def mark(self, stage):
+        """Отмечает окончание этапа"""
+        now = time.perf_counter()
+        self.stages.append((stage, now - self._last))
+        self._last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("Профиль запуска:")
+        for stage, seconds in self.stages:
+            print(f"  {stage:<28} {seconds * 1000:8.1f} мс")
+        print(f"  {'итого до первого кадра':<28} {(self._last - self.started) * 1000:8.1f} мс")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Тренажер правописания русских слов")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="вывести время этапов запуска")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profile = StartupProfile(args.startup_profile)
+
+    import tkinter as tk
+    from stats_manager import StatsManager
+    from gui import SpellingTrainerGUI
+    from scheduler import create_scheduler
+    import metrics
+    profile.mark("импорт модулей")
 
-def main():
     root = tk.Tk()
+    profile.mark("создание окна Tk")
 
     # Загрузка настроек
     settings = load_settings()
+    if settings.get('metrics_file'):
+        metrics.enable(settings['metrics_file'], settings.get('metrics_interval', 10.0))
+    profile.mark("загрузка настроек")
+
+    # Инициализация компонентов (звук инициализируется в фоне)
+    audio_player = create_audio_player(settings)
+    profile.mark("аудио (без микшера)")
+
+    stats_manager = StatsManager(history_db=settings.get('history_db', 'spelling_history.db') or None)
+    scheduler = create_scheduler(settings.get('scheduler', 'leitner'),
+                                 settings.get('schedule_file', 'spelling_schedule.json'),
+                                 stats_manager.history)
+    profile.mark("загрузка статистики")
+
+    app = SpellingTrainerGUI(root, audio_player, stats_manager, settings, scheduler)
+    profile.mark("создание виджетов")
+
+    if profile.enabled:
+        def first_frame():
+            root.update_idletasks()
+            profile.mark("первый кадр")
+            profile.report()
+            report_mixer()
 
-    # Инициализация компонентов
-    audio_player = AudioPlayer(settings.get('audio_folder'))
-    stats_manager = StatsManager()
-    app = SpellingTrainerGUI(root, audio_player, stats_manager, settings)
+        def report_mixer():
+            # Микшер инициализируется параллельно с созданием окна
+            if not audio_player.mixer_ready.is_set():
+                root.after(50, report_mixer)
+                return
+            status = f"ошибка: {audio_player.mixer_error}" if audio_player.mixer_error else "готов"
+            print(f"  {'микшер (в фоне)':<28} {audio_player.mixer_init_seconds * 1000:8.1f} мс, {status}")
+
+        root.after_idle(first_frame)
 
     # Обработка закрытия окна
     def on_closing():
         app.cleanup()
+        # Последняя запись файла метрик
+        metrics.disable()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
     root.mainloop()
 
 
+def create_audio_player(settings):
+    """Создает AudioPlayer с движком TTS и параметрами кэша из настроек"""
+    from audio_player import AudioPlayer
+    from tts_engines import create_engine
+
+    lang = settings.get('tts_lang', 'ru')
+    engine = create_engine(settings.get('tts_engine', 'gtts'), lang=lang, voice=settings.get('tts_voice'))
+    disk_quota_mb = settings.get('audio_disk_quota_mb')
+    return AudioPlayer(settings.get('audio_folder'),
+                       tts_backend=engine,
+                       tts_lang=lang,
+                       max_workers=settings.get('tts_max_workers', 4),
+                       requests_per_second=settings.get('tts_requests_per_second', 5.0),
+                       cache_max_bytes=settings.get('audio_cache_mb', 64) * 1024 * 1024,
+                       disk_quota_bytes=disk_quota_mb * 1024 * 1024 if disk_quota_mb else None,
+                       batch_size=settings.get('tts_batch_size', 50),
+                       transcode=settings.get('audio_transcode', False))
+
+
 def load_settings():
     """Загружает настройки из файла"""
     settings_file = 'spelling_trainer_settings.json'
     default_settings = {
         'audio_folder': '',
-        'last_words_file': ''
+        'last_words_file': '',
+        'tts_engine': 'gtts',
+        'tts_voice': None,
+        'tts_lang': 'ru',
+        'tts_batch_size': 50,
+        'tts_max_workers': 4,
+        'audio_transcode': False,
+        'tts_requests_per_second': 5.0,
+        'audio_cache_mb': 64,
+        'audio_disk_quota_mb': None,
+        'history_db': 'spelling_history.db',
+        'scheduler': 'leitner',
+        'session_size': None,
+        'weak_words_count': 20,
+        'confusable_words_count': 30,
+        'watch_words_file': True,
+        'watch_interval': 1.0,
+        'evict_removed_audio': False,
+        'task_workers': 2,
+        'ui_fps': 30,
+        'metrics_file': None,
+        'metrics_interval': 10.0
     }
 
     try:
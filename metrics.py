@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Границы корзин гистограмм таймеров (в секундах)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = False
+_lock = threading.Lock()
+_counters = {}
+_timers = {}
+_exporter = None
+
+
+class _Timer:
+    """Замеряет длительность блока with и добавляет ее в гистограмму"""
+
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullTimer:
+    """Таймер-заглушка, когда сбор метрик выключен"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(export_file=None, interval=10.0):
+    """Включает сбор метрик и, если указан файл, его периодическую перезапись
+
+    Формат файла определяется расширением: .json - JSON, иначе текстовый формат Prometheus.
+    """
+    global _enabled, _exporter
+    _enabled = True
+    if export_file and _exporter is None:
+        _exporter = _Exporter(export_file, interval)
+        _exporter.start()
+
+
+def disable():
+    """Выключает сбор метрик, записывает файл в последний раз и останавливает экспорт"""
+    global _enabled, _exporter
+    _enabled = False
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+
+
+def reset():
+    """Очищает накопленные значения"""
+    with _lock:
+        _counters.clear()
+        _timers.clear()
+
+
+def count(name, value=1):
+    """Увеличивает счетчик"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, seconds):
+    """Добавляет измеренную длительность в гистограмму таймера"""
+    if not _enabled:
+        return
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {'count': 0, 'sum': 0.0, 'max': 0.0,
+                                     'buckets': [0] * (len(BUCKETS) + 1)}
+        timer['count'] += 1
+        timer['sum'] += seconds
+        if seconds > timer['max']:
+            timer['max'] = seconds
+        timer['buckets'][bisect_left(BUCKETS, seconds)] += 1
+
+
+def timer(name):
+    """Контекстный менеджер для замера блока: with metrics.timer('stats.compact'): ..."""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def snapshot():
+    """Возвращает копию всех метрик: {'counters': {...}, 'timers': {...}}"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'timers': {name: dict(data, buckets=list(data['buckets'])) for name, data in _timers.items()},
+        }
+
+
+def _quantile(data, q):
+    """Оценка квантиля по гистограмме (верхняя граница корзины)"""
+    if not data['count']:
+        return 0.0
+    rank = q * data['count']
+    seen = 0
+    for bound, in_bucket in zip(BUCKETS, data['buckets']):
+        seen += in_bucket
+        if seen >= rank:
+            return min(bound, data['max'])
+    return data['max']
+
+
+def to_json(data=None):
+    data = data or snapshot()
+    timers = {}
+    for name, timer_data in data['timers'].items():
+        count_ = timer_data['count']
+        timers[name] = {
+            'count': count_,
+            'sum': round(timer_data['sum'], 6),
+            'avg': round(timer_data['sum'] / count_, 6) if count_ else 0.0,
+            'p50': round(_quantile(timer_data, 0.5), 6),
+            'p95': round(_quantile(timer_data, 0.95), 6),
+            'max': round(timer_data['max'], 6),
+        }
+    return json.dumps({'timestamp': time.time(), 'counters': data['counters'], 'timers': timers},
+                      ensure_ascii=False, indent=2)
+
+
+def _prometheus_name(name):
+    return 'spelling_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def to_prometheus(data=None):
+    """Текстовый формат Prometheus: счетчики и гистограммы таймеров в секундах"""
+    data = data or snapshot()
+    lines = []
+    for name, value in sorted(data['counters'].items()):
+        metric = _prometheus_name(name) + '_total'
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, timer_data in sorted(data['timers'].items()):
+        metric = _prometheus_name(name) + '_seconds'
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, in_bucket in zip(BUCKETS, timer_data['buckets']):
+            cumulative += in_bucket
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {timer_data["count"]}')
+        lines.append(f"{metric}_sum {timer_data['sum']:.6f}")
+        lines.append(f"{metric}_count {timer_data['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_file(path):
+    """Атомарно перезаписывает файл метрик"""
+    text = to_json() if path.endswith('.json') else to_prometheus()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class _Exporter:
+    """Фоновый поток, периодически перезаписывающий файл метрик"""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-export', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(self.interval + 1.0)
+        self._write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            write_file(self.path)
+        except Exception as e:
+            print(f"Ошибка записи метрик: {e}")
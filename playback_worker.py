@@ -0,0 +1,160 @@
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+import metrics
+
+
+def _stop_mixer():
+    """Останавливает все звуки, если микшер уже инициализирован"""
+    # pygame импортируется лениво: микшер инициализирует AudioPlayer в фоновом потоке.
+    # Если pygame не импортирован, микшер не запускался и останавливать нечего
+    # (сервер работает без звука и без pygame)
+    pygame = sys.modules.get('pygame')
+    if pygame is None:
+        return
+    if pygame.mixer.get_init():
+        pygame.mixer.stop()
+
+
+class PlaybackWorker:
+    """Единственный долгоживущий поток воспроизведения, управляемый очередью команд
+
+    Окончание звука определяется не опросом get_busy(), а ожиданием очереди команд
+    с таймаутом, равным оставшейся длительности звука: поток просыпается либо по новой
+    команде, либо ровно в момент завершения воспроизведения. Поток запускается
+    первой командой воспроизведения: плееру, который ничего не играет, он не нужен.
+    """
+
+    PLAY = 'play'
+    REPLAY = 'replay'
+    STOP = 'stop'
+    SHUTDOWN = 'shutdown'
+
+    def __init__(self, sound_provider, latency_history=100):
+        # sound_provider(word) возвращает декодированный pygame.mixer.Sound
+        self.sound_provider = sound_provider
+        self.last_start_latency = None
+        self.start_latencies = deque(maxlen=latency_history)
+
+        self._commands = queue.Queue()
+        self._last_word = None
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._thread = None
+
+    def play(self, word, on_complete=None, on_error=None, preempt=True):
+        """Воспроизводит слово; с preempt прерывает текущее и отменяет очередь"""
+        self._send(self.PLAY, word, on_complete, on_error, preempt)
+
+    def replay(self, on_complete=None, on_error=None):
+        """Повторяет последнее воспроизведенное слово"""
+        self._send(self.REPLAY, None, on_complete, on_error, True)
+
+    def stop(self):
+        """Останавливает воспроизведение и очищает очередь"""
+        self._send(self.STOP, None, None, None, True)
+
+    def shutdown(self, timeout=1.0):
+        """Останавливает рабочий поток"""
+        with self._generation_lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._send(self.SHUTDOWN, None, None, None, True)
+        thread.join(timeout)
+
+    def average_start_latency(self):
+        """Возвращает среднюю задержку запуска воспроизведения (в секундах)"""
+        latencies = list(self.start_latencies)
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def _send(self, kind, word, on_complete, on_error, preempt):
+        """Ставит команду в очередь; прерывающие команды делают устаревшими все предыдущие"""
+        with self._generation_lock:
+            if preempt:
+                self._generation += 1
+            generation = self._generation
+            if self._thread is None and kind in (self.PLAY, self.REPLAY):
+                self._thread = threading.Thread(target=self._run, name='playback', daemon=True)
+                self._thread.start()
+        self._commands.put((kind, word, on_complete, on_error, generation, time.perf_counter()))
+
+    def _run(self):
+        """Рабочий цикл потока воспроизведения"""
+        current = None
+        pending = deque()
+
+        while True:
+            timeout = None if current is None else max(0.0, current['deadline'] - time.monotonic())
+            try:
+                command = self._commands.get(timeout=timeout)
+            except queue.Empty:
+                # Звук доиграл до конца
+                self._notify(current['on_complete'], current['word'])
+                current = None
+                if pending:
+                    current = self._start(*pending.popleft())
+                continue
+
+            kind, word, on_complete, on_error, generation, submitted = command
+            if generation < self._generation:
+                # Команда устарела: после нее пришла прерывающая команда
+                continue
+
+            if kind == self.SHUTDOWN:
+                _stop_mixer()
+                return
+
+            if kind == self.STOP:
+                _stop_mixer()
+                current = None
+                pending.clear()
+                continue
+
+            if kind == self.REPLAY:
+                if self._last_word is None:
+                    continue
+                word = self._last_word
+
+            play_args = (word, on_complete, on_error, submitted)
+            if current is not None and kind == self.PLAY and generation == current['generation']:
+                # Не прерывающее воспроизведение ждет окончания текущего
+                pending.append(play_args)
+                continue
+
+            pending.clear()
+            current = self._start(*play_args)
+
+    def _start(self, word, on_complete, on_error, submitted):
+        """Запускает воспроизведение слова и возвращает его состояние"""
+        self._last_word = word
+        try:
+            sound = self.sound_provider(word)
+            _stop_mixer()
+            sound.play()
+        except Exception as e:
+            self._notify(on_error, str(e))
+            return None
+
+        self.last_start_latency = time.perf_counter() - submitted
+        metrics.observe('playback.start_latency', self.last_start_latency)
+        self.start_latencies.append(self.last_start_latency)
+        return {
+            'word': word,
+            'on_complete': on_complete,
+            'deadline': time.monotonic() + sound.get_length(),
+            'generation': self._generation,
+        }
+
+    @staticmethod
+    def _notify(callback, *args):
+        """Вызывает callback, не позволяя его ошибкам остановить поток"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Ошибка в обработчике воспроизведения: {e}")
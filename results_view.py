@@ -0,0 +1,65 @@
+import tkinter as tk
+
+
+class LazyTextList:
+    """Постраничный вывод длинного списка в текстовое поле
+
+    Каждая страница собирается в одну строку и вставляется одним insert, а подсветка
+    добавляется одним tag_add на тег по заранее вычисленным диапазонам. Следующая
+    страница дорисовывается, когда пользователь прокручивает список почти до конца.
+    """
+
+    def __init__(self, text_widget, items, formatter, page_size=200, empty_text=""):
+        # formatter(item) -> [(текст, тег или None)]
+        self.text = text_widget
+        self.items = items
+        self.formatter = formatter
+        self.page_size = page_size
+        self.rendered = 0
+        self._page_pending = False
+
+        if not items:
+            self._insert([(empty_text, None)])
+            return
+
+        # Полоса прокрутки ScrolledText продолжает работать, но мы узнаем о прокрутке
+        self._scrollbar_set = getattr(text_widget, 'vbar', None)
+        text_widget.config(yscrollcommand=self._on_scroll)
+        self.render_next_page()
+
+    def render_next_page(self):
+        """Дорисовывает следующую страницу списка"""
+        self._page_pending = False
+        chunk = self.items[self.rendered:self.rendered + self.page_size]
+        if not chunk:
+            return
+        chunks = []
+        for item in chunk:
+            chunks.extend(self.formatter(item))
+        self.rendered += len(chunk)
+        self._insert(chunks)
+
+    def _insert(self, chunks):
+        """Вставляет фрагменты одной операцией и подсвечивает их диапазоны"""
+        ranges = {}
+        parts = []
+        position = 0
+        for text, tag in chunks:
+            if tag and text:
+                ranges.setdefault(tag, []).extend((position, position + len(text)))
+            parts.append(text)
+            position += len(text)
+
+        self.text.config(state="normal")
+        base = self.text.index("end-1c")
+        self.text.insert(tk.END, "".join(parts))
+        for tag, offsets in ranges.items():
+            self.text.tag_add(tag, *(f"{base}+{offset}c" for offset in offsets))
+        self.text.config(state="disabled")
+
+    def _on_scroll(self, first, last):
+        if self._scrollbar_set is not None:
+            self._scrollbar_set.set(first, last)
+        if float(last) > 0.9 and self.rendered < len(self.items) and not self._page_pending:
+            self._page_pending = True
+            self.text.after_idle(self.render_next_page)
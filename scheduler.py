@@ -0,0 +1,233 @@
+import heapq
+import json
+import os
+import random
+import time
+
+DAY = 86400
+
+
+class BaseScheduler:
+    """Планировщик порядка слов: очередь с приоритетом по сроку повторения и трудности
+
+    Состояние слов хранится в JSON-файле. Следующее слово извлекается из кучи за O(log n);
+    устаревшие записи кучи (слово повторено после постановки в очередь) пропускаются.
+    """
+
+    name = None
+
+    def __init__(self, state_file=None, rng=None):
+        self.state_file = state_file
+        self.state = {}
+        self.random = rng or random.Random()
+        self._heap = []
+        self._versions = {}
+        self.load()
+
+    def load(self):
+        """Загружает состояние слов из файла"""
+        try:
+            if self.state_file and os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('scheduler') == self.name:
+                    self.state = data.get('words', {})
+        except Exception as e:
+            print(f"Ошибка загрузки расписания повторений: {e}")
+
+    def save(self):
+        """Сохраняет состояние слов в файл"""
+        if not self.state_file:
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'scheduler': self.name, 'words': self.state}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            print(f"Ошибка сохранения расписания повторений: {e}")
+
+    def seed_from_history(self, history):
+        """Задает начальное состояние слов без расписания по истории попыток (AttemptHistory)"""
+        if history is None:
+            return
+        for word, (attempts, errors, last_ts) in history.word_summary().items():
+            if word not in self.state and attempts:
+                self.state[word] = self.initial_state(attempts, errors, last_ts)
+
+    def initial_state(self, attempts, errors, last_ts):
+        """Возвращает начальное состояние слова по накопленной статистике"""
+        raise NotImplementedError
+
+    def update_state(self, state, is_correct, response_time, now):
+        """Обновляет состояние слова после ответа"""
+        raise NotImplementedError
+
+    def _priority(self, word, now):
+        """Ключ кучи: день повторения, затем трудность (труднее - раньше), затем случайно
+
+        Все просроченные слова попадают в текущий день, чтобы среди них первыми шли трудные.
+        """
+        today = int(now // DAY)
+        state = self.state.get(word)
+        if state is None:
+            # Новые слова готовы к изучению сразу
+            return today, 0.0, self.random.random()
+        return max(int(state['due'] // DAY), today), -state['difficulty'], self.random.random()
+
+    def build_queue(self, words, now=None):
+        """Строит очередь с приоритетом для списка слов за O(n)"""
+        now = now if now is not None else time.time()
+        self._versions = {}
+        self._heap = []
+        for word in dict.fromkeys(words):
+            self._versions[word] = 0
+            self._heap.append(self._priority(word, now) + (0, word))
+        heapq.heapify(self._heap)
+
+    def next_word(self, now=None, due_only=True):
+        """Извлекает следующее слово из очереди за O(log n) или None"""
+        now = now if now is not None else time.time()
+        while self._heap:
+            due_day, _, _, version, word = self._heap[0]
+            if version != self._versions.get(word):
+                heapq.heappop(self._heap)
+                continue
+            if due_only and due_day > now // DAY:
+                return None
+            heapq.heappop(self._heap)
+            self._versions[word] = version + 1
+            return word
+        return None
+
+    def plan_session(self, words, limit=None, now=None):
+        """Возвращает слова, которые пора повторить, в порядке приоритета
+
+        Если повторять пока нечего, возвращает все слова (ближайшие к сроку - первыми).
+        """
+        self.build_queue(words, now)
+        session = []
+        while limit is None or len(session) < limit:
+            word = self.next_word(now)
+            if word is None:
+                break
+            session.append(word)
+
+        if not session:
+            while limit is None or len(session) < limit:
+                word = self.next_word(now, due_only=False)
+                if word is None:
+                    break
+                session.append(word)
+        return session
+
+    def record(self, word, is_correct, response_time=None, now=None):
+        """Учитывает ответ и переносит слово в очереди на новый срок"""
+        now = now if now is not None else time.time()
+        state = self.state.get(word) or self.initial_state(0, 0, now)
+        self.state[word] = self.update_state(dict(state), is_correct, response_time, now)
+
+        if word in self._versions:
+            version = self._versions[word] + 1
+            self._versions[word] = version
+            heapq.heappush(self._heap, self._priority(word, now) + (version, word))
+
+
+class RandomScheduler(BaseScheduler):
+    """Случайный порядок всех слов (прежнее поведение)"""
+
+    name = 'random'
+
+    def plan_session(self, words, limit=None, now=None):
+        session = list(words)
+        self.random.shuffle(session)
+        return session[:limit] if limit else session
+
+    def seed_from_history(self, history):
+        pass
+
+    def record(self, word, is_correct, response_time=None, now=None):
+        pass
+
+    def save(self):
+        pass
+
+
+class LeitnerScheduler(BaseScheduler):
+    """Система Лейтнера: правильный ответ переносит слово в следующую коробку, ошибка - в первую"""
+
+    name = 'leitner'
+    INTERVALS = [0, 1, 2, 4, 8, 16, 32]
+
+    def initial_state(self, attempts, errors, last_ts):
+        error_rate = errors / attempts if attempts else 0.0
+        if not attempts or error_rate > 0.3:
+            box = 0
+        elif error_rate > 0:
+            box = 1
+        else:
+            box = 2
+        return {'box': box, 'due': last_ts + self.INTERVALS[box] * DAY, 'difficulty': error_rate}
+
+    def update_state(self, state, is_correct, response_time, now):
+        if is_correct:
+            state['box'] = min(state['box'] + 1, len(self.INTERVALS) - 1)
+        else:
+            state['box'] = 0
+        state['due'] = now + self.INTERVALS[state['box']] * DAY
+        # Трудность - скользящее среднее доли ошибок
+        state['difficulty'] = 0.7 * state['difficulty'] + (0.0 if is_correct else 0.3)
+        return state
+
+
+class SM2Scheduler(BaseScheduler):
+    """Алгоритм SuperMemo SM-2 с оценкой качества по правильности и времени ответа"""
+
+    name = 'sm2'
+    SLOW_ANSWER = 10.0
+
+    def initial_state(self, attempts, errors, last_ts):
+        error_rate = errors / attempts if attempts else 0.0
+        return {'ease': max(1.3, 2.5 - error_rate), 'interval': 0, 'repetitions': 0,
+                'due': last_ts, 'difficulty': error_rate}
+
+    def update_state(self, state, is_correct, response_time, now):
+        if not is_correct:
+            quality = 1
+        elif response_time is not None and response_time > self.SLOW_ANSWER:
+            quality = 4
+        else:
+            quality = 5
+
+        if quality < 3:
+            state['repetitions'] = 0
+            state['interval'] = 1
+        else:
+            state['repetitions'] += 1
+            if state['repetitions'] == 1:
+                state['interval'] = 1
+            elif state['repetitions'] == 2:
+                state['interval'] = 6
+            else:
+                state['interval'] = round(state['interval'] * state['ease'])
+        state['ease'] = max(1.3, state['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        # После ошибки слово сразу снова готово к повторению
+        state['due'] = now + (state['interval'] if quality >= 3 else 0) * DAY
+        state['difficulty'] = 2.5 - state['ease']
+        return state
+
+
+SCHEDULERS = {
+    RandomScheduler.name: RandomScheduler,
+    LeitnerScheduler.name: LeitnerScheduler,
+    SM2Scheduler.name: SM2Scheduler,
+}
+
+
+def create_scheduler(name, state_file=None, history=None):
+    """Создает планировщик по имени из настроек"""
+    if name not in SCHEDULERS:
+        raise ValueError(f"Неизвестный планировщик повторений: {name}")
+    scheduler = SCHEDULERS[name](state_file)
+    scheduler.seed_from_history(history)
+    return scheduler
@@ -0,0 +1,259 @@
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # пакетная оценка работает и без numpy, но медленнее
+    np = None
+
+VOWELS = set("аеёиоуыэюя")
+CONSONANTS = set("бвгджзйклмнпрстфхцчшщ")
+VOICING_PAIRS = {frozenset(pair) for pair in ("бп", "вф", "гк", "дт", "жш", "зс")}
+
+# Названия типов ошибок для вывода ученику
+ERROR_LABELS = {
+    'double_consonant': "удвоенная согласная",
+    'soft_sign': "мягкий знак",
+    'hard_sign': "твердый знак",
+    'yo': "е/ё",
+    'unstressed_vowel': "безударная гласная",
+    'voicing': "звонкая/глухая согласная",
+    'transposition': "перестановка букв",
+    'separator': "дефис/пробел",
+    'missing_letter': "пропущена буква",
+    'extra_letter': "лишняя буква",
+    'wrong_letter': "неверная буква",
+}
+
+# Операция выравнивания: kind - 'equal', 'substitute', 'insert' (лишняя буква в ответе),
+# 'delete' (буква пропущена в ответе), 'transpose'; a и c - фрагменты ответа и правильного слова,
+# ai и ci - их позиции
+Op = namedtuple('Op', 'kind a c ai ci')
+Alignment = namedtuple('Alignment', 'distance ops')
+
+
+@lru_cache(maxsize=65536)
+def align(answer, correct):
+    """Выравнивает ответ с правильным словом по расстоянию Дамерау-Левенштейна
+
+    Сравнение без учета регистра. Результат кэшируется по паре (ответ, слово).
+    """
+    a = answer.lower()
+    c = correct.lower()
+    rows, cols = len(a) + 1, len(c) + 1
+    dist = [[0] * cols for _ in range(rows)]
+    for i in range(rows):
+        dist[i][0] = i
+    for j in range(cols):
+        dist[0][j] = j
+
+    for i in range(1, rows):
+        for j in range(1, cols):
+            cost = 0 if a[i - 1] == c[j - 1] else 1
+            best = min(dist[i - 1][j] + 1, dist[i][j - 1] + 1, dist[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and cost and a[i - 1] == c[j - 2] and a[i - 2] == c[j - 1]:
+                best = min(best, dist[i - 2][j - 2] + 1)
+            dist[i][j] = best
+
+    # Обратный проход: восстанавливаем операции
+    ops = []
+    i, j = len(a), len(c)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            cost = 0 if a[i - 1] == c[j - 1] else 1
+            if dist[i][j] == dist[i - 1][j - 1] + cost:
+                ops.append(Op('equal' if not cost else 'substitute', answer[i - 1], correct[j - 1], i - 1, j - 1))
+                i, j = i - 1, j - 1
+                continue
+            if (i > 1 and j > 1 and a[i - 1] == c[j - 2] and a[i - 2] == c[j - 1]
+                    and dist[i][j] == dist[i - 2][j - 2] + 1):
+                ops.append(Op('transpose', answer[i - 2:i], correct[j - 2:j], i - 2, j - 2))
+                i, j = i - 2, j - 2
+                continue
+        if i > 0 and dist[i][j] == dist[i - 1][j] + 1:
+            ops.append(Op('insert', answer[i - 1], '', i - 1, j))
+            i -= 1
+        else:
+            ops.append(Op('delete', '', correct[j - 1], i, j - 1))
+            j -= 1
+
+    ops.reverse()
+    return Alignment(dist[len(a)][len(c)], tuple(ops))
+
+
+def distance(answer, correct):
+    """Расстояние Дамерау-Левенштейна между ответом и словом (без учета регистра)"""
+    return align(answer, correct).distance
+
+
+def _is_double_around(word, pos):
+    """Стоит ли буква word[pos] рядом с такой же согласной"""
+    letter = word[pos].lower() if 0 <= pos < len(word) else ''
+    if letter not in CONSONANTS:
+        return False
+    return any(0 <= k < len(word) and word[k].lower() == letter for k in (pos - 1, pos + 1))
+
+
+def _classify_op(op, answer, correct):
+    a = op.a.lower()
+    c = op.c.lower()
+    if op.kind == 'transpose':
+        return 'transposition'
+    letters = set(a) | set(c)
+    if letters & {'-', ' '}:
+        return 'separator'
+    # При замене ъ/ь друг на друга ошибка относится к знаку из правильного слова
+    if c == 'ъ' or ('ъ' in letters and c != 'ь'):
+        return 'hard_sign'
+    if 'ь' in letters:
+        return 'soft_sign'
+    if op.kind == 'delete':
+        return 'double_consonant' if _is_double_around(correct, op.ci) else 'missing_letter'
+    if op.kind == 'insert':
+        return 'double_consonant' if _is_double_around(answer, op.ai) else 'extra_letter'
+    if {a, c} == {'е', 'ё'}:
+        return 'yo'
+    if a in VOWELS and c in VOWELS:
+        return 'unstressed_vowel'
+    if frozenset((a, c)) in VOICING_PAIRS:
+        return 'voicing'
+    return 'wrong_letter'
+
+
+@lru_cache(maxsize=65536)
+def classify_errors(answer, correct):
+    """Возвращает типы ошибок в ответе (кортеж ключей ERROR_LABELS, по одному на операцию)"""
+    return tuple(_classify_op(op, answer, correct)
+                 for op in align(answer, correct).ops if op.kind != 'equal')
+
+
+def describe_errors(answer, correct):
+    """Краткое описание ошибок для ученика"""
+    kinds = dict.fromkeys(classify_errors(answer, correct))
+    return ", ".join(ERROR_LABELS[kind] for kind in kinds)
+
+
+def diff_segments(answer, correct):
+    """Разбивает ответ на фрагменты для подсветки: [(текст, вид)]
+
+    Вид - 'ok' (верно), 'error' (неверная или лишняя буква) или 'missing' (здесь пропущена
+    буква; текст - пропущенные буквы правильного слова). Соседние фрагменты одного вида
+    склеиваются.
+    """
+    segments = []
+    for op in align(answer, correct).ops:
+        if op.kind == 'equal':
+            kind, text = 'ok', op.a
+        elif op.kind == 'delete':
+            kind, text = 'missing', op.c
+        else:
+            kind, text = 'error', op.a
+        if segments and segments[-1][1] == kind:
+            segments[-1] = (segments[-1][0] + text, kind)
+        else:
+            segments.append((text, kind))
+    return segments
+
+
+def _encode(strings):
+    """Кодирует строки в матрицу кодов символов с выравниванием нулями"""
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int32, count=len(strings))
+    width = int(lengths.max()) if len(strings) else 0
+    codes = np.zeros((len(strings), max(width, 1)), dtype=np.int32)
+    for row, s in enumerate(strings):
+        if s:
+            codes[row, :len(s)] = np.frombuffer(s.encode('utf-32-le'), dtype=np.int32)
+    return codes, lengths
+
+
+def batch_distances(answers, corrects, chunk_size=4096):
+    """Расстояния Дамерау-Левенштейна для многих пар сразу
+
+    С numpy динамическое программирование выполняется одним проходом по сетке позиций,
+    векторизованно по всем парам; пары группируются по длине, чтобы редкие длинные слова
+    не увеличивали сетку для остальных. Без numpy - по одной паре через кэшируемое align().
+    """
+    answers = [a.lower() for a in answers]
+    corrects = [c.lower() for c in corrects]
+    if np is None:
+        return [distance(a, c) for a, c in zip(answers, corrects)]
+
+    result = np.zeros(len(answers), dtype=np.int32)
+    longest = np.fromiter((max(len(a), len(c)) for a, c in zip(answers, corrects)),
+                          dtype=np.int32, count=len(answers))
+    order = np.argsort(longest, kind='stable')
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start:start + chunk_size]
+        result[chunk] = _grid_distances([answers[k] for k in chunk], [corrects[k] for k in chunk])
+    return result
+
+
+def _grid_distances(answers, corrects):
+    """Векторизованное по парам вычисление расстояний для группы пар близкой длины"""
+    a_codes, a_len = _encode(answers)
+    c_codes, c_len = _encode(corrects)
+    n, cols = len(answers), int(c_len.max()) + 1
+    rows_idx = np.arange(n)
+
+    # Пустой ответ: расстояние равно длине слова
+    result = c_len.copy()
+    prev2 = None
+    prev = np.tile(np.arange(cols, dtype=np.int32), (n, 1))
+    for i in range(1, int(a_len.max()) + 1):
+        cur = np.empty_like(prev)
+        cur[:, 0] = i
+        a_i = a_codes[:, i - 1]
+        for j in range(1, cols):
+            cost = (a_i != c_codes[:, j - 1]).astype(np.int32) if j - 1 < c_codes.shape[1] else 1
+            best = np.minimum(np.minimum(prev[:, j] + 1, cur[:, j - 1] + 1), prev[:, j - 1] + cost)
+            if prev2 is not None and j > 1:
+                swapped = ((a_i == c_codes[:, j - 2]) & (a_codes[:, i - 2] == c_codes[:, j - 1])
+                           & (cost == 1))
+                best = np.where(swapped, np.minimum(best, prev2[:, j - 2] + 1), best)
+            cur[:, j] = best
+        done = a_len == i
+        result[done] = cur[rows_idx[done], c_len[done]]
+        prev2, prev = prev, cur
+    return result
+
+
+def score_pairs(pairs):
+    """Оценивает пары (правильное слово, ответ) одним пакетом
+
+    Возвращает словарь: distances (расстояния по парам), mean_distance,
+    similarity (1 - расстояние / длина слова, по парам) и error_types (счетчик типов ошибок).
+    """
+    corrects = [correct for correct, _ in pairs]
+    answers = [answer for _, answer in pairs]
+    distances = batch_distances(answers, corrects)
+
+    # Классификация выполняется один раз на уникальную пару
+    error_types = Counter()
+    for (correct, answer), count in Counter(pairs).items():
+        for kind in classify_errors(answer, correct):
+            error_types[kind] += count
+
+    lengths = [max(len(correct), 1) for correct in corrects]
+    if np is not None:
+        similarity = 1 - np.asarray(distances) / np.asarray(lengths)
+        mean_distance = float(np.mean(distances)) if len(pairs) else 0.0
+    else:
+        similarity = [1 - d / length for d, length in zip(distances, lengths)]
+        mean_distance = sum(distances) / len(distances) if distances else 0.0
+    return {
+        'distances': distances,
+        'mean_distance': mean_distance,
+        'similarity': similarity,
+        'error_types': dict(error_types),
+    }
+
+
+def score_session(session_results):
+    """Оценивает результаты сессии [(правильное слово, ответ, верно ли)]"""
+    return score_pairs([(correct, answer) for correct, answer, _ in session_results])
+
+
+def score_history(history, since=None, until=None):
+    """Оценивает все попытки с сохраненным ответом из AttemptHistory за период"""
+    rows = history.attempts_between(since or 0, until)
+    return score_pairs([(word, answer) for word, answer, *_ in rows if answer is not None])
@@ -1,21 +1,49 @@
 import json
 import os
+import threading
+import time
+import uuid
 from datetime import datetime
 
+from attempt_history import AttemptHistory
+import metrics
+
 
 class StatsManager:
-    def __init__(self, stats_file='spelling_stats.json'):
+    def __init__(self, stats_file='spelling_stats.json', fsync_every=20, fsync_interval=1.0,
+                 compact_threshold=5000, history_db=None, history=None, student=None):
         self.stats_file = stats_file
+        # Журнал попыток: каждая попытка дописывается одной строкой JSON
+        self.journal_file = os.path.splitext(stats_file)[0] + '.journal'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
         self.stats = {
             'total_attempts': 0,
             'correct_attempts': 0,
             'word_stats': {},
-            'session_start': datetime.now().isoformat()
+            'session_start': datetime.now().isoformat(),
+            'session_id': uuid.uuid4().hex
         }
+        # Долговременная история всех попыток (необязательно); общую историю
+        # (например, одну на класс в серверном режиме) передают готовым объектом
+        self._owns_history = history is None
+        self.history = history or (AttemptHistory(history_db) if history_db else None)
+        # Имя ученика, под которым попытки пишутся в общую историю
+        self.student = student
+        # Попытки могут записываться из пула потоков (сервер класса), а сводка
+        # читается из другого потока: счетчики и журнал меняются только под блокировкой
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_seq = 0
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
         self.load_stats()
 
     def load_stats(self):
-        """Загружает статистику из файла"""
+        """Загружает статистику: снимок из файла и записи журнала после него"""
         try:
             if os.path.exists(self.stats_file):
                 with open(self.stats_file, 'r', encoding='utf-8') as f:
@@ -23,24 +51,148 @@ class StatsManager:
         except Exception as e:
             print(f"Ошибка загрузки статистики: {e}")
 
+        self._journal_seq = self.stats.pop('journal_seq', 0)
+        self._journal_records = self._replay_journal()
+
+        # Длинный журнал сворачиваем в снимок, чтобы не разбирать его при каждом запуске
+        if self._journal_records >= self.compact_threshold:
+            self.compact()
+
+    def _replay_journal(self):
+        """Применяет к статистике записи журнала, которых еще нет в снимке"""
+        if not os.path.exists(self.journal_file):
+            return 0
+        applied = 0
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # Оборванная последняя строка - результат сбоя при записи
+                    if not line.endswith('\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('s', 0) <= self._journal_seq:
+                        continue
+                    self._apply(record)
+                    self._journal_seq = record['s']
+                    applied += 1
+        except Exception as e:
+            print(f"Ошибка чтения журнала статистики: {e}")
+        return applied
+
+    def _apply(self, record):
+        """Применяет одну запись журнала к статистике в памяти"""
+        if record.get('t') == 'reset':
+            self._reset_in_memory(record.get('ts'), record.get('sid'))
+        elif record.get('t') == 'attempt':
+            self._count_attempt(record['w'], bool(record['c']))
+
     def save_stats(self):
-        """Сохраняет статистику в файл"""
+        """Сохраняет статистику в файл (атомарно) и очищает журнал"""
+        self.compact()
+
+    def compact(self):
+        """Сворачивает журнал в снимок статистики"""
+        with self._lock, metrics.timer('stats.compact'):
+            self._sync_journal()
+            snapshot = dict(self.stats, journal_seq=self._journal_seq)
+            tmp_file = f"{self.stats_file}.tmp"
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.stats_file)
+
+                # Снимок уже содержит все записи журнала (их номера <= journal_seq)
+                self._close_journal()
+                with open(self.journal_file, 'w', encoding='utf-8'):
+                    pass
+                self._journal_records = 0
+            except Exception as e:
+                print(f"Ошибка сохранения статистики: {e}")
+
+    def _append_journal(self, record):
+        """Дописывает запись в журнал; fsync выполняется пачками"""
+        self._journal_seq += 1
+        record['s'] = self._journal_seq
         try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            if self._journal is None:
+                self._journal = self._open_journal()
+            self._journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            self._journal_records += 1
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync_journal()
         except Exception as e:
-            print(f"Ошибка сохранения статистики: {e}")
+            print(f"Ошибка записи журнала статистики: {e}")
 
-    def reset_current_session(self):
-        """Сбрасывает статистику для новой сессии"""
+    def _open_journal(self):
+        """Открывает журнал на дозапись, отделяя оборванную строку после сбоя"""
+        journal = open(self.journal_file, 'a', encoding='utf-8')
+        if journal.tell() > 0:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    journal.write('\n')
+        return journal
+
+    def _sync_journal(self):
+        """Сбрасывает журнал на диск"""
+        if self._journal is not None and self._unsynced:
+            with metrics.timer('stats.journal_fsync'):
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def close(self):
+        """Сбрасывает журнал и сохраняет итоговый снимок"""
+        with self._lock:
+            if self._journal_records:
+                self.compact()
+            self._close_journal()
+        if self.history and self._owns_history:
+            self.history.close()
+
+    def _reset_in_memory(self, session_start=None, session_id=None):
         self.stats['total_attempts'] = 0
         self.stats['correct_attempts'] = 0
         self.stats['word_stats'] = {}
-        self.stats['session_start'] = datetime.now().isoformat()
-        self.save_stats()
+        self.stats['session_start'] = session_start or datetime.now().isoformat()
+        self.stats['session_id'] = session_id or uuid.uuid4().hex
 
-    def add_attempt(self, word, is_correct):
-        """Добавляет попытку для слова"""
+    def reset_current_session(self):
+        """Сбрасывает статистику для новой сессии"""
+        with self._lock:
+            self._reset_in_memory()
+            # Сброс попадает в журнал: если свернуть журнал не удастся, после перезапуска
+            # попытки прошлой сессии не вернутся в статистику
+            self._append_journal({'t': 'reset', 'ts': self.stats['session_start'],
+                                  'sid': self.stats['session_id']})
+            # После сброса снимок маленький - сразу сворачиваем журнал
+            self.compact()
+
+    def add_attempt(self, word, is_correct, answer=None, response_time=None):
+        """Добавляет попытку для слова (ответ и время ответа сохраняются в истории)"""
+        with self._lock:
+            self._count_attempt(word, is_correct)
+            self._append_journal({'t': 'attempt', 'w': word, 'c': int(bool(is_correct))})
+        if self.history:
+            self.history.record_attempt(word, answer, is_correct, self.stats.get('session_id'),
+                                        response_time, student=self.student)
+
+    def _count_attempt(self, word, is_correct):
+        """Обновляет счетчики в памяти"""
         self.stats['total_attempts'] += 1
 
         if is_correct:
@@ -54,20 +206,31 @@ class StatsManager:
         if is_correct:
             self.stats['word_stats'][word]['correct'] += 1
 
-        self.save_stats()
-
     def get_current_session_errors(self):
         """Возвращает ошибки текущей сессии"""
         errors = {}
-        for word, data in self.stats['word_stats'].items():
-            error_count = data['attempts'] - data['correct']
-            if error_count > 0:
-                errors[word] = error_count
+        with self._lock:
+            for word, data in self.stats['word_stats'].items():
+                error_count = data['attempts'] - data['correct']
+                if error_count > 0:
+                    errors[word] = error_count
         return errors
 
     def get_stats(self):
         """Возвращает текущую статистику"""
-        return self.stats.copy()
+        with self._lock:
+            return self.stats.copy()
+
+    def snapshot(self):
+        """Согласованная сводка текущей сессии (можно читать из другого потока)"""
+        with self._lock:
+            return {
+                'total_attempts': self.stats['total_attempts'],
+                'correct_attempts': self.stats['correct_attempts'],
+                'percentage': self.get_percentage(),
+                'grade': self.calculate_grade(),
+                'errors': self.get_current_session_errors(),
+            }
 
     def get_percentage(self):
         """Возвращает процент правильных ответов"""
@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import threading
+import time
+
+# Приоритеты задач: меньше - раньше
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class TaskCancelled(Exception):
+    """Задача остановлена по токену отмены"""
+
+
+class CancelToken(threading.Event):
+    """Токен отмены задачи: задача сама проверяет его между шагами работы
+
+    Это обычное threading.Event, поэтому токен можно передавать в код, который
+    ничего не знает о планировщике и проверяет только is_set().
+    """
+
+    def cancel(self):
+        self.set()
+
+    @property
+    def cancelled(self):
+        return self.is_set()
+
+    def raise_if_cancelled(self):
+        if self.is_set():
+            raise TaskCancelled()
+
+
+class Task:
+    """Задача планировщика: функция func(token, *args) и обработчики результата"""
+
+    def __init__(self, func, args, priority, name, on_done, on_error, on_cancel):
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.name = name or getattr(func, '__name__', 'task')
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.token = CancelToken()
+        self.finished = threading.Event()
+
+    def cancel(self):
+        self.token.cancel()
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+
+class TaskScheduler:
+    """Фоновые задачи с приоритетами и отменой плюс единый насос обновлений интерфейса
+
+    Задачи выполняются в worker_count потоках в порядке приоритета. Обработчики
+    результата и все обновления интерфейса из рабочих потоков не ставятся в
+    очередь Tk по одному: post() и call_soon() копят их, а один таймер Tk
+    выполняет накопленное не чаще fps раз в секунду. post(key, ...) с тем же
+    ключом заменяет еще не выполненное обновление (например, прогресс).
+
+    Приоритет только упорядочивает очередь, а долгая задача занимает поток до
+    конца, поэтому кроме worker_count общих потоков есть еще один, который берет
+    только задачи PRIORITY_HIGH: срочная задача не ждет, пока закончатся долгие.
+    """
+
+    def __init__(self, root, worker_count=2, fps=30):
+        self.root = root
+        self.frame_ms = max(1, int(1000 / fps))
+        self._lock = threading.Condition()
+        self._queue = []
+        self._order = itertools.count()
+        self._running = set()
+        self._posted = {}
+        self._calls = []
+        self._closed = False
+        self._pump_job = self.root.after(self.frame_ms, self._pump)
+        self._workers = [threading.Thread(target=self._work, name=f'task-worker-{index}', daemon=True)
+                         for index in range(max(1, worker_count))]
+        self._workers.append(threading.Thread(target=self._work, args=(PRIORITY_HIGH,),
+                                              name='task-worker-urgent', daemon=True))
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, func, *args, priority=PRIORITY_NORMAL, name=None,
+               on_done=None, on_error=None, on_cancel=None):
+        """Ставит задачу в очередь; обработчики вызываются в потоке Tk
+
+        func вызывается как func(token, *args) и должна проверять token между
+        шагами работы. on_done(result), on_error(exception), on_cancel().
+        """
+        task = Task(func, args, priority, name, on_done, on_error, on_cancel)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Планировщик задач остановлен")
+            heapq.heappush(self._queue, (priority, next(self._order), task))
+            # Будим всех: ждущий срочный поток не возьмет обычную задачу
+            self._lock.notify_all()
+        return task
+
+    def cancel_all(self):
+        """Отменяет все задачи: ждущие в очереди и выполняемые"""
+        with self._lock:
+            tasks = [task for _, _, task in self._queue] + list(self._running)
+        for task in tasks:
+            task.cancel()
+
+    def post(self, key, callback, *args):
+        """Передает обновление интерфейса; из нескольких с одним ключом выполнится последнее"""
+        with self._lock:
+            self._posted[key] = (callback, args)
+
+    def call_soon(self, callback, *args):
+        """Выполняет callback в потоке Tk на ближайшем кадре насоса"""
+        with self._lock:
+            self._calls.append((callback, args))
+
+    def _has_work(self, max_priority):
+        return bool(self._queue) and (max_priority is None or self._queue[0][0] <= max_priority)
+
+    def _work(self, max_priority=None):
+        """Рабочий поток; с max_priority берет только задачи не ниже этого приоритета"""
+        while True:
+            with self._lock:
+                while not self._has_work(max_priority) and not self._closed:
+                    self._lock.wait()
+                if not self._has_work(max_priority):
+                    return
+                _, _, task = heapq.heappop(self._queue)
+                self._running.add(task)
+            try:
+                self._run_task(task)
+            finally:
+                with self._lock:
+                    self._running.discard(task)
+                task.finished.set()
+
+    def _run_task(self, task):
+        if task.cancelled:
+            result = error = None
+        else:
+            try:
+                result, error = task.func(task.token, *task.args), None
+            except TaskCancelled:
+                result = error = None
+            except Exception as e:
+                result, error = None, e
+
+        if task.cancelled:
+            if task.on_cancel:
+                self.call_soon(task.on_cancel)
+        elif error is not None:
+            if task.on_error:
+                self.call_soon(task.on_error, error)
+            else:
+                print(f"Ошибка фоновой задачи '{task.name}': {error}")
+        elif task.on_done:
+            self.call_soon(task.on_done, result)
+
+    def _pump(self):
+        """Один кадр насоса: выполняет накопленные вызовы и обновления (поток Tk)"""
+        with self._lock:
+            calls, self._calls = self._calls, []
+            posted, self._posted = self._posted, {}
+        # Сначала обновления состояния (прогресс), затем разовые вызовы (например, завершение задачи)
+        for callback, args in list(posted.values()) + calls:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Ошибка обновления интерфейса: {e}")
+        if not self._closed:
+            self._pump_job = self.root.after(self.frame_ms, self._pump)
+
+    def shutdown(self, timeout=5.0):
+        """Отменяет все задачи, дожидается рабочих потоков и останавливает насос
+
+        timeout - общее время ожидания всех потоков; не успевшие закончить рабочие
+        потоки (daemon) дорабатывают отмененные задачи сами и не держат выход.
+        """
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        self.cancel_all()
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        if self._pump_job is not None:
+            try:
+                self.root.after_cancel(self._pump_job)
+            except Exception:
+                pass
+            self._pump_job = None
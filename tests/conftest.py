@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Модули программы лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Тестам не нужна звуковая карта: если pygame инициализирует микшер, то без устройства
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
@@ -0,0 +1,34 @@
+import threading
+
+import analytics
+from analytics import AttemptColumns, word_error_rates
+from attempt_history import AttemptHistory
+
+
+def test_columns_are_read_in_chunks_while_attempts_are_recorded(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, 'FETCH_CHUNK', 3)
+    history = AttemptHistory(str(tmp_path / 'history.db'), batch_size=1)
+    for n in range(10):
+        history.record_attempt('кот', 'кит' if n % 2 else 'кот', n % 2 == 0, ts=1000 + n)
+    chunks = history.query_chunks("SELECT word FROM attempts", chunk_size=3)
+    next(chunks)
+
+    # Запись из другого потока не ждет конца чтения
+    writer = threading.Thread(target=history.record_attempt, args=('дом', 'дом', True), kwargs={'ts': 2000})
+    writer.start()
+    writer.join(timeout=5)
+    assert not writer.is_alive()
+    chunks.close()
+
+    columns = AttemptColumns.from_history(history, since=1000, until=1010)
+    assert len(columns) == 10
+    assert word_error_rates(columns) == [('кот', 10, 5, 0.5)]
+    history.close()
+
+
+def test_pending_attempts_are_visible_to_analytics(tmp_path):
+    history = AttemptHistory(str(tmp_path / 'history.db'))
+    history.record_attempt('кот', 'кит', False)
+    columns = AttemptColumns.from_history(history)
+    assert columns.words == ['кот'] and columns.answers == ['кит']
+    history.close()
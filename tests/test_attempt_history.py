@@ -0,0 +1,28 @@
+import json
+
+from attempt_history import AttemptHistory
+
+
+def test_batched_attempts_keep_the_student(tmp_path):
+    history = AttemptHistory(str(tmp_path / 'history.db'))
+    history.record_many([('кот', 'кит', 0, 1000.0, 's1', None), ('дом', 'дом', 1, 1001.0, 's1', 1500)],
+                        student='аня')
+    history.record_attempt('кот', 'кот', True, ts=1002.0, student='боря')
+
+    assert history.word_summary('аня') == {'кот': (1, 1, 1000.0), 'дом': (1, 0, 1001.0)}
+    assert history.for_student('боря').word_summary() == {'кот': (1, 0, 1002.0)}
+    assert history.word_summary()['кот'][:2] == (2, 1)
+    history.close()
+
+
+def test_imported_stats_are_attributed_to_the_student(tmp_path):
+    stats_file = tmp_path / 'stats.json'
+    stats_file.write_text(json.dumps({'session_start': '2024-01-02T10:00:00',
+                                      'word_stats': {'кот': {'attempts': 3, 'correct': 1}}}))
+    history = AttemptHistory(str(tmp_path / 'history.db'))
+
+    assert history.import_json_stats(str(stats_file), student='аня') == 3
+    attempts, errors, _ = history.word_summary('аня')['кот']
+    assert (attempts, errors) == (3, 2)
+    assert history.word_summary('боря') == {}
+    history.close()
@@ -0,0 +1,123 @@
+import os
+
+import audio_bundle
+from audio_bundle import AudioBundle
+
+
+def test_appended_records_are_read_back(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.append('b', b'second record')
+
+    assert bytes(bundle.get('a')) == b'first'
+    assert bytes(bundle.get('b', verify=True)) == b'second record'
+    assert bundle.get('missing') is None
+    assert len(bundle) == 2 and 'a' in bundle
+    bundle.close()
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.close()
+
+    reopened = AudioBundle.open_if_exists(str(tmp_path))
+    assert reopened is not None
+    reopened.append('b', b'second')
+    assert bytes(reopened.get('a')) == b'first'
+    assert bytes(reopened.get('b')) == b'second'
+    reopened.close()
+
+
+def test_open_if_exists_without_bundle(tmp_path):
+    assert AudioBundle.open_if_exists(str(tmp_path)) is None
+    assert AudioBundle.open_if_exists(None) is None
+
+
+def test_torn_index_line_and_missing_data_are_ignored(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.close()
+    with open(bundle.index_path, 'a', encoding='utf-8') as f:
+        # Запись о данных, которые не успели попасть в файл, и оборванная строка
+        f.write("b\t5\t100\t0\n")
+        f.write("c\t5\t")
+
+    reopened = AudioBundle(str(tmp_path))
+    assert list(reopened.keys()) == ['a']
+    reopened.close()
+
+
+def test_verify_finds_damaged_records(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.append('b', b'second')
+    bundle.close()
+    with open(bundle.data_path, 'r+b') as f:
+        f.seek(0)
+        f.write(b'X')
+
+    reopened = AudioBundle(str(tmp_path))
+    assert reopened.verify() == ['a']
+    reopened.close()
+
+
+def test_pack_folder_adds_each_file_once(tmp_path):
+    for name, data in (('a.mp3', b'first'), ('b.mp3', b'second'), ('notes.txt', b'text')):
+        (tmp_path / name).write_bytes(data)
+    bundle = AudioBundle(str(tmp_path))
+
+    assert bundle.pack_folder() == 2
+    assert bundle.pack_folder(remove_files=True) == 0
+    assert sorted(bundle.keys()) == ['a', 'b']
+    assert bytes(bundle.get('b')) == b'second'
+    assert sorted(os.listdir(tmp_path)) == sorted([AudioBundle.DATA_NAME, AudioBundle.INDEX_NAME, 'notes.txt'])
+    bundle.close()
+
+
+def test_alias_shares_data_with_the_original_key(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('old', b'clip')
+    bundle.add_alias('new', 'old')
+    bundle.close()
+
+    reopened = AudioBundle(str(tmp_path))
+    assert bytes(reopened.get('new')) == b'clip'
+    assert reopened.index['new'] == reopened.index['old']
+    reopened.close()
+
+
+def test_discarded_records_stay_discarded_after_reload(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.append('b', b'second')
+    bundle.discard('a')
+    bundle.discard('missing')
+    assert 'a' not in bundle
+    bundle.close()
+
+    reopened = AudioBundle(str(tmp_path))
+    assert list(reopened.keys()) == ['b']
+    reopened.close()
+
+
+def test_pack_folder_includes_wav_clips(tmp_path):
+    (tmp_path / 'a.mp3').write_bytes(b'mp3')
+    (tmp_path / 'b.wav').write_bytes(b'wav')
+    bundle = AudioBundle(str(tmp_path))
+
+    assert bundle.pack_folder() == 2
+    assert bytes(bundle.get('b')) == b'wav'
+    bundle.close()
+
+
+def test_cli_reads_without_creating_the_folder(tmp_path, capsys):
+    missing = tmp_path / 'missing'
+    assert audio_bundle.main(['info', str(missing)]) == 1
+    assert audio_bundle.main(['verify', str(missing)]) == 1
+    assert not missing.exists()
+
+    (tmp_path / 'a.mp3').write_bytes(b'clip')
+    assert audio_bundle.main(['pack', str(tmp_path)]) == 0
+    assert audio_bundle.main(['verify', str(tmp_path)]) == 0
+    assert "повреждено: 0" in capsys.readouterr().out
@@ -0,0 +1,120 @@
+import os
+import string
+
+from audio_bundle import AudioBundle
+from audio_manifest import AudioManifest
+
+
+# Символы, которые старая схема имен (AudioPlayer._make_safe_filename) оставляла как есть
+SAFE_CHARS = set("абвгдежзийклмнопрстуфхцчшщъыьэюяАБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+                 + string.ascii_letters + string.digits + "-_")
+
+
+def legacy_name(word):
+    return "".join(c if c in SAFE_CHARS else "_" for c in word)
+
+
+def test_keys_depend_on_normalized_text_language_and_engine():
+    key = AudioManifest.make_key('Ёж', 'ru', 'gtts')
+    assert key == AudioManifest.make_key(' ёж ', 'ru', 'gtts')
+    assert key != AudioManifest.make_key('еж', 'ru', 'gtts')
+    assert key != AudioManifest.make_key('_ж', 'ru', 'gtts')
+    assert key != AudioManifest.make_key('ёж', 'en', 'gtts')
+    assert key != AudioManifest.make_key('ёж', 'ru', 'pyttsx3')
+    assert len(key) == AudioManifest.KEY_LENGTH
+
+
+def test_entries_survive_reload(tmp_path):
+    manifest = AudioManifest(str(tmp_path))
+    key = manifest.make_key('кот')
+    manifest.add(key, 'кот', 10)
+    manifest.save()
+
+    reloaded = AudioManifest(str(tmp_path))
+    assert reloaded.lookup(key)['word'] == 'кот'
+    assert reloaded.total_bytes == 10
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    manifest = AudioManifest(str(tmp_path), max_bytes=25)
+    keys = [manifest.make_key(word) for word in ('кот', 'дом', 'лес')]
+    for key, word in zip(keys, ('кот', 'дом', 'лес')):
+        with open(manifest.file_path(key), 'wb') as f:
+            f.write(b'x' * 10)
+        manifest.add(key, word, 10)
+
+    assert keys[0] not in manifest.entries
+    assert not os.path.exists(manifest.file_path(keys[0]))
+    assert keys[1] in manifest.entries and keys[2] in manifest.entries
+    assert manifest.total_bytes == 20
+
+
+def test_legacy_file_is_migrated_to_its_key(tmp_path):
+    (tmp_path / 'вокзал.mp3').write_bytes(b'audio')
+    manifest = AudioManifest(str(tmp_path))
+    assert manifest.has_legacy_files()
+
+    migrated = manifest.migrate_legacy(['вокзал'], manifest.make_key, legacy_name)
+
+    key = manifest.make_key('вокзал')
+    assert migrated == 1
+    assert manifest.lookup(key)['word'] == 'вокзал'
+    with open(manifest.file_path(key), 'rb') as f:
+        assert f.read() == b'audio'
+    assert not (tmp_path / 'вокзал.mp3').exists()
+
+
+def test_colliding_legacy_name_is_dropped(tmp_path):
+    # 'ёж' и '_ж' по старой схеме записывались в один файл
+    (tmp_path / '_ж.mp3').write_bytes(b'audio')
+    manifest = AudioManifest(str(tmp_path))
+
+    migrated = manifest.migrate_legacy(['ёж', '_ж'], manifest.make_key, legacy_name)
+
+    assert migrated == 0
+    assert manifest.entries == {}
+    assert not (tmp_path / '_ж.mp3').exists()
+
+
+def test_legacy_bundle_entry_gets_an_alias(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('вокзал', b'audio')
+    manifest = AudioManifest(str(tmp_path))
+
+    assert manifest.migrate_legacy(['вокзал'], manifest.make_key, legacy_name, bundle) == 1
+    assert bytes(bundle.get(manifest.make_key('вокзал'))) == b'audio'
+    bundle.close()
+
+
+def test_lossy_legacy_name_is_regenerated(tmp_path):
+    # '_ж.mp3' мог принадлежать и 'ёж', и любому другому слову с замененной буквой
+    (tmp_path / '_ж.mp3').write_bytes(b'audio')
+    manifest = AudioManifest(str(tmp_path))
+
+    assert manifest.migrate_legacy(['ёж'], manifest.make_key, legacy_name) == 0
+    assert manifest.entries == {}
+    assert not (tmp_path / '_ж.mp3').exists()
+
+
+def test_lossy_legacy_bundle_entry_is_discarded(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('_ж', b'audio')
+    manifest = AudioManifest(str(tmp_path))
+
+    assert manifest.migrate_legacy(['ёж'], manifest.make_key, legacy_name, bundle) == 0
+    assert '_ж' not in bundle
+    assert manifest.make_key('ёж') not in bundle
+    bundle.close()
+
+
+def test_only_stale_part_files_are_removed(tmp_path):
+    fresh = tmp_path / f"{'0' * 32}.mp3.1.1{AudioManifest.PART_SUFFIX}"
+    stale = tmp_path / f"{'1' * 32}.mp3.1.1{AudioManifest.PART_SUFFIX}"
+    fresh.write_bytes(b'writing')
+    stale.write_bytes(b'torn')
+    old = os.path.getmtime(stale) - AudioManifest.PART_MAX_AGE - 1
+    os.utime(stale, (old, old))
+
+    AudioManifest(str(tmp_path))
+
+    assert fresh.exists() and not stale.exists()
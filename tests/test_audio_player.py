@@ -0,0 +1,190 @@
+import os
+import sys
+import threading
+
+import pytest
+
+import audio_player
+from audio_bundle import AudioBundle
+from audio_player import AudioPlayer
+from tts_engines import StubTTSBackend
+
+
+class FlakyBackend:
+    """Функция TTS, которая первые failures вызовов для каждого слова завершает ошибкой"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, word, file_path):
+        with self._lock:
+            self.calls[word] = self.calls.get(word, 0) + 1
+            attempt = self.calls[word]
+        if attempt <= self.failures:
+            raise ConnectionError(f"сбой {attempt}")
+        with open(file_path, 'wb') as f:
+            f.write(word.encode('utf-8'))
+
+
+def make_player(folder, backend, **options):
+    options.setdefault('requests_per_second', None)
+    return AudioPlayer(str(folder), tts_backend=backend, init_mixer=False, **options)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Задержки между повторами запоминаются вместо ожидания"""
+    delays = []
+    monkeypatch.setattr(audio_player.time, 'sleep', delays.append)
+    return delays
+
+
+def test_duplicate_words_are_synthesized_once(tmp_path):
+    backend = StubTTSBackend()
+    player = make_player(tmp_path, backend, max_workers=4)
+    progress = []
+
+    paths = player.generate_all_audio_files(['кот', 'дом', 'кот', 'лес', 'дом'],
+                                            lambda percent, word: progress.append((percent, word)))
+
+    assert backend.calls == 3
+    assert len(paths) == 5
+    assert paths[0] == paths[2] and paths[1] == paths[4]
+    assert all(os.path.exists(path) for path in paths)
+    assert sorted(word for _, word in progress) == ['дом', 'кот', 'лес']
+    assert progress[-1][0] == 100
+    player.cleanup()
+
+
+def test_cached_words_are_not_synthesized_again(tmp_path):
+    backend = StubTTSBackend()
+    player = make_player(tmp_path, backend)
+    player.generate_all_audio_files(['кот', 'дом'])
+    player.cleanup()
+
+    player = make_player(tmp_path, backend)
+    player.generate_all_audio_files(['кот', 'дом', 'лес'])
+
+    assert backend.calls == 3
+    player.cleanup()
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_cancel_event_stops_generation(tmp_path, batch):
+    backend = StubTTSBackend(latency=0.01, batch=batch)
+    player = make_player(tmp_path, backend, max_workers=1, batch_size=2)
+    words = [f"слово{index}" for index in range(20)]
+    cancel = threading.Event()
+    ready = []
+
+    def on_ready(word, file_path):
+        ready.append(word)
+        cancel.set()
+
+    paths = player.generate_all_audio_files(words, ready_callback=on_ready, cancel_event=cancel)
+
+    # Дорабатывают только уже начатые слова (или одна пачка)
+    assert backend.calls <= 3
+    assert len(paths) == len(ready) < len(words)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+    player.cleanup()
+
+
+def test_failed_requests_are_retried_with_exponential_backoff(tmp_path, sleeps):
+    backend = FlakyBackend(failures=2)
+    player = make_player(tmp_path, backend, max_retries=3, retry_delay=0.5)
+
+    paths = player.generate_all_audio_files(['кот'])
+
+    assert backend.calls == {'кот': 3}
+    assert sleeps == [0.5, 1.0]
+    assert len(paths) == 1 and os.path.exists(paths[0])
+    player.cleanup()
+
+
+def test_word_fails_after_retries_are_exhausted(tmp_path, sleeps):
+    backend = FlakyBackend(failures=10)
+    player = make_player(tmp_path, backend, max_retries=2, retry_delay=0.1)
+    progress = []
+    ready = []
+
+    paths = player.generate_all_audio_files(['кот'], lambda percent, word: progress.append(word),
+                                            ready_callback=lambda word, path: ready.append((word, path)))
+
+    assert backend.calls == {'кот': 3}
+    assert sleeps == [0.1, 0.2]
+    assert paths == []
+    assert progress == ['Ошибка: кот']
+    assert ready == [('кот', None)]
+    assert not player.has_audio('кот')
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+    player.cleanup()
+
+
+def test_clips_keep_the_engine_file_extension(tmp_path):
+    backend = StubTTSBackend()
+    backend.extension = '.wav'
+    player = make_player(tmp_path, backend)
+
+    path = player.generate_audio_file('кот')
+
+    assert path.endswith('.wav') and os.path.exists(path)
+    assert player.generate_audio_file('кот') == path
+    assert backend.calls == 1
+    player.cleanup()
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    now = [100.0]
+    delays = []
+    monkeypatch.setattr(audio_player.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(audio_player.time, 'sleep', delays.append)
+    limiter = audio_player.RateLimiter(requests_per_second=4)
+
+    for _ in range(3):
+        limiter.acquire()
+
+    assert delays == [0.25, 0.5]
+
+
+def test_player_without_mixer_shuts_down_without_pygame(tmp_path, monkeypatch):
+    # Сервер создает плеер без микшера, и pygame может быть вовсе не установлен
+    monkeypatch.delitem(sys.modules, 'pygame', raising=False)
+    player = make_player(tmp_path, StubTTSBackend())
+
+    player.stop_playback()
+    player.cleanup()
+
+    assert player.playback._thread is None
+    assert 'pygame' not in sys.modules
+
+
+def test_transcoder_uses_default_format_without_a_mixer(tmp_path, monkeypatch):
+    created = []
+    monkeypatch.setattr('audio_transcode.Transcoder', lambda *args: created.append(args) or args)
+    player = make_player(tmp_path, StubTTSBackend(), transcode=True, transcode_workers=1)
+    player.mixer_error = RuntimeError("нет звукового устройства")
+
+    player._get_transcoder()
+
+    assert created == [(44100, 2, 1)]
+    player._transcoder = None
+    player.cleanup()
+
+
+def test_bundled_words_get_distinct_refs(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('старая запись', b'clip')
+    bundle.close()
+    backend = StubTTSBackend()
+    player = make_player(tmp_path, backend)
+
+    paths = player.generate_all_audio_files(['кот', 'дом', 'кот'])
+    assert player.bundle is not None and len(player.bundle) == 3
+    assert paths[0] == paths[2] and paths[0] != paths[1]
+    assert player.generate_all_audio_files(['кот', 'дом']) == paths[:2]
+    assert backend.calls == 2
+    assert player.read_audio('дом')[1].endswith('дом'.encode('utf-8'))
+    player.cleanup()
@@ -0,0 +1,65 @@
+import os
+
+from audio_bundle import AudioBundle
+from audio_player import AudioPlayer
+from audio_verify import QUARANTINE_DIR, verify_folder
+from tts_engines import StubTTSBackend
+
+
+def make_player(folder):
+    return AudioPlayer(str(folder), tts_backend=StubTTSBackend(), requests_per_second=None, init_mixer=False)
+
+
+def damage(path, offset=0):
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(b'X')
+
+
+def test_damaged_files_are_quarantined_and_regenerated(tmp_path):
+    player = make_player(tmp_path)
+    paths = player.generate_all_audio_files(['кот', 'дом'])
+    damage(paths[0], 4)
+
+    report = verify_folder(str(tmp_path), workers=1, player=player)
+
+    assert report['checked'] == 2
+    assert [item['word'] for item in report['bad']] == ['кот']
+    assert report['regenerated'] == 1
+    assert os.listdir(tmp_path / QUARANTINE_DIR) == [os.path.basename(paths[0])]
+    assert verify_folder(str(tmp_path), workers=1)['bad'] == []
+    player.cleanup()
+
+
+def test_damaged_bundle_records_are_quarantined_and_regenerated(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('старая запись', b'clip')
+    bundle.close()
+    player = make_player(tmp_path)
+    player.generate_all_audio_files(['кот', 'дом'])
+    key = player._audio_key('кот')
+    offset = player.bundle.index[key][0]
+    damage(bundle.data_path, offset)
+
+    report = verify_folder(str(tmp_path), workers=1, player=player, words=['кот', 'дом'])
+
+    assert report['checked'] == 3
+    assert report['bundle_bad'] == [key]
+    assert report['regenerated'] == 1
+    assert os.listdir(tmp_path / QUARANTINE_DIR) == [f"{key}.bundle"]
+    assert bytes(player.bundle.get(key, verify=True)).endswith('кот'.encode('utf-8'))
+    player.cleanup()
+
+
+def test_report_only_mode_changes_nothing(tmp_path):
+    bundle = AudioBundle(str(tmp_path))
+    bundle.append('a', b'first')
+    bundle.close()
+    damage(bundle.data_path)
+
+    report = verify_folder(str(tmp_path), workers=1, quarantine=False)
+
+    assert report['checked'] == 1 and report['bundle_bad'] == ['a']
+    assert not (tmp_path / QUARANTINE_DIR).exists()
+    assert 'a' in AudioBundle(str(tmp_path))
+
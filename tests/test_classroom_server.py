@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from audio_player import AudioPlayer
+from classroom_server import Classroom, ClassroomServer, HTTPError
+from tts_engines import StubTTSBackend
+
+
+def test_aggregate_is_consistent_while_students_answer(tmp_path):
+    classroom = Classroom(['кот', 'дом', 'лес'], str(tmp_path))
+    stop = threading.Event()
+    failures = []
+
+    def student(name):
+        try:
+            while not stop.is_set():
+                _, session = classroom.start_session(name)
+                while not session.is_finished:
+                    session.submit_answer('неверно')
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=student, args=(f"ученик{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(300):
+            report = classroom.aggregate()
+            # Все ответы неверные: ошибок ровно столько же, сколько попыток
+            assert report['attempts'] == sum(count for _, count in report['hardest_words'])
+            assert report['correct'] == 0
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    assert failures == []
+    classroom.close()
+
+
+@pytest.mark.parametrize('value', ['bytes=10-', 'bytes=5-2', 'bytes=-', 'items=0-1'])
+def test_unsatisfiable_range_reports_the_resource_size(value):
+    with pytest.raises(HTTPError) as error:
+        ClassroomServer._parse_range(value, 10)
+    assert error.value.status == 416
+    assert error.value.headers == {'Content-Range': 'bytes */10'}
+
+
+def test_ranges_are_clamped_to_the_resource():
+    assert ClassroomServer._parse_range('bytes=2-', 10) == (2, 9)
+    assert ClassroomServer._parse_range('bytes=-4', 10) == (6, 9)
+    assert ClassroomServer._parse_range('bytes=0-100', 10) == (0, 9)
+
+
+def test_local_stub_engine_is_not_rate_limited(tmp_path):
+    player = AudioPlayer(str(tmp_path), tts_backend=StubTTSBackend(network=False), init_mixer=False)
+    assert player.rate_limiter.interval == 0.0
+    player.cleanup()
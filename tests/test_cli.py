@@ -0,0 +1,48 @@
+import json
+
+import cli
+from attempt_history import AttemptHistory
+
+
+def write_replay(tmp_path):
+    words = tmp_path / 'words.txt'
+    words.write_text('кот\nдом\nлес\n', encoding='utf-8')
+    replay = tmp_path / 'answers.jsonl'
+    replay.write_text(json.dumps({'word': 'кот', 'answer': 'кит'}, ensure_ascii=False) + '\n', encoding='utf-8')
+    return str(words), str(replay)
+
+
+def history_count(path):
+    history = AttemptHistory(path)
+    count = history._query("SELECT COUNT(*) FROM attempts")[0][0]
+    history.close()
+    return count
+
+
+def test_replay_leaves_history_and_schedule_untouched(tmp_path, capsys):
+    words, replay = write_replay(tmp_path)
+    history_db = str(tmp_path / 'history.db')
+    history = AttemptHistory(history_db)
+    history.record_attempt('дом', 'дом', True)
+    history.close()
+    schedule = tmp_path / 'schedule.json'
+
+    assert cli.main([words, '--replay', replay, '--scheduler', 'leitner', '--history-db', history_db,
+                     '--schedule-file', str(schedule), '--json']) == 0
+
+    results = json.loads(capsys.readouterr().out)
+    assert results['answers'] > 0
+    assert history_count(history_db) == 1
+    assert not schedule.exists()
+
+
+def test_replay_persists_only_when_asked(tmp_path, capsys):
+    words, replay = write_replay(tmp_path)
+    history_db = str(tmp_path / 'history.db')
+    schedule = tmp_path / 'schedule.json'
+
+    assert cli.main([words, '--replay', replay, '--scheduler', 'leitner', '--history-db', history_db,
+                     '--schedule-file', str(schedule), '--persist']) == 0
+
+    assert history_count(history_db) == 3
+    assert schedule.exists()
@@ -0,0 +1,140 @@
+import threading
+import time
+
+from playback_worker import PlaybackWorker
+
+# Звук, который за время теста доиграть не успеет
+ENDLESS = 60.0
+
+
+class FakeSound:
+    def __init__(self, length):
+        self.length = length
+
+    def play(self):
+        pass
+
+    def get_length(self):
+        return self.length
+
+
+class Recorder:
+    """Источник звуков и обработчики, которые запоминают события и будят ждущий тест"""
+
+    def __init__(self, lengths=None, length=0.01, fail=()):
+        self.lengths = lengths or {}
+        self.length = length
+        self.fail = set(fail)
+        self.played = []
+        self.completed = []
+        self.errors = []
+        self._changed = threading.Condition()
+
+    def sound(self, word):
+        if word in self.fail:
+            raise FileNotFoundError(word)
+        self._record(self.played, word)
+        return FakeSound(self.lengths.get(word, self.length))
+
+    def on_complete(self, word):
+        self._record(self.completed, word)
+
+    def on_error(self, message):
+        self._record(self.errors, message)
+
+    def _record(self, events, value):
+        with self._changed:
+            events.append(value)
+            self._changed.notify_all()
+
+    def wait_for(self, condition, timeout=5.0):
+        with self._changed:
+            assert self._changed.wait_for(condition, timeout), "событие не наступило"
+
+
+def test_thread_starts_with_first_playback():
+    recorder = Recorder()
+    worker = PlaybackWorker(recorder.sound)
+    worker.stop()
+    assert worker._thread is None
+    worker.shutdown()
+
+    worker.play('кот', recorder.on_complete)
+    recorder.wait_for(lambda: recorder.completed)
+    worker.shutdown()
+    assert not worker._thread.is_alive()
+
+
+def test_completion_is_reported_when_the_sound_ends():
+    recorder = Recorder(length=0.1)
+    worker = PlaybackWorker(recorder.sound)
+    started = time.monotonic()
+    worker.play('кот', recorder.on_complete)
+
+    recorder.wait_for(lambda: recorder.completed)
+    assert recorder.completed == ['кот']
+    assert time.monotonic() - started >= 0.1
+    assert worker.last_start_latency is not None
+    worker.shutdown()
+
+
+def test_preempting_play_drops_the_current_sound():
+    # Прерванный звук короче прервавшего: если бы он не был отменен, он доиграл бы первым
+    recorder = Recorder(lengths={'кот': 0.05, 'дом': 0.2})
+    worker = PlaybackWorker(recorder.sound)
+    worker.play('кот', recorder.on_complete)
+    worker.play('дом', recorder.on_complete)
+
+    recorder.wait_for(lambda: 'дом' in recorder.completed)
+    assert recorder.completed == ['дом']
+    worker.shutdown()
+
+
+def test_non_preempting_play_waits_for_the_current_sound():
+    recorder = Recorder(length=0.05)
+    worker = PlaybackWorker(recorder.sound)
+    worker.play('кот', recorder.on_complete)
+    worker.play('дом', recorder.on_complete, preempt=False)
+
+    recorder.wait_for(lambda: len(recorder.completed) == 2)
+    assert recorder.completed == ['кот', 'дом']
+    worker.shutdown()
+
+
+def test_stop_drops_the_current_sound():
+    recorder = Recorder(lengths={'кот': ENDLESS})
+    worker = PlaybackWorker(recorder.sound)
+    worker.play('кот', recorder.on_complete)
+    recorder.wait_for(lambda: recorder.played)
+    worker.stop()
+
+    # Без остановки это слово ждало бы окончания бесконечного звука
+    worker.play('дом', recorder.on_complete, preempt=False)
+    recorder.wait_for(lambda: recorder.completed)
+    assert recorder.completed == ['дом']
+    worker.shutdown()
+
+
+def test_replay_repeats_the_last_word():
+    recorder = Recorder()
+    worker = PlaybackWorker(recorder.sound)
+    worker.play('кот', recorder.on_complete)
+    recorder.wait_for(lambda: recorder.completed)
+
+    worker.replay(recorder.on_complete)
+    recorder.wait_for(lambda: len(recorder.completed) == 2)
+    assert recorder.played == ['кот', 'кот']
+    worker.shutdown()
+
+
+def test_errors_are_reported_and_do_not_stop_the_worker():
+    recorder = Recorder(fail={'кот'})
+    worker = PlaybackWorker(recorder.sound)
+    worker.play('кот', recorder.on_complete, recorder.on_error)
+    recorder.wait_for(lambda: recorder.errors)
+    assert recorder.errors == ['кот']
+
+    worker.play('дом', recorder.on_complete, recorder.on_error)
+    recorder.wait_for(lambda: recorder.completed)
+    assert recorder.completed == ['дом']
+    worker.shutdown()
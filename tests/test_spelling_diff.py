@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+import spelling_diff
+from spelling_diff import batch_distances, classify_errors, describe_errors, diff_segments, distance, score_pairs
+
+
+@pytest.mark.parametrize('answer, correct, kinds', [
+    ('карова', 'корова', ('unstressed_vowel',)),
+    ('клас', 'класс', ('double_consonant',)),
+    ('обезяна', 'обезьяна', ('soft_sign',)),
+    ('подезд', 'подъезд', ('hard_sign',)),
+    ('зуп', 'зуб', ('voicing',)),
+    ('ежик', 'ёжик', ('yo',)),
+    ('кто то', 'кто-то', ('separator',)),
+    ('скзака', 'сказка', ('transposition',)),
+    ('кт', 'кот', ('missing_letter',)),
+    ('коот', 'кот', ('extra_letter',)),
+    ('кит', 'кот', ('unstressed_vowel',)),
+    ('кох', 'кот', ('wrong_letter',)),
+])
+def test_error_classification(answer, correct, kinds):
+    assert classify_errors(answer, correct) == kinds
+
+
+def test_distance_ignores_case_and_counts_transposition_once():
+    assert distance('Корова', 'корова') == 0
+    assert distance('скзака', 'сказка') == 1
+    assert distance('малако', 'молоко') == 2
+    assert distance('', 'кот') == 3
+
+
+def test_describe_errors_lists_each_kind_once():
+    assert describe_errors('малако', 'молоко') == "безударная гласная"
+
+
+def test_diff_segments_mark_errors_and_missing_letters():
+    assert diff_segments('карова', 'корова') == [('к', 'ok'), ('а', 'error'), ('рова', 'ok')]
+    assert diff_segments('обезяна', 'обезьяна') == [('обез', 'ok'), ('ь', 'missing'), ('яна', 'ok')]
+    # Склеенные фрагменты дают исходный ответ (без пропущенных букв)
+    segments = diff_segments('кооровва', 'корова')
+    assert ''.join(text for text, kind in segments if kind != 'missing') == 'кооровва'
+
+
+def test_batch_distances_match_pairwise_alignment():
+    rng = random.Random(1)
+    letters = 'абвгдежзик'
+    answers = [''.join(rng.choice(letters) for _ in range(rng.randint(0, 9))) for _ in range(300)]
+    corrects = [''.join(rng.choice(letters) for _ in range(rng.randint(1, 9))) for _ in range(300)]
+
+    expected = [distance(a, c) for a, c in zip(answers, corrects)]
+    assert [int(d) for d in batch_distances(answers, corrects, chunk_size=64)] == expected
+
+
+def test_batch_distances_without_numpy(monkeypatch):
+    monkeypatch.setattr(spelling_diff, 'np', None)
+    assert batch_distances(['скзака', 'Кот'], ['сказка', 'кот']) == [1, 0]
+
+
+def test_score_pairs_counts_error_types_per_pair():
+    result = score_pairs([('корова', 'карова'), ('корова', 'карова'), ('класс', 'клас')])
+    assert [int(d) for d in result['distances']] == [1, 1, 1]
+    assert result['mean_distance'] == 1.0
+    assert result['error_types'] == {'unstressed_vowel': 2, 'double_consonant': 1}
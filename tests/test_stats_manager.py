@@ -0,0 +1,95 @@
+import json
+
+from stats_manager import StatsManager
+
+
+def abandon(stats):
+    """Имитирует аварийное завершение: журнал не сворачивается в снимок"""
+    stats._sync_journal()
+    stats._close_journal()
+
+
+def test_attempts_are_replayed_from_the_journal_after_a_crash(tmp_path):
+    stats_file = str(tmp_path / 'stats.json')
+    stats = StatsManager(stats_file)
+    stats.add_attempt('кот', True)
+    stats.add_attempt('кот', False)
+    stats.add_attempt('дом', False)
+    abandon(stats)
+
+    restored = StatsManager(stats_file)
+    assert restored.stats['total_attempts'] == 3
+    assert restored.stats['correct_attempts'] == 1
+    assert restored.stats['word_stats']['кот'] == {'attempts': 2, 'correct': 1}
+    assert restored.get_current_session_errors() == {'кот': 1, 'дом': 1}
+    restored.close()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    stats_file = str(tmp_path / 'stats.json')
+    stats = StatsManager(stats_file)
+    stats.add_attempt('кот', True)
+    abandon(stats)
+    with open(stats.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"t": "attempt", "w": "до')
+
+    restored = StatsManager(stats_file)
+    assert restored.stats['total_attempts'] == 1
+    # Следующая запись начинается с новой строки и читается после перезапуска
+    restored.add_attempt('лес', False)
+    abandon(restored)
+
+    again = StatsManager(stats_file)
+    assert again.stats['total_attempts'] == 2
+    assert 'лес' in again.stats['word_stats']
+    again.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    stats_file = str(tmp_path / 'stats.json')
+    stats = StatsManager(stats_file)
+    for _ in range(5):
+        stats.add_attempt('кот', True)
+    stats.close()
+
+    with open(stats.journal_file, encoding='utf-8') as f:
+        assert f.read() == ''
+    with open(stats_file, encoding='utf-8') as f:
+        assert json.load(f)['total_attempts'] == 5
+
+    # Записи, уже вошедшие в снимок, не применяются второй раз
+    restored = StatsManager(stats_file)
+    assert restored.stats['total_attempts'] == 5
+    restored.close()
+
+
+def test_long_journal_is_compacted_on_load(tmp_path):
+    stats_file = str(tmp_path / 'stats.json')
+    stats = StatsManager(stats_file, compact_threshold=10)
+    for index in range(12):
+        stats.add_attempt(f"слово{index}", index % 2 == 0)
+    abandon(stats)
+
+    restored = StatsManager(stats_file, compact_threshold=10)
+    assert restored.stats['total_attempts'] == 12
+    with open(restored.journal_file, encoding='utf-8') as f:
+        assert f.read() == ''
+    restored.close()
+
+
+def test_reset_survives_a_failed_compaction(tmp_path, monkeypatch):
+    stats_file = str(tmp_path / 'stats.json')
+    stats = StatsManager(stats_file)
+    stats.add_attempt('кот', False)
+    stats.add_attempt('дом', False)
+    monkeypatch.setattr(stats, 'compact', lambda: None)
+    stats.reset_current_session()
+    stats.add_attempt('лес', True)
+    session_id = stats.stats['session_id']
+    abandon(stats)
+
+    restored = StatsManager(stats_file)
+    assert restored.stats['total_attempts'] == 1
+    assert list(restored.stats['word_stats']) == ['лес']
+    assert restored.stats['session_id'] == session_id
+    restored.close()
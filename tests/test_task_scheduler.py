@@ -0,0 +1,181 @@
+import threading
+import time
+
+import pytest
+
+from task_scheduler import (PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, CancelToken, TaskCancelled,
+                            TaskScheduler)
+
+
+class FakeRoot:
+    """Заменяет окно Tk: таймеры не срабатывают сами, кадр насоса выполняет тест"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._ids = iter(range(1, 1000000))
+
+    def after(self, ms, callback, *args):
+        job = next(self._ids)
+        self.jobs[job] = (callback, args)
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_frame(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback, args in jobs.values():
+            callback(*args)
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def scheduler(root):
+    tasks = TaskScheduler(root, worker_count=1)
+    yield tasks
+    tasks.shutdown()
+
+
+def wait_for(event, timeout=2.0):
+    assert event.wait(timeout), "задача не выполнилась"
+
+
+def block_worker(scheduler, priority=PRIORITY_LOW, on_cancel=None):
+    """Занимает общий поток долгой задачей до ее отмены"""
+    started = threading.Event()
+
+    def long_task(token):
+        started.set()
+        while not token.wait(0.01):
+            pass
+        token.raise_if_cancelled()
+
+    task = scheduler.submit(long_task, priority=priority, on_cancel=on_cancel)
+    wait_for(started)
+    return task
+
+
+def test_queued_tasks_run_in_priority_order(scheduler):
+    blocker = block_worker(scheduler, PRIORITY_NORMAL)
+    order = []
+    done = threading.Event()
+    scheduler.submit(lambda token: order.append('low'), priority=PRIORITY_LOW)
+    scheduler.submit(lambda token: order.append('normal'), priority=PRIORITY_NORMAL)
+    scheduler.submit(lambda token: (order.append('last'), done.set()), priority=PRIORITY_LOW)
+    blocker.cancel()
+
+    wait_for(done)
+    assert order == ['normal', 'low', 'last']
+
+
+def test_high_priority_task_does_not_wait_for_long_tasks(scheduler):
+    blocker = block_worker(scheduler)
+    done = threading.Event()
+    normal = threading.Event()
+    scheduler.submit(lambda token: done.set(), priority=PRIORITY_HIGH)
+    scheduler.submit(lambda token: normal.set(), priority=PRIORITY_NORMAL)
+
+    wait_for(done, timeout=0.5)
+    # Обычные задачи срочный поток не берет
+    assert not normal.wait(0.2)
+    blocker.cancel()
+    wait_for(normal)
+
+
+def test_handlers_run_on_the_pump(root, scheduler):
+    results = []
+    finished = scheduler.submit(lambda token, a, b: a + b, 2, 3, on_done=results.append)
+    failed = scheduler.submit(lambda token: 1 / 0, on_error=lambda e: results.append(type(e)))
+    wait_for(finished.finished)
+    wait_for(failed.finished)
+
+    # Обработчики вызываются только в кадре насоса (в потоке Tk)
+    assert results == []
+    root.run_frame()
+    assert set(results) == {5, ZeroDivisionError}
+
+
+def test_cancelled_task_reports_cancel(root, scheduler):
+    blocker_events = []
+    blocker = block_worker(scheduler, on_cancel=lambda: blocker_events.append('cancelled'))
+    events = []
+    queued = scheduler.submit(lambda token: events.append('ran'), on_cancel=lambda: events.append('cancelled'))
+
+    queued.cancel()
+    blocker.cancel()
+    wait_for(queued.finished)
+    wait_for(blocker.finished)
+    root.run_frame()
+
+    assert events == ['cancelled']
+    assert blocker_events == ['cancelled']
+
+
+def test_posts_with_the_same_key_are_coalesced(root, scheduler):
+    calls = []
+    for percent in range(100):
+        scheduler.post('progress', calls.append, percent)
+    scheduler.call_soon(calls.append, 'done')
+
+    root.run_frame()
+    assert calls == [99, 'done']
+    root.run_frame()
+    assert calls == [99, 'done']
+
+
+def test_shutdown_cancels_tasks_and_stops_workers(root):
+    scheduler = TaskScheduler(root, worker_count=2)
+    started = threading.Event()
+
+    def long_task(token):
+        started.set()
+        while True:
+            token.raise_if_cancelled()
+            time.sleep(0.01)
+
+    task = scheduler.submit(long_task)
+    wait_for(started)
+    scheduler.shutdown(timeout=1.0)
+
+    assert task.cancelled and task.finished.is_set()
+    assert not any(worker.is_alive() for worker in scheduler._workers)
+    assert root.jobs == {}
+    with pytest.raises(RuntimeError):
+        scheduler.submit(lambda token: None)
+
+
+def test_shutdown_waits_for_all_workers_within_one_timeout(root):
+    scheduler = TaskScheduler(root, worker_count=2)
+    release = threading.Event()
+    running = threading.Semaphore(0)
+
+    def stuck_task(token):
+        # Задача не проверяет токен отмены (например, ждет ответа сети)
+        running.release()
+        release.wait(5)
+
+    tasks = [scheduler.submit(stuck_task, priority=priority)
+             for priority in (PRIORITY_LOW, PRIORITY_LOW, PRIORITY_HIGH)]
+    for _ in tasks:
+        assert running.acquire(timeout=2)
+
+    started = time.monotonic()
+    scheduler.shutdown(timeout=0.3)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.6
+    assert all(task.cancelled for task in tasks)
+    release.set()
+
+
+def test_raise_if_cancelled():
+    token = CancelToken()
+    token.raise_if_cancelled()
+    token.cancel()
+    assert token.cancelled
+    with pytest.raises(TaskCancelled):
+        token.raise_if_cancelled()
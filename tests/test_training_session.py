@@ -0,0 +1,33 @@
+from scheduler import RandomScheduler
+from stats_manager import StatsManager
+from training_session import TrainingSession
+
+
+class InOrderScheduler(RandomScheduler):
+    def plan_session(self, words, limit=None, now=None):
+        return list(words)[:limit] if limit else list(words)
+
+
+def test_planning_does_not_reset_the_previous_session(tmp_path):
+    stats = StatsManager(str(tmp_path / 'stats.json'))
+    session = TrainingSession(stats, InOrderScheduler(), session_size=2)
+    session.start(['кот', 'дом', 'лес'])
+    session.submit_answer('кот')
+
+    planned = session.plan()
+    # Подготовка аудио не удалась - статистика прошлой сессии на месте
+    assert planned == ['кот', 'дом']
+    assert stats.get_stats()['total_attempts'] == 1
+
+    session.start(planned=list(reversed(planned)))
+    assert session.shuffled_words == ['дом', 'кот']
+    assert stats.get_stats()['total_attempts'] == 0
+    stats.close()
+
+
+def test_keep_order_plan_uses_the_list_order(tmp_path):
+    stats = StatsManager(str(tmp_path / 'stats.json'))
+    session = TrainingSession(stats, RandomScheduler(), session_size=2)
+    session.words = ['лес', 'кот', 'дом']
+    assert session.plan(keep_order=True) == ['лес', 'кот']
+    stats.close()
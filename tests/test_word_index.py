@@ -0,0 +1,182 @@
+import random
+import threading
+
+import pytest
+
+from scheduler import RandomScheduler
+from stats_manager import StatsManager
+from training_session import TrainingSession
+from word_index import WordIndex, levenshtein
+from word_list import dedup_key
+
+
+def reference_distance(a, b):
+    """Расстояние Левенштейна обычной таблицей (для сверки)"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def random_words(count, seed=1, letters='абвгдеклмно'):
+    rng = random.Random(seed)
+    return list(dict.fromkeys(''.join(rng.choice(letters) for _ in range(rng.randint(1, 8)))
+                              for _ in range(count)))
+
+
+def test_bit_parallel_distance_matches_reference():
+    words = random_words(200) + ['', 'а' * 70, 'б' + 'а' * 69]
+    rng = random.Random(2)
+    for _ in range(2000):
+        a, b = rng.choice(words), rng.choice(words)
+        assert levenshtein(a, b) == reference_distance(a, b)
+
+
+def test_distance_limit_is_an_upper_bound():
+    assert levenshtein('кот', 'котлета', limit=2) == 3
+    assert levenshtein('кот', 'кит', limit=2) == 1
+    assert levenshtein('собака', 'кошка', limit=1) == 2
+
+
+@pytest.fixture(scope='module')
+def words():
+    return random_words(600)
+
+
+@pytest.fixture(scope='module')
+def index(words):
+    index = WordIndex()
+    for word in words:
+        index.add(word)
+    return index
+
+
+def test_within_matches_brute_force(index, words):
+    for query in random_words(40, seed=3):
+        expected = sorted((reference_distance(dedup_key(query), dedup_key(word)), word) for word in words
+                          if reference_distance(dedup_key(query), dedup_key(word)) <= 2)
+        assert index.within(query, 2) == expected
+
+
+def test_nearest_matches_brute_force(index, words):
+    for query in random_words(40, seed=4):
+        found = index.nearest(query, k=3)
+        distances = sorted(reference_distance(query, word) for word in words)
+        assert [distance for distance, _ in found] == distances[:3]
+        assert all(reference_distance(query, word) == distance for distance, word in found)
+
+
+def test_nearest_respects_exclude_and_max_distance():
+    index = WordIndex()
+    for word in ('компания', 'кампания', 'собака'):
+        index.add(word)
+    assert index.nearest('компания', 1, exclude=('компания',)) == [(1, 'кампания')]
+    assert index.nearest('кошка', 1, max_distance=1) == []
+
+
+def test_removed_words_are_not_found_and_can_return():
+    index = WordIndex()
+    for word in ('кот', 'код', 'кит'):
+        index.add(word)
+    assert index.remove('код')
+    assert 'код' not in index and len(index) == 2
+    assert index.within('код', 1) == [(1, 'кот')]
+    assert index.add('код')
+    assert index.within('код', 0) == [(0, 'код')]
+
+
+def test_sync_adds_new_words_and_rebuilds_after_many_removals():
+    index = WordIndex()
+    index.sync(['кот', 'кит', 'код', 'дом'])
+    assert index.sync(['кот', 'лес']) == (1, 3)
+    # Удаленных стало больше, чем живых, - дерево перестроено без них
+    assert index.deleted == set()
+    assert sorted(index.live_words()) == ['кот', 'лес']
+
+
+def test_index_is_saved_and_loaded(tmp_path):
+    index = WordIndex.load_or_build(str(tmp_path / 'audio'), ['кот', 'кит', 'дом'])
+    index.remove('дом')
+    index.save()
+
+    loaded = WordIndex(index.path)
+    loaded.load()
+    assert sorted(loaded.live_words()) == ['кит', 'кот']
+    assert loaded.within('кат', 1) == [(1, 'кит'), (1, 'кот')]
+
+
+def test_confusable_groups_put_each_word_in_one_group():
+    index = WordIndex()
+    words = ['компания', 'кампания', 'собака', 'кот', 'кит', 'код', 'слон']
+    index.sync(words)
+
+    groups = index.confusable_groups(words)
+    assert groups == [['компания', 'кампания'], ['кот', 'кит', 'код']]
+    assert index.confusable_groups(words, max_words=3) == groups[:1]
+
+
+def test_lookups_run_safely_during_sync():
+    index = WordIndex()
+    first, second = random_words(300, seed=5), random_words(300, seed=6)
+    index.sync(first)
+    stop = threading.Event()
+    failures = []
+
+    def syncer():
+        try:
+            # Чередование списков удаляет больше половины слов и перестраивает дерево
+            while not stop.is_set():
+                for words in (second, first):
+                    index.sync(words)
+        except Exception as e:
+            failures.append(e)
+
+    thread = threading.Thread(target=syncer)
+    thread.start()
+    try:
+        for query in random_words(200, seed=7):
+            for distance, word in index.nearest(query, k=2):
+                assert reference_distance(dedup_key(query), dedup_key(word)) == distance
+    finally:
+        stop.set()
+        thread.join()
+    assert failures == []
+
+
+class InOrderScheduler(RandomScheduler):
+    def plan_session(self, words, limit=None, now=None):
+        return list(words)[:limit] if limit else list(words)
+
+
+def test_session_remembers_confused_words(tmp_path):
+    index = WordIndex()
+    index.sync(['компания', 'кампания', 'собака'])
+    stats = StatsManager(str(tmp_path / 'stats.json'))
+    session = TrainingSession(stats, InOrderScheduler(), word_index=index)
+    session.start(['компания', 'собака'])
+
+    session.submit_answer('кампания')
+    assert session.last_confusion == 'кампания'
+    # Ответ ближе к правильному слову, чем к любому другому, - это просто ошибка
+    session.submit_answer('сабака')
+    assert session.last_confusion is None
+    assert session.results()['confusions'] == [('компания', 'кампания')]
+    stats.close()
+
+
+def test_confusion_can_be_looked_up_outside_submit_answer(tmp_path):
+    index = WordIndex()
+    index.sync(['компания', 'кампания'])
+    stats = StatsManager(str(tmp_path / 'stats.json'))
+    session = TrainingSession(stats, InOrderScheduler(), word_index=index)
+    session.start(['компания'])
+
+    correct, answer, _ = session.submit_answer('кампания', find_confusion=False)
+    assert session.last_confusion is None and session.confusions == []
+    similar = session.closest_word(answer, correct)
+    session.record_confusion(correct, similar)
+    assert session.results()['confusions'] == [('компания', 'кампания')]
+    stats.close()
@@ -0,0 +1,92 @@
+import pytest
+
+import word_list
+from word_list import WordStore, dedup_key, fix_homoglyphs, is_mixed_script, load_word_store, normalize_word
+
+
+def test_normalize_word_composes_and_collapses_spaces():
+    # е + знак ударения -> ё
+    assert normalize_word('  ёлка \t  зеленая\n') == 'ёлка зеленая'
+    assert normalize_word('   \n') == ''
+
+
+def test_store_skips_duplicates_ignoring_case_and_yo():
+    store = WordStore()
+    assert store.add('Ёлка')
+    assert not store.add('елка')
+    assert not store.add('ЁЛКА')
+    assert store.add('ель')
+    assert len(store) == 2
+    assert store.to_list() == ['Ёлка', 'ель']
+    assert 'ЕЛКА' in store and 'сосна' not in store
+
+
+def test_store_indexing():
+    store = WordStore(['кот', 'дом', 'лес'])
+    assert store[0] == 'кот' and store[-1] == 'лес'
+    assert list(store) == ['кот', 'дом', 'лес']
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_mixed_script_detection_and_fix():
+    # Латинские 'o' и 'c' в русском слове
+    word = 'мoлoкo'
+    assert is_mixed_script(word)
+    assert fix_homoglyphs(word) == 'молоко'
+    assert not is_mixed_script('молоко') and not is_mixed_script('milk')
+    # Латинскую 'z' заменить нечем
+    assert fix_homoglyphs('мzлоко') is None
+
+
+def test_load_word_store_reports_problems():
+    lines = ['кот\n', '\n', 'Кот\n', 'мoлoкo\n', 'дом\n']
+
+    store, report = load_word_store(lines)
+    assert store.to_list() == ['кот', 'мoлoкo', 'дом']
+    assert (report.lines, report.empty, report.duplicates) == (5, 1, 1)
+    assert report.mixed_script == [(4, 'мoлoкo', 'молоко')]
+
+    store, report = load_word_store(lines, fix_mixed_script=True)
+    assert store.to_list() == ['кот', 'молоко', 'дом']
+    assert report.fixed == [(4, 'мoлoкo', 'молоко')]
+
+
+def test_dedup_key():
+    assert dedup_key('Ёж') == dedup_key('еж') == 'еж'
+
+
+def test_find_without_and_replaced():
+    store = WordStore(['ёлка', 'ель', 'сосна'])
+    assert list(store.find('ЕЛ')) == [0, 1]
+    assert store.without([1]).to_list() == ['ёлка', 'сосна']
+    assert store.replaced(1, 'береза').to_list() == ['ёлка', 'береза', 'сосна']
+    # Замена на слово, которое уже есть в списке
+    assert store.replaced(1, 'Сосна') is None
+    # Исправление регистра того же слова допускается
+    assert store.replaced(2, 'Сосна').to_list() == ['ёлка', 'ель', 'Сосна']
+
+
+def test_hash_collisions_do_not_drop_words(monkeypatch):
+    # Все ключи получают один хэш: различать слова можно только сравнением ключей
+    monkeypatch.setattr(word_list, 'hash', lambda key: 0, raising=False)
+    store = WordStore(['кот', 'дом', 'Кот', 'лес', 'ДОМ'])
+
+    assert store.to_list() == ['кот', 'дом', 'лес']
+    assert 'ЛЕС' in store and 'сад' not in store
+    assert store.add('сад') and not store.add('сад')
+
+
+def test_find_matches_a_scan_of_every_word():
+    words = ['ёлка', 'ель', 'сосна', 'Елисей', 'лес', 'колесо']
+    store = WordStore(words)
+    for text in ('е', 'ЕЛ', 'лес', 'а', 'ос', '', 'ка\nе', 'дуб'):
+        expected = [index for index, word in enumerate(words) if dedup_key(text) in dedup_key(word)]
+        if '\n' in text:
+            expected = []
+        assert list(store.find(text)) == expected
+
+    # Индекс поиска обновляется после добавления слова
+    store.add('Лесок')
+    assert list(store.find('лес')) == [4, 5, 6]
+    assert list(WordStore().find('')) == []
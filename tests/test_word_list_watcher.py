@@ -0,0 +1,106 @@
+import os
+
+from audio_player import AudioPlayer
+from scheduler import RandomScheduler
+from stats_manager import StatsManager
+from training_session import TrainingSession
+from tts_engines import StubTTSBackend
+from word_list_watcher import WordListWatcher, diff_words
+
+
+def write_words(path, words):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(words) + '\n')
+
+
+def test_diff_words_keeps_list_order():
+    assert diff_words(['кот', 'дом', 'лес'], ['лес', 'мир', 'кот', 'сад']) == (['мир', 'сад'], ['дом'])
+
+
+def test_watcher_reloads_only_after_the_file_settles(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    write_words(path, ['кот', 'дом'])
+    watcher = WordListWatcher(path, on_change=None, words=['кот', 'дом'])
+    assert watcher.check() is None
+
+    write_words(path, ['кот', 'дом', 'лес', 'мир'])
+    # Первый опрос после изменения только запоминает его: запись могла не закончиться
+    assert watcher.check() is None
+    store, added, removed = watcher.check()
+    assert added == ['лес', 'мир'] and removed == []
+    assert store.to_list() == ['кот', 'дом', 'лес', 'мир']
+    assert watcher.check() is None
+
+
+def test_watcher_ignores_rewrite_with_the_same_words(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    write_words(path, ['кот', 'дом'])
+    watcher = WordListWatcher(path, on_change=None, words=['кот', 'дом'])
+    write_words(path, ['дом', 'кот', ''])
+    watcher.check()
+    assert watcher.check() is None
+
+
+def test_watcher_waits_while_the_file_is_missing(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    write_words(path, ['кот'])
+    watcher = WordListWatcher(path, on_change=None, words=['кот'])
+    os.remove(path)
+    assert watcher.check() is None
+    write_words(path, ['дом', 'лес'])
+    watcher.check()
+    _, added, removed = watcher.check()
+    assert (added, removed) == (['дом', 'лес'], ['кот'])
+
+
+class InOrderScheduler(RandomScheduler):
+    """Слова сессии идут в порядке списка"""
+
+    def plan_session(self, words, limit=None, now=None):
+        return list(words)[:limit] if limit else list(words)
+
+
+def make_session(tmp_path, words, session_size=None):
+    stats = StatsManager(str(tmp_path / 'stats.json'))
+    session = TrainingSession(stats, InOrderScheduler(), session_size=session_size)
+    session.start(words)
+    return session
+
+
+def test_update_words_changes_only_the_rest_of_the_session(tmp_path):
+    session = make_session(tmp_path, ['кот', 'дом', 'лес', 'мир'])
+    session.submit_answer('кот')
+
+    session.update_words(added=['сад'], removed=['дом', 'лес'])
+
+    # Текущее слово и данные ответы не меняются
+    assert session.current_word() == 'дом'
+    assert session.shuffled_words == ['кот', 'дом', 'мир', 'сад']
+    assert session.words == ['кот', 'мир', 'сад']
+    assert session.session_results == [('кот', 'кот', True)]
+    session.stats_manager.close()
+
+
+def test_update_words_respects_session_size(tmp_path):
+    session = make_session(tmp_path, ['кот', 'дом', 'лес'], session_size=3)
+    session.update_words(added=['сад', 'мир'])
+    assert session.shuffled_words == ['кот', 'дом', 'лес']
+    session.update_words(removed=['лес'])
+    session.update_words(added=['луг'])
+    assert session.shuffled_words == ['кот', 'дом', 'луг']
+    session.stats_manager.close()
+
+
+def test_evict_words_removes_cached_audio(tmp_path):
+    backend = StubTTSBackend()
+    player = AudioPlayer(str(tmp_path), tts_backend=backend, init_mixer=False, requests_per_second=None)
+    kept, evicted = player.generate_all_audio_files(['кот', 'дом'])
+
+    assert player.evict_words(['дом', 'лес']) == 1
+    assert player.has_audio('кот') and not player.has_audio('дом')
+    assert os.path.exists(kept) and not os.path.exists(evicted)
+
+    # Вернувшееся в список слово озвучивается заново, остальные берутся из кэша
+    player.generate_all_audio_files(['кот', 'дом'])
+    assert backend.calls == 3
+    player.cleanup()
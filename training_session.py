@@ -0,0 +1,171 @@
+from scheduler import RandomScheduler
+from spelling_diff import score_pairs
+from word_index import levenshtein
+from word_list import dedup_key
+
+
+class TrainingSession:
+    """Сессия тренировки без привязки к интерфейсу: выбор слов, проверка ответов, итоги
+
+    Используется как окном tkinter, так и консольным режимом (cli.py).
+    С индексом похожих слов (word_index.WordIndex) неверный ответ сравнивается
+    со словарем: если ученик написал другое слово списка, оно запоминается.
+    """
+
+    def __init__(self, stats_manager, scheduler=None, session_size=None, word_index=None):
+        self.stats_manager = stats_manager
+        self.scheduler = scheduler or RandomScheduler()
+        self.session_size = session_size
+        self.word_index = word_index
+
+        self.words = []
+        self.shuffled_words = []
+        self.current_word_index = 0
+        self.session_results = []
+        self.words_attempted = set()
+        # Пары (правильное слово, слово словаря, которое написал ученик)
+        self.confusions = []
+        self.last_confusion = None
+
+    def plan(self, keep_order=False):
+        """Выбирает слова следующей сессии, не начиная ее и не трогая статистику
+
+        С keep_order слова идут в заданном порядке, без планировщика (упражнение на
+        похожие слова, где группы должны идти подряд).
+        """
+        if keep_order:
+            return self.words[:self.session_size] if self.session_size else list(self.words)
+        return self.scheduler.plan_session(self.words, limit=self.session_size)
+
+    def start(self, words=None, keep_order=False, planned=None):
+        """Начинает новую сессию: выбирает слова и сбрасывает статистику текущей сессии
+
+        planned - слова, выбранные заранее методом plan (например, пока готовится аудио).
+        """
+        if words is not None:
+            self.words = list(words)
+        self.shuffled_words = list(planned) if planned is not None else self.plan(keep_order)
+        self.current_word_index = 0
+        self.words_attempted.clear()
+        self.session_results = []
+        self.confusions = []
+        self.last_confusion = None
+        self.stats_manager.reset_current_session()
+
+    def update_words(self, added=(), removed=()):
+        """Применяет правку списка слов на ходу, не начиная сессию заново
+
+        Удаленные слова убираются из еще не показанной части сессии, добавленные
+        встают в ее конец (пока не превышен размер сессии). Текущее слово и уже
+        данные ответы не меняются.
+        """
+        removed = set(removed)
+        known = set(self.words)
+        added = [word for word in added if word not in known]
+        self.words = [word for word in self.words if word not in removed] + added
+
+        if not self.shuffled_words or self.is_finished:
+            return
+        start = self.current_word_index + 1
+        upcoming = [word for word in self.shuffled_words[start:] if word not in removed]
+        if self.session_size:
+            added = added[:max(0, self.session_size - start - len(upcoming))]
+        self.shuffled_words = self.shuffled_words[:start] + upcoming + added
+
+    @property
+    def is_finished(self):
+        """Все слова сессии пройдены"""
+        return self.current_word_index >= len(self.shuffled_words)
+
+    @property
+    def is_last_word(self):
+        """Текущее слово - последнее в сессии"""
+        return self.current_word_index == len(self.shuffled_words) - 1
+
+    def current_word(self):
+        """Возвращает текущее слово или None, если сессия закончена"""
+        if self.is_finished:
+            return None
+        return self.shuffled_words[self.current_word_index]
+
+    def upcoming_words(self, count):
+        """Возвращает до count слов, идущих после текущего"""
+        start = self.current_word_index + 1
+        return self.shuffled_words[start:start + count]
+
+    @staticmethod
+    def check_answer(answer, correct_word):
+        """Сравнивает ответ с правильным написанием без учета регистра"""
+        return answer.strip().lower() == correct_word.lower()
+
+    def submit_answer(self, answer, response_time=None, find_confusion=True):
+        """Проверяет ответ на текущее слово, обновляет статистику и переходит к следующему
+
+        Возвращает кортеж (правильное слово, ответ, верно ли). Без find_confusion
+        похожее слово словаря не ищется: окно ищет его в фоне (closest_word)
+        и сообщает о найденном через record_confusion.
+        """
+        if self.is_finished:
+            raise ValueError("Сессия уже завершена")
+        answer = answer.strip()
+        if not answer:
+            raise ValueError("Пустой ответ")
+
+        correct_word = self.current_word()
+        is_correct = self.check_answer(answer, correct_word)
+        result = (correct_word, answer, is_correct)
+        self.session_results.append(result)
+        self.last_confusion = None
+        if not is_correct and find_confusion:
+            self.last_confusion = self.closest_word(answer, correct_word)
+            if self.last_confusion:
+                self.confusions.append((correct_word, self.last_confusion))
+
+        self.stats_manager.add_attempt(correct_word, is_correct, answer, response_time)
+        self.scheduler.record(correct_word, is_correct, response_time)
+        self.words_attempted.add(correct_word)
+        self.current_word_index += 1
+        return result
+
+    def closest_word(self, answer, correct_word, max_distance=3):
+        """Возвращает слово словаря, к которому ответ ближе, чем к правильному (или None)"""
+        if self.word_index is None:
+            return None
+        radius = min(max_distance, levenshtein(dedup_key(answer), dedup_key(correct_word)) - 1)
+        if radius < 0:
+            return None
+        found = self.word_index.nearest(answer, 1, radius, exclude=(correct_word,))
+        return found[0][1] if found else None
+
+    def record_confusion(self, correct_word, similar):
+        """Запоминает похожее слово, найденное для ответа вне submit_answer"""
+        self.confusions.append((correct_word, similar))
+
+    def progress(self):
+        """Возвращает (попыток, правильных, процент) текущей сессии"""
+        stats = self.stats_manager.get_stats()
+        return stats['total_attempts'], stats['correct_attempts'], self.stats_manager.get_percentage()
+
+    def results(self):
+        """Возвращает итоги сессии"""
+        total_words = len(self.shuffled_words)
+        correct_count = self.stats_manager.get_stats()['correct_attempts']
+        return {
+            'grade': self.stats_manager.calculate_grade(),
+            'total_words': total_words,
+            'correct': correct_count,
+            'errors': total_words - correct_count,
+            'percentage': correct_count / total_words * 100 if total_words else 0.0,
+            'incorrect_words': [(correct, user) for correct, user, is_c in self.session_results if not is_c],
+            'correct_words': [correct for correct, _, is_c in self.session_results if is_c],
+            'confusions': list(self.confusions),
+        }
+
+    def error_types(self):
+        """Возвращает счетчик типов ошибок сессии (считается отдельно, чтобы не замедлять итоги)"""
+        incorrect = [(correct, user) for correct, user, is_c in self.session_results if not is_c]
+        return score_pairs(incorrect)['error_types']
+
+    def finish(self):
+        """Сохраняет состояние планировщика по окончании сессии"""
+        self.scheduler.save()
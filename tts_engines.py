@@ -0,0 +1,188 @@
+import os
+import random
+import threading
+import time
+
+
+class TTSEngine:
+    """Движок синтеза речи: озвучивает слово в файл
+
+    Движок вызывается как функция engine(word, file_path), поэтому AudioPlayer
+    принимает и движки, и простые функции. engine_name входит в ключ кэша аудио,
+    так что голоса разных движков никогда не смешиваются.
+    """
+
+    name = 'base'
+    # Сетевой движок: запросы ограничиваются по частоте (RateLimiter)
+    network = False
+    # synthesize_batch озвучивает много слов за один вызов дешевле, чем по одному
+    supports_batch = False
+    # Расширение файлов, которые пишет движок
+    extension = '.mp3'
+
+    def __init__(self, lang='ru', voice=None):
+        self.lang = lang
+        self.voice = voice
+
+    @property
+    def engine_name(self):
+        """Имя для ключа кэша: движок и, если задан, голос"""
+        return f"{self.name}:{self.voice}" if self.voice else self.name
+
+    def synthesize(self, word, file_path):
+        raise NotImplementedError
+
+    def __call__(self, word, file_path):
+        self.synthesize(word, file_path)
+
+    def synthesize_batch(self, items):
+        """Озвучивает список (слово, путь); возвращает {слово: ошибка} для неудавшихся"""
+        errors = {}
+        for word, file_path in items:
+            try:
+                self.synthesize(word, file_path)
+            except Exception as e:
+                errors[word] = e
+        return errors
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate TTS (нужен интернет, один запрос на слово)"""
+
+    name = 'gtts'
+    network = True
+
+    @property
+    def engine_name(self):
+        # Ключ совпадает с ключами, созданными до появления выбора движка
+        return self.name
+
+    def synthesize(self, word, file_path):
+        # gTTS тянет за собой requests и т.п. - импортируем только при первом синтезе
+        from gtts import gTTS
+        tts = gTTS(text=word, lang=self.lang)
+        tts.save(file_path)
+
+
+class Pyttsx3Engine(TTSEngine):
+    """Локальный синтез через pyttsx3 (SAPI5 в Windows, NSSpeechSynthesizer в macOS, eSpeak в Linux)
+
+    Работает без интернета. Пакет слов ставится в очередь движка и озвучивается
+    одним runAndWait, поэтому инициализация движка не повторяется на каждое слово.
+    Файлы записываются в формате WAV.
+    """
+
+    name = 'pyttsx3'
+    supports_batch = True
+    extension = '.wav'
+
+    def __init__(self, lang='ru', voice=None, rate=None):
+        super().__init__(lang, voice)
+        self.rate = rate
+        self._engine = None
+        # pyttsx3 не потокобезопасен: все обращения к движку идут по очереди
+        self._lock = threading.Lock()
+
+    def _get_engine(self):
+        if self._engine is None:
+            import pyttsx3
+            engine = pyttsx3.init()
+            voice_id = self._find_voice(engine)
+            if voice_id:
+                engine.setProperty('voice', voice_id)
+            if self.rate:
+                engine.setProperty('rate', self.rate)
+            self._engine = engine
+        return self._engine
+
+    def _find_voice(self, engine):
+        """Находит голос по имени/идентификатору из настроек или по языку"""
+        voices = engine.getProperty('voices')
+        wanted = (self.voice or '').lower()
+        for voice in voices:
+            if wanted and (wanted == voice.id.lower() or wanted in (voice.name or '').lower()):
+                return voice.id
+        if wanted:
+            raise ValueError(f"Голос '{self.voice}' не найден")
+        for voice in voices:
+            languages = [lang.decode('ascii', 'ignore') if isinstance(lang, bytes) else str(lang)
+                         for lang in (voice.languages or [])]
+            text = ' '.join(languages + [voice.id, voice.name or '']).lower()
+            if self.lang in text or ('ru' == self.lang and 'russian' in text):
+                return voice.id
+        return None
+
+    def synthesize(self, word, file_path):
+        errors = self.synthesize_batch([(word, file_path)])
+        if errors:
+            raise errors[word]
+
+    def synthesize_batch(self, items):
+        with self._lock:
+            engine = self._get_engine()
+            for word, file_path in items:
+                engine.save_to_file(word, file_path)
+            engine.runAndWait()
+
+        errors = {}
+        for word, file_path in items:
+            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+                errors[word] = RuntimeError("pyttsx3 не создал файл")
+        return errors
+
+
+class StubTTSBackend(TTSEngine):
+    """Локальная заглушка TTS с имитацией задержки и сбоев (для тестов и замеров)
+
+    По умолчанию ведет себя как сетевой движок (по слову на вызов); с batch=True
+    имитирует локальный движок с пакетным синтезом. network=False снимает ограничение
+    частоты запросов и без пакетного синтеза.
+    """
+
+    name = 'stub'
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None, lang='ru', batch=False, network=None):
+        super().__init__(lang)
+        self.supports_batch = batch
+        self.network = not batch if network is None else network
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.batch_calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize(self, word, file_path):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError(f"Имитация сбоя TTS для слова '{word}'")
+        with open(file_path, 'wb') as f:
+            # Минимальный заголовок MP3-кадра и текст слова вместо звука
+            f.write(b"\xff\xfb\x90\x00" + word.encode('utf-8'))
+
+    def synthesize_batch(self, items):
+        with self._lock:
+            self.batch_calls += 1
+        return super().synthesize_batch(items)
+
+
+ENGINES = {
+    'gtts': GTTSEngine,
+    'pyttsx3': Pyttsx3Engine,
+    'stub': StubTTSBackend,
+}
+
+
+def create_engine(name='gtts', lang='ru', voice=None, **options):
+    """Создает движок TTS по имени из настроек"""
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный движок TTS: {name}")
+    if engine_class is StubTTSBackend:
+        return engine_class(lang=lang, **options)
+    return engine_class(lang=lang, voice=voice, **options)
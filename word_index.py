@@ -0,0 +1,341 @@
+import argparse
+import json
+import os
+import threading
+from heapq import heappush, heappushpop
+
+from word_list import dedup_key, load_word_store
+
+
+def pattern_masks(word):
+    """Битовые маски позиций каждой буквы слова (для bit_distance)"""
+    masks = {}
+    bit = 1
+    for char in word:
+        masks[char] = masks.get(char, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def bit_distance(masks, length, text, limit=None):
+    """Расстояние Левенштейна от слова (его маски и длина) до text, бит-параллельно (Майерс/Хюрё)
+
+    Столбец таблицы динамического программирования хранится в двух целых числах,
+    поэтому на каждую букву text приходится десяток битовых операций вместо
+    цикла по буквам слова. С limit при превышении порога возвращается limit + 1.
+    """
+    if not length:
+        return len(text)
+    rest = len(text)
+    if limit is not None and abs(length - rest) > limit:
+        return limit + 1
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    plus, minus, score = full, 0, length
+    for char in text:
+        eq = masks.get(char, 0)
+        vertical = eq | minus
+        horizontal = (((eq & plus) + plus) ^ plus) | eq
+        plus_h = minus | ~(horizontal | plus)
+        minus_h = plus & horizontal
+        if plus_h & high:
+            score += 1
+        elif minus_h & high:
+            score -= 1
+        rest -= 1
+        # Каждая оставшаяся буква уменьшает расстояние не больше чем на 1
+        if limit is not None and score - rest > limit:
+            return limit + 1
+        plus_h = (plus_h << 1) | 1
+        minus_h <<= 1
+        plus = (minus_h | ~(vertical | plus_h)) & full
+        minus = plus_h & vertical
+    return score
+
+
+def levenshtein(a, b, limit=None):
+    """Расстояние Левенштейна; с limit при превышении порога сразу возвращает limit + 1"""
+    return bit_distance(pattern_masks(a), len(a), b, limit)
+
+
+class WordIndex:
+    """Индекс похожих слов: BK-дерево по расстоянию Левенштейна
+
+    Слова сравниваются без учета регистра и различия е/ё. Поиск слов в пределах
+    расстояния и ближайших соседей просматривает только ветви дерева, которые по
+    неравенству треугольника могут содержать ответ, а расстояния считаются с
+    порогом, поэтому запрос к словарю в 100 тысяч слов не сравнивает запрос со
+    всеми словами. Удаленные слова только помечаются; дерево перестраивается,
+    когда удаленных становится больше, чем живых.
+
+    Индекс сохраняется в JSON рядом с кэшем аудио и при следующей загрузке
+    списка только дополняется разницей.
+    """
+
+    FILE_NAME = 'word_index.json'
+
+    def __init__(self, path=None):
+        self.path = path
+        self.words = []       # номер узла -> слово
+        self.keys = []        # номер узла -> ключ сравнения
+        self.children = []    # номер узла -> {расстояние: номер дочернего узла}
+        self.deleted = set()  # номера удаленных узлов
+        self._nodes = {}      # ключ сравнения -> номер узла
+        self._lock = threading.RLock()
+        self._dirty = False
+
+    @classmethod
+    def load_or_build(cls, folder, words, cancel_event=None):
+        """Загружает индекс из папки кэша аудио и приводит его к списку слов
+
+        Без папки индекс строится только в памяти. Сохраняется, если что-то изменилось.
+        """
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        index = cls(os.path.join(folder, cls.FILE_NAME) if folder else None)
+        index.load()
+        index.sync(words, cancel_event)
+        index.save()
+        return index
+
+    def __len__(self):
+        with self._lock:
+            return len(self.words) - len(self.deleted)
+
+    def __contains__(self, word):
+        with self._lock:
+            node = self._nodes.get(dedup_key(word))
+            return node is not None and node not in self.deleted
+
+    def live_words(self):
+        with self._lock:
+            return [word for node, word in enumerate(self.words) if node not in self.deleted]
+
+    def add(self, word):
+        """Добавляет слово; возвращает False, если такое слово уже есть"""
+        key = dedup_key(word)
+        with self._lock:
+            node = self._nodes.get(key)
+            if node is not None:
+                if node not in self.deleted:
+                    return False
+                # Слово вернулось в список - узел снова живой
+                self.deleted.discard(node)
+                self.words[node] = word
+                self._dirty = True
+                return True
+
+            new_node = len(self.words)
+            self.words.append(word)
+            self.keys.append(key)
+            self.children.append({})
+            self._nodes[key] = new_node
+            self._dirty = True
+            if new_node == 0:
+                return True
+
+            masks = pattern_masks(key)
+            node = 0
+            while True:
+                distance = bit_distance(masks, len(key), self.keys[node])
+                child = self.children[node].get(distance)
+                if child is None:
+                    self.children[node][distance] = new_node
+                    return True
+                node = child
+
+    def remove(self, word):
+        """Помечает слово удаленным"""
+        with self._lock:
+            node = self._nodes.get(dedup_key(word))
+            if node is None or node in self.deleted:
+                return False
+            self.deleted.add(node)
+            self._dirty = True
+            return True
+
+    def sync(self, words, cancel_event=None):
+        """Приводит индекс к списку слов: добавляет новые, помечает исчезнувшие
+
+        Возвращает (добавлено, удалено).
+        """
+        words = list(words)
+        wanted = {dedup_key(word) for word in words}
+        # Поиск похожих слов идет из других потоков: снимок слов и удаление - одним шагом
+        with self._lock:
+            removed = [word for word in self.live_words() if dedup_key(word) not in wanted]
+            for word in removed:
+                self.remove(word)
+            if len(self.deleted) > len(self):
+                self.rebuild(cancel_event=cancel_event)
+
+        added = 0
+        for word in words:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            added += self.add(word)
+        return added, len(removed)
+
+    def rebuild(self, words=None, cancel_event=None):
+        """Строит дерево заново (без удаленных узлов)"""
+        with self._lock:
+            words = self.live_words() if words is None else list(words)
+            self.words, self.keys, self.children = [], [], []
+            self.deleted = set()
+            self._nodes = {}
+            self._dirty = True
+            for word in words:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                self.add(word)
+
+    def _search(self, key, radius, visit):
+        """Обходит дерево; visit(расстояние, узел) возвращает текущий радиус поиска"""
+        if not self.words:
+            return
+        masks = pattern_masks(key)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            children = self.children[node]
+            # Расстояние нужно точно, только пока через узел достижимы дочерние ветви
+            limit = radius + max(children) if children else radius
+            distance = bit_distance(masks, len(key), self.keys[node], limit)
+            if distance <= radius and node not in self.deleted:
+                radius = visit(distance, node)
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+
+    def within(self, word, max_distance=2):
+        """Возвращает [(расстояние, слово)] всех слов не дальше max_distance, ближайшие первыми"""
+        found = []
+
+        def visit(distance, node):
+            found.append((distance, self.words[node]))
+            return max_distance
+
+        with self._lock:
+            self._search(dedup_key(word), max_distance, visit)
+        return sorted(found)
+
+    def nearest(self, word, k=1, max_distance=None, exclude=()):
+        """Возвращает до k ближайших слов [(расстояние, слово)], ближайшие первыми
+
+        exclude - слова, которые не нужно возвращать (например, само искомое слово).
+        """
+        key = dedup_key(word)
+        excluded = {dedup_key(other) for other in exclude}
+        best = []  # куча из (-расстояние, -узел): на вершине худший из найденных
+        radius = max_distance
+
+        def visit(distance, node):
+            if self.keys[node] in excluded:
+                return radius if len(best) < k else -best[0][0]
+            if len(best) < k:
+                heappush(best, (-distance, -node))
+            elif distance < -best[0][0]:
+                heappushpop(best, (-distance, -node))
+            return radius if len(best) < k else -best[0][0]
+
+        with self._lock:
+            if radius is None:
+                radius = len(key) + max(map(len, self.keys), default=0)
+            self._search(key, radius, visit)
+            return sorted((-distance, self.words[-node]) for distance, node in best)
+
+    def confusable_groups(self, words, max_distance=None, max_words=None):
+        """Группирует слова списка с похожими на них словами того же списка
+
+        Без max_distance порог зависит от длины слова: треть длины, но не меньше 2.
+        Каждое слово попадает не больше чем в одну группу. Возвращает список групп
+        (в каждой не меньше двух слов), всего не больше max_words слов.
+        """
+        allowed = {dedup_key(word) for word in words}
+        used = set()
+        groups = []
+        total = 0
+        for word in words:
+            if dedup_key(word) in used:
+                continue
+            radius = max_distance if max_distance is not None else max(2, len(word) // 3)
+            group = [similar for _, similar in self.within(word, radius)
+                     if dedup_key(similar) in allowed and dedup_key(similar) not in used]
+            if len(group) < 2:
+                continue
+            if max_words is not None and total + len(group) > max_words:
+                break
+            used.update(dedup_key(similar) for similar in group)
+            groups.append(group)
+            total += len(group)
+        return groups
+
+    def load(self):
+        """Загружает индекс из файла (поврежденный файл означает построение заново)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            words = data['words']
+            children = [dict(zip(edges[::2], edges[1::2])) for edges in data['children']]
+            deleted = set(data.get('deleted', []))
+        except Exception as e:
+            print(f"Ошибка загрузки индекса похожих слов: {e}")
+            return
+        with self._lock:
+            self.words = words
+            self.keys = [dedup_key(word) for word in words]
+            self.children = children
+            self.deleted = deleted
+            self._nodes = {key: node for node, key in enumerate(self.keys)}
+            self._dirty = False
+
+    def save(self):
+        """Атомарно сохраняет индекс, если он изменился"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = {
+                'version': 1,
+                'words': list(self.words),
+                'children': [[value for item in children.items() for value in item] for children in self.children],
+                'deleted': sorted(self.deleted),
+            }
+            self._dirty = False
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Ошибка сохранения индекса похожих слов: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Поиск похожих слов в списке (BK-дерево)")
+    parser.add_argument('words_file', help="файл со словами (по одному на строку)")
+    parser.add_argument('--folder', default=None, help="папка для сохранения индекса (папка кэша аудио)")
+    parser.add_argument('--near', default=None, help="слово, для которого искать похожие")
+    parser.add_argument('-k', type=int, default=5, help="число ближайших слов для --near")
+    parser.add_argument('--distance', type=int, default=None,
+                        help="максимальное расстояние (по умолчанию 2 для --near, треть длины слова для --groups)")
+    parser.add_argument('--groups', type=int, default=None, metavar='N',
+                        help="показать группы похожих слов (не больше N слов)")
+    args = parser.parse_args(argv)
+
+    store, _ = load_word_store(args.words_file)
+    words = store.to_list()
+    index = WordIndex.load_or_build(args.folder, words)
+    print(f"Слов в индексе: {len(index)}")
+    if args.near:
+        for distance, word in index.nearest(args.near, args.k, args.distance or 2):
+            print(f"  {distance}  {word}")
+    if args.groups:
+        for group in index.confusable_groups(words, args.distance, args.groups):
+            print("  " + ", ".join(group))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import re
+import unicodedata
+from array import array
+from bisect import bisect_right
+
+LATIN_LETTER = re.compile('[A-Za-z]')
+
+# Латинские буквы, которые при наборе путают с русскими
+HOMOGLYPHS = str.maketrans({
+    'a': 'а', 'c': 'с', 'e': 'е', 'k': 'к', 'm': 'м', 'o': 'о', 'p': 'р', 't': 'т',
+    'x': 'х', 'y': 'у', 'A': 'А', 'B': 'В', 'C': 'С', 'E': 'Е', 'H': 'Н', 'K': 'К',
+    'M': 'М', 'O': 'О', 'P': 'Р', 'T': 'Т', 'X': 'Х', 'Y': 'У',
+})
+
+
+def iter_lines(lines_or_path, encoding='utf-8-sig'):
+    """Построчно читает файл (или перебирает готовые строки), не загружая все целиком"""
+    if isinstance(lines_or_path, str):
+        with open(lines_or_path, 'r', encoding=encoding) as f:
+            yield from f
+    else:
+        yield from lines_or_path
+
+
+def normalize_word(line):
+    """Нормализует строку списка: NFC (ё из е + знак ударения), обрезка и схлопывание пробелов"""
+    return " ".join(unicodedata.normalize('NFC', line).split())
+
+
+def dedup_key(word):
+    """Ключ для поиска повторов: без учета регистра и различия е/ё"""
+    return word.casefold().replace('ё', 'е')
+
+
+def letter_scripts(word):
+    """Возвращает множество алфавитов букв слова ('cyrillic', 'latin', 'other')"""
+    scripts = set()
+    for ch in word:
+        if not ch.isalpha():
+            continue
+        if 'Ѐ' <= ch <= 'ӿ':
+            scripts.add('cyrillic')
+        elif ch.isascii():
+            scripts.add('latin')
+        else:
+            scripts.add('other')
+    return scripts
+
+
+def is_mixed_script(word):
+    """Проверяет, смешаны ли в слове кириллица и латиница"""
+    # Быстрая проверка для подавляющего большинства слов
+    if word.isascii() or not LATIN_LETTER.search(word):
+        return False
+    return len(letter_scripts(word)) > 1
+
+
+def fix_homoglyphs(word):
+    """Заменяет латинские буквы-двойники на русские; None, если заменить можно не все"""
+    fixed = word.translate(HOMOGLYPHS)
+    return fixed if letter_scripts(fixed) == {'cyrillic'} else None
+
+
+class WordStore:
+    """Компактное хранилище слов: один буфер UTF-8 и массив смещений
+
+    Для поиска повторов хранятся хэши ключей и номера слов, а не сами строки;
+    при совпадении хэша ключ сравнивается со словом из буфера, так что коллизия
+    хэшей не выбрасывает настоящее слово.
+    """
+
+    def __init__(self, words=()):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+        self._hashes = {}      # хэш ключа -> номер первого слова с таким хэшем
+        self._collisions = {}  # ключ -> номер слова, чей хэш уже занят другим ключом
+        # Индекс поиска: ключи всех слов одной строкой через '\n' и начала ключей в ней
+        # (строится при первом поиске и сбрасывается при добавлении слова)
+        self._search_text = None
+        self._search_starts = None
+        for word in words:
+            self.add(word)
+
+    def _index_of_key(self, key):
+        """Номер слова с ключом key или None"""
+        index = self._hashes.get(hash(key))
+        if index is None:
+            return None
+        if dedup_key(self[index]) == key:
+            return index
+        return self._collisions.get(key)
+
+    def add(self, word):
+        """Добавляет слово, если такого еще нет; возвращает True при добавлении"""
+        key = dedup_key(word)
+        if self._index_of_key(key) is not None:
+            return False
+        index = len(self)
+        if hash(key) in self._hashes:
+            self._collisions[key] = index
+        else:
+            self._hashes[hash(key)] = index
+        self._data += word.encode('utf-8')
+        self._offsets.append(len(self._data))
+        self._search_text = None
+        return True
+
+    def __contains__(self, word):
+        return self._index_of_key(dedup_key(word)) is not None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_list(self):
+        """Возвращает слова списком"""
+        return list(self)
+
+    def without(self, indices):
+        """Возвращает новое хранилище без слов с указанными номерами"""
+        indices = set(indices)
+        return WordStore(word for index, word in enumerate(self) if index not in indices)
+
+    def replaced(self, index, new_word):
+        """Возвращает новое хранилище, где слово с номером index заменено (None - если это повтор)"""
+        old_word = self[index]
+        if dedup_key(new_word) != dedup_key(old_word) and new_word in self:
+            return None
+        return WordStore(new_word if i == index else word for i, word in enumerate(self))
+
+    def find(self, text):
+        """Возвращает номера слов, содержащих text (без учета регистра и е/ё)
+
+        Подстрока ищется str.find в общей строке ключей, поэтому слова не декодируются
+        заново при каждом поиске, а проверяются только совпадения.
+        """
+        needle = dedup_key(text)
+        found = array('L')
+        if not len(self) or '\n' in needle:
+            return found
+        search_text, starts = self._search_index()
+        position = search_text.find(needle)
+        while position != -1:
+            index = bisect_right(starts, position) - 1
+            found.append(index)
+            # Следующее совпадение ищем со следующего слова: каждое слово - один раз
+            position = search_text.find(needle, starts[index + 1])
+        return found
+
+    def _search_index(self):
+        if self._search_text is None:
+            keys = [dedup_key(word) for word in self]
+            starts = array('Q', [0])
+            for key in keys:
+                starts.append(starts[-1] + len(key) + 1)
+            self._search_text = '\n'.join(keys)
+            self._search_starts = starts
+        return self._search_text, self._search_starts
+
+    def memory_usage(self):
+        """Примерный объем памяти буфера и смещений (без таблицы хэшей), в байтах"""
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class LoadReport:
+    """Итоги загрузки списка слов"""
+
+    def __init__(self):
+        self.lines = 0
+        self.empty = 0
+        self.duplicates = 0
+        self.fixed = []
+        self.mixed_script = []
+
+    def summary(self):
+        """Короткое описание для пользователя"""
+        parts = [f"Строк: {self.lines}"]
+        if self.duplicates:
+            parts.append(f"повторов пропущено: {self.duplicates}")
+        if self.fixed:
+            parts.append(f"исправлено латинских букв: {len(self.fixed)}")
+        if self.mixed_script:
+            parts.append(f"слов со смешанным алфавитом: {len(self.mixed_script)}")
+        return ", ".join(parts)
+
+
+def load_word_store(source, fix_mixed_script=False):
+    """Загружает список слов потоково: нормализация, удаление повторов, проверка алфавитов
+
+    source - путь к файлу или итерируемые строки. Возвращает (WordStore, LoadReport).
+    Слова со смешанным алфавитом попадают в отчет вместе с вариантом исправления;
+    с fix_mixed_script исправление применяется сразу.
+    """
+    store = WordStore()
+    report = LoadReport()
+
+    for line_no, line in enumerate(iter_lines(source), start=1):
+        report.lines += 1
+        word = normalize_word(line)
+        if not word:
+            report.empty += 1
+            continue
+
+        if is_mixed_script(word):
+            suggestion = fix_homoglyphs(word)
+            if fix_mixed_script and suggestion:
+                report.fixed.append((line_no, word, suggestion))
+                word = suggestion
+            else:
+                report.mixed_script.append((line_no, word, suggestion))
+
+        if not store.add(word):
+            report.duplicates += 1
+
+    return store, report
@@ -0,0 +1,276 @@
+import tkinter as tk
+from tkinter import ttk
+
+from word_list import WordStore, normalize_word
+
+
+class VirtualWordList(tk.Frame):
+    """Виртуализированный список слов: рисуются только видимые строки
+
+    Работает поверх WordStore, поддерживает поиск, выделение (щелчок, Ctrl, Shift, Ctrl+A),
+    удаление выделенных, добавление и правку слов, а также колонку состояния.
+    """
+
+    ROW_HEIGHT = 22
+    SELECT_COLOR = "#cce4ff"
+
+    def __init__(self, master, status_provider=None, on_change=None, font=("Arial", 12)):
+        super().__init__(master)
+        # status_provider(word) -> (текст, цвет) для колонки состояния
+        self.status_provider = status_provider
+        self.on_change = on_change
+        self.font = font
+
+        self.store = WordStore()
+        self.view = None  # номера видимых после фильтра слов (None - все слова)
+        self.selection = set()
+        self.anchor = None
+        self.top = 0
+        self._rows = []
+        self._filter_job = None
+        self._edit_entry = None
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        toolbar = tk.Frame(self)
+        toolbar.pack(fill="x", pady=(0, 5))
+
+        tk.Label(toolbar, text="Поиск:", font=("Arial", 10)).pack(side="left")
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self._schedule_filter())
+        tk.Entry(toolbar, textvariable=self.search_var, font=("Arial", 10), width=18).pack(side="left", padx=5)
+
+        self.add_var = tk.StringVar()
+        add_entry = tk.Entry(toolbar, textvariable=self.add_var, font=("Arial", 10), width=18)
+        add_entry.pack(side="left", padx=(15, 5))
+        add_entry.bind("<Return>", lambda e: self.add_words_from_entry())
+        tk.Button(toolbar, text="Добавить", command=self.add_words_from_entry,
+                  font=("Arial", 9)).pack(side="left")
+
+        tk.Button(toolbar, text="Удалить выбранные", command=self.delete_selected,
+                  font=("Arial", 9)).pack(side="left", padx=5)
+
+        self.count_label = tk.Label(toolbar, text="", font=("Arial", 9))
+        self.count_label.pack(side="right")
+
+        body = tk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(body, background="white", highlightthickness=1, takefocus=True)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.render())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Control-Button-1>", lambda e: self._on_click(e, toggle=True))
+        self.canvas.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True))
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1, 'units'))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1, 'units'))
+        self.canvas.bind("<Delete>", lambda e: self.delete_selected())
+        self.canvas.bind("<Control-a>", lambda e: self.select_all())
+
+    # --- Данные ---
+
+    def set_store(self, store):
+        """Показывает новое хранилище слов"""
+        self.store = store
+        self.selection.clear()
+        self.anchor = None
+        self.top = 0
+        self._apply_filter()
+
+    def replace_store(self, store):
+        """Подменяет хранилище, сохраняя прокрутку и поиск (например, после правки файла извне)"""
+        self.store = store
+        self.selection.clear()
+        self.anchor = None
+        self._apply_filter()
+
+    def _changed(self, store):
+        """Заменяет хранилище после правки и сообщает владельцу"""
+        self.replace_store(store)
+        if self.on_change:
+            self.on_change(store)
+
+    def _visible_count(self):
+        return len(self.store) if self.view is None else len(self.view)
+
+    def _store_index(self, row):
+        return row if self.view is None else self.view[row]
+
+    def _schedule_filter(self):
+        """Откладывает фильтрацию, пока пользователь печатает"""
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(150, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        text = self.search_var.get().strip()
+        self.view = self.store.find(text) if text else None
+        self.top = min(self.top, max(0, self._visible_count() - 1))
+        self.render()
+
+    def add_words_from_entry(self):
+        """Добавляет слова из поля ввода (можно несколько через запятую)"""
+        words = [normalize_word(part) for part in self.add_var.get().replace(';', ',').split(',')]
+        words = [word for word in words if word]
+        if not words:
+            return
+        # Добавление дописывает в конец буфера, без перестройки хранилища
+        for word in words:
+            self.store.add(word)
+        self.add_var.set("")
+        self._changed(self.store)
+        self.scroll_to(self._visible_count() - 1)
+
+    def delete_selected(self):
+        """Удаляет выделенные слова"""
+        if self.selection:
+            self._changed(self.store.without(self.selection))
+
+    def select_all(self):
+        """Выделяет все слова, прошедшие фильтр"""
+        self.selection = set(range(len(self.store))) if self.view is None else set(self.view)
+        self.render()
+        return "break"
+
+    def refresh(self):
+        """Перерисовывает видимые строки (например, после смены состояния аудио)"""
+        self.render()
+
+    # --- Прокрутка ---
+
+    def _page_rows(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+
+    def _on_scrollbar(self, action, value, units=None):
+        if action == 'moveto':
+            self.top = int(float(value) * self._visible_count())
+            self._clamp_top()
+            self.render()
+        elif action == 'scroll':
+            self.scroll(int(value), units)
+
+    def scroll(self, amount, units):
+        """Прокручивает список на amount строк или страниц"""
+        self.top += amount * (self._page_rows() if units == 'pages' else 1)
+        self._clamp_top()
+        self.render()
+
+    def scroll_to(self, row):
+        """Прокручивает так, чтобы строка row была видна"""
+        if row < self.top or row >= self.top + self._page_rows():
+            self.top = row - self._page_rows() // 2
+            self._clamp_top()
+        self.render()
+
+    def _clamp_top(self):
+        self.top = max(0, min(self.top, self._visible_count() - self._page_rows()))
+
+    # --- Отрисовка ---
+
+    def _ensure_rows(self, count):
+        """Создает недостающие элементы холста для строк (пул переиспользуется)"""
+        while len(self._rows) < count:
+            y = len(self._rows) * self.ROW_HEIGHT
+            background = self.canvas.create_rectangle(0, y, 0, y + self.ROW_HEIGHT, width=0, fill="")
+            word = self.canvas.create_text(8, y + self.ROW_HEIGHT // 2, anchor="w", font=self.font)
+            status = self.canvas.create_text(0, y + self.ROW_HEIGHT // 2, anchor="e", font=("Arial", 9))
+            self._rows.append((background, word, status))
+
+    def render(self):
+        """Рисует только видимые строки"""
+        width = self.canvas.winfo_width()
+        page = self._page_rows() + 1
+        total = self._visible_count()
+        self._ensure_rows(page)
+
+        for i, (background, word_item, status_item) in enumerate(self._rows):
+            row = self.top + i
+            if i >= page or row >= total:
+                self.canvas.itemconfigure(background, fill="")
+                self.canvas.itemconfigure(word_item, text="")
+                self.canvas.itemconfigure(status_item, text="")
+                continue
+
+            index = self._store_index(row)
+            word = self.store[index]
+            y = i * self.ROW_HEIGHT
+            self.canvas.coords(background, 0, y, width, y + self.ROW_HEIGHT)
+            self.canvas.itemconfigure(background, fill=self.SELECT_COLOR if index in self.selection else "")
+            self.canvas.itemconfigure(word_item, text=word)
+            self.canvas.coords(status_item, width - 8, y + self.ROW_HEIGHT // 2)
+            status_text, status_color = self.status_provider(word) if self.status_provider else ("", "")
+            self.canvas.itemconfigure(status_item, text=status_text, fill=status_color or "gray")
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + page - 1) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        shown = f"показано {total} из {len(self.store)}" if self.view is not None else f"слов: {total}"
+        selected = f", выделено {len(self.selection)}" if self.selection else ""
+        self.count_label.config(text=shown + selected)
+
+    # --- Мышь ---
+
+    def _row_at(self, y):
+        row = self.top + int(y // self.ROW_HEIGHT)
+        return row if row < self._visible_count() else None
+
+    def _on_click(self, event, toggle=False, extend=False):
+        self.canvas.focus_set()
+        row = self._row_at(event.y)
+        if row is None:
+            return "break"
+        index = self._store_index(row)
+
+        if extend and self.anchor is not None:
+            first, last = sorted((self.anchor, row))
+            self.selection = {self._store_index(r) for r in range(first, last + 1)}
+        elif toggle:
+            self.selection ^= {index}
+            self.anchor = row
+        else:
+            self.selection = {index}
+            self.anchor = row
+        self.render()
+        return "break"
+
+    def _on_double_click(self, event):
+        """Открывает поле правки слова поверх строки"""
+        row = self._row_at(event.y)
+        if row is None:
+            return
+        index = self._store_index(row)
+        y = (row - self.top) * self.ROW_HEIGHT
+
+        if self._edit_entry:
+            self._edit_entry.destroy()
+        entry = tk.Entry(self.canvas, font=self.font)
+        entry.insert(0, self.store[index])
+        entry.select_range(0, tk.END)
+        entry.focus_set()
+        self.canvas.create_window(0, y, anchor="nw", window=entry, width=self.canvas.winfo_width() // 2,
+                                  height=self.ROW_HEIGHT, tags=("editor",))
+        self._edit_entry = entry
+
+        def finish(save):
+            if self._edit_entry is not entry:
+                return
+            new_word = normalize_word(entry.get())
+            self.canvas.delete("editor")
+            entry.destroy()
+            self._edit_entry = None
+            if save and new_word and new_word != self.store[index]:
+                store = self.store.replaced(index, new_word)
+                if store is not None:
+                    self._changed(store)
+
+        entry.bind("<Return>", lambda e: finish(True))
+        entry.bind("<Escape>", lambda e: finish(False))
+        entry.bind("<FocusOut>", lambda e: finish(True))
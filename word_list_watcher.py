@@ -0,0 +1,85 @@
+import os
+import threading
+
+from word_list import load_word_store
+
+
+def diff_words(old_words, new_words):
+    """Возвращает (добавленные, удаленные) слова в порядке их следования в списках"""
+    old_set = set(old_words)
+    new_set = set(new_words)
+    return [word for word in new_words if word not in old_set], [word for word in old_words if word not in new_set]
+
+
+class WordListWatcher:
+    """Следит за файлом списка слов и сообщает, какие слова добавлены и удалены
+
+    Изменение определяется опросом одного os.stat файла (время изменения, размер,
+    inode), поэтому проверка ничего не стоит даже для списка в десятки тысяч слов.
+    Файл перечитывается, только когда перестал меняться между двумя опросами
+    (редактор мог еще не дописать его). on_change(store, added, removed)
+    вызывается из потока наблюдателя.
+    """
+
+    def __init__(self, path, on_change, interval=1.0, words=None, fix_mixed_script=False):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.fix_mixed_script = fix_mixed_script
+        # Слова предыдущей версии файла (None - файл еще не читался)
+        self._words = list(words) if words is not None else None
+        self._signature = self._stat()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='word-list-watcher', daemon=True)
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 1.0)
+
+    def check(self):
+        """Проверяет файл один раз; возвращает (store, added, removed) или None, если слова не менялись"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            # Файла нет (редактор сохраняет через удаление и переименование) или он не менялся
+            self._pending = None
+            return None
+        if signature != self._pending:
+            # Файл только что изменился - ждем, пока запись закончится
+            self._pending = signature
+            return None
+
+        store, _ = load_word_store(self.path, fix_mixed_script=self.fix_mixed_script)
+        self._pending = None
+        self._signature = signature
+        new_words = store.to_list()
+        if self._words is None:
+            added, removed = new_words, []
+        else:
+            added, removed = diff_words(self._words, new_words)
+        self._words = new_words
+        if not added and not removed:
+            return None
+        return store, added, removed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                change = self.check()
+            except Exception as e:
+                print(f"Ошибка чтения списка слов {self.path}: {e}")
+                continue
+            if change:
+                self.on_change(*change)